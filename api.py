@@ -0,0 +1,243 @@
+# api.py
+# -*- coding: utf-8 -*-
+"""
+API LOCAL DE INFERÊNCIA (FastAPI)
+---------------------------------
+- Carrega o pipeline de inferência (config.PIPELINE_PATH) uma única vez na
+  inicialização do servidor
+- POST /predict        -> um registro de sensores
+- POST /predict/batch  -> lista de registros
+- Resposta: probabilidade de falha por target do pipeline
+- predict_proba é CPU-bound: roda em um pool de threads fora do event loop
+  (as árvores do sklearn liberam o GIL durante a travessia)
+- Requisições concorrentes são agrupadas pelo MicroBatcher (batching.py)
+  em uma única chamada vetorizada; GET /stats mostra vazão e latência p99
+- Cada registro é validado contra o schema do pipeline antes da predição
+  (RecordValidator): colunas obrigatórias ausentes, valores não numéricos
+  ou categorias desconhecidas respondem 422 em vez de virarem 0
+- Registros brutos e tratados podem vir misturados no mesmo lote: cada
+  tipo é pontuado em um DataFrame próprio (ver record_kind) e o
+  MicroBatcher só agrupa requisições concorrentes do mesmo tipo
+- Registros repetidos saem do cache de predições (prediction_cache.py,
+  config.PREDICTION_CACHE), recarregado sozinho quando o modelo é retreinado
+
+Uso:
+  uvicorn api:app --host 0.0.0.0 --port 8000
+  python api.py
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from typing import Annotated, Any, Dict, List, Literal, Optional
+import asyncio
+
+import pandas as pd
+from fastapi import FastAPI, HTTPException
+from pydantic import BaseModel, ConfigDict, Field, ValidationError, create_model
+
+import config
+from batching import MicroBatcher
+
+
+class PredictRequest(BaseModel):
+    features: Dict[str, Any]
+
+
+class BatchPredictRequest(BaseModel):
+    records: List[Dict[str, Any]]
+
+
+Number = Annotated[float, Field(strict=True, allow_inf_nan=False)]
+
+
+def _served(pipeline):
+    """Pipeline de inferência por trás do cache de predições (se houver)"""
+    return getattr(pipeline, "pipeline", pipeline)
+
+
+def record_kind(pipeline, record):
+    """Tipo do registro: "raw" se traz colunas categóricas brutas do encoder, senão "processed" """
+    encoder = getattr(_served(pipeline), "encoder", None)
+    if encoder is not None and any(col in record for col in encoder.columns):
+        return "raw"
+    return "processed"
+
+
+class RecordValidator:
+    """
+    Valida registros contra o schema do pipeline servido. Registros brutos
+    (com as colunas categóricas do encoder) exigem as colunas numéricas de
+    config.NUMERIC_COLS usadas pelo modelo e categorias vistas no treino;
+    registros tratados exigem todas as feature_columns como números.
+    Colunas extras são ignoradas.
+    """
+
+    def __init__(self, pipeline):
+        feature_columns = list(pipeline.feature_columns)
+        extra = ConfigDict(extra="allow")
+        self.processed = create_model("ProcessedRecord", __config__=extra,
+                                      **{col: (Number, ...) for col in feature_columns})
+
+        self.pipeline = pipeline
+        encoder = getattr(pipeline, "encoder", None)
+        self.raw = None
+        if encoder is not None:
+            fields = {col: (Number, ...) for col in config.NUMERIC_COLS if col in feature_columns}
+            categories = getattr(encoder, "categories_", {})
+            for col in encoder.columns:
+                if col in encoder.high_cardinality_cols or col not in categories:
+                    fields[col] = (Optional[str], None)
+                else:
+                    fields[col] = (Literal[tuple(str(cat) for cat in categories[col])], ...)
+            self.raw = create_model("RawRecord", __config__=extra, **fields)
+
+    def errors(self, records):
+        """Erros de validação de todos os registros (lista vazia se todos são válidos)"""
+        errors = []
+        for i, record in enumerate(records):
+            is_raw = self.raw is not None and record_kind(self.pipeline, record) == "raw"
+            try:
+                (self.raw if is_raw else self.processed).model_validate(record)
+            except ValidationError as e:
+                errors += [{"record": i, "field": ".".join(map(str, error["loc"])), "msg": error["msg"]}
+                           for error in e.errors(include_url=False)]
+        return errors
+
+
+def _score(pipeline, records):
+    """
+    Executado no pool: registros -> lista de {target: probabilidade}, na
+    ordem de entrada. Brutos e tratados viram DataFrames separados: juntos,
+    o encoder recodificaria as linhas já tratadas.
+    """
+    groups = {}
+    for i, record in enumerate(records):
+        groups.setdefault(record_kind(pipeline, record), []).append(i)
+
+    results = [None] * len(records)
+    for positions in groups.values():
+        proba = pipeline.predict_frame(pd.DataFrame.from_records([records[i] for i in positions]))
+        for i, row in zip(positions, proba.astype(float).to_dict(orient="records")):
+            results[i] = row
+    return results
+
+
+def create_app(pipeline=None, max_workers=None):
+    """
+    Cria a aplicação. `pipeline` permite injetar um pipeline já carregado
+    (ou um dublê com predict_frame) para testes offline.
+    """
+    settings = config.INFERENCE_API
+    config.init()
+
+    def tune(loaded):
+        # Lotes pequenos: despachar threads do forest (n_jobs=-1) custa mais que a predição
+        if settings["model_n_jobs"] is not None and hasattr(loaded, "set_n_jobs"):
+            loaded.set_n_jobs(settings["model_n_jobs"])
+        return loaded
+
+    def load():
+        from inference import load_pipeline
+        print("📥 Carregando pipeline de inferência de:", config.PIPELINE_PATH)
+        return tune(load_pipeline(config.PIPELINE_PATH))
+
+    @asynccontextmanager
+    async def lifespan(app):
+        if pipeline is not None:
+            app.state.pipeline = tune(pipeline)
+        elif config.PREDICTION_CACHE["enabled"]:
+            from prediction_cache import PredictionCache
+            app.state.pipeline = PredictionCache(load)
+            app.state.pipeline.pipeline  # carrega na inicialização, não na primeira requisição
+        else:
+            app.state.pipeline = load()
+
+        app.state.validator = app.state.validator_for = None
+        app.state.executor = ThreadPoolExecutor(max_workers=max_workers or settings["workers"])
+        app.state.batcher = None
+        if settings["micro_batching"]:
+            app.state.batcher = MicroBatcher(
+                lambda records: _score(app.state.pipeline, records),
+                max_batch_size=settings["batch_max_size"],
+                max_wait_ms=settings["batch_max_wait_ms"],
+                executor=app.state.executor,
+            )
+            await app.state.batcher.start()
+        yield
+        if app.state.batcher is not None:
+            await app.state.batcher.stop()
+        app.state.executor.shutdown(wait=True)
+
+    app = FastAPI(title="AMIA - Inferência de Falhas", lifespan=lifespan)
+
+    def validate(records):
+        # O cache recarrega o pipeline após um novo treino: o schema acompanha
+        served = _served(app.state.pipeline)
+        if not hasattr(served, "feature_columns"):
+            return
+        if app.state.validator_for is not served:
+            app.state.validator, app.state.validator_for = RecordValidator(served), served
+        errors = app.state.validator.errors(records)
+        if errors:
+            raise HTTPException(status_code=422, detail=errors)
+
+    async def run_scoring(records):
+        validate(records)
+        if app.state.batcher is not None:
+            groups = {}
+            for i, record in enumerate(records):
+                groups.setdefault(record_kind(app.state.pipeline, record), []).append(i)
+            scored = await asyncio.gather(*(
+                app.state.batcher.submit([records[i] for i in positions], key=kind)
+                for kind, positions in groups.items()
+            ))
+            results = [None] * len(records)
+            for positions, rows in zip(groups.values(), scored):
+                for i, row in zip(positions, rows):
+                    results[i] = row
+            return results
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(app.state.executor, _score, app.state.pipeline, records)
+
+    @app.get("/health")
+    async def health():
+        return {
+            "status": "ok",
+            "targets": list(app.state.pipeline.targets),
+            "n_features": len(app.state.pipeline.feature_columns),
+        }
+
+    @app.get("/stats")
+    async def stats():
+        cache = app.state.pipeline.stats() if hasattr(app.state.pipeline, "stats") else None
+        if app.state.batcher is None:
+            return {"micro_batching": False, "prediction_cache": cache}
+        return dict(app.state.batcher.stats(), micro_batching=True, prediction_cache=cache)
+
+    @app.post("/predict")
+    async def predict(request: PredictRequest):
+        results = await run_scoring([request.features])
+        return {"probabilities": results[0]}
+
+    @app.post("/predict/batch")
+    async def predict_batch(request: BatchPredictRequest):
+        if not request.records:
+            raise HTTPException(status_code=422, detail="Lista de registros vazia")
+        if len(request.records) > settings["max_batch_size"]:
+            raise HTTPException(
+                status_code=413,
+                detail=f"Lote acima do limite de {settings['max_batch_size']} registros",
+            )
+        results = await run_scoring(request.records)
+        return {"n_records": len(results), "probabilities": results}
+
+    return app
+
+
+app = create_app()
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    uvicorn.run(app, host=config.INFERENCE_API["host"], port=config.INFERENCE_API["port"])
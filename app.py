@@ -1,18 +1,121 @@
+import hashlib
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
 import streamlit as st
 import pandas as pd
-import joblib
+
+import config
+from dtype_policy import read_raw
+from prediction_cache import get_cache
 
 # ======================
 # 📥 Carregar Modelo
 # ======================
-MODEL_PATH = "models/modelo.pkl"
-
+# Pipeline completo (encoder + cleaner + schema + modelo) salvo pelo train.py
+# em config.PIPELINE_PATH, atrás do cache de predições: entradas repetidas não
+# passam pelo forest e um novo treino recarrega o pipeline e esvazia o cache
 @st.cache_resource
 def load_model():
-    return joblib.load(MODEL_PATH)
+    config.init()
+    return get_cache()
 
 model = load_model()
 
+# CSVs pontuados ficam em disco; o registro de uploads guarda só o caminho e o resumo
+RESULTS_DIR = Path(tempfile.gettempdir()) / "amia_predicoes"
+
+
+def model_version():
+    """Versão do modelo em uso (mtime do artefato): entra na chave do cache de uploads"""
+    path = config.PIPELINE_PATH
+    return path.stat().st_mtime_ns if path.exists() else 0
+
+
+def content_hash(upload, block_size=1 << 20):
+    """SHA-256 do arquivo enviado, lido em blocos"""
+    digest = hashlib.sha256()
+    upload.seek(0)
+    for block in iter(lambda: upload.read(block_size), b""):
+        digest.update(block)
+    upload.seek(0)
+    return digest.hexdigest()
+
+
+class ScoredUploads:
+    """
+    Uploads já pontuados: (hash do conteúdo, versão do modelo) -> caminho do
+    CSV pontuado + resumo. Guarda as `max_entries` mais recentes (LRU); o
+    CSV de uma entrada descartada é apagado do disco.
+    """
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._results = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, file_hash, version):
+        """Resultado do upload (None se não foi pontuado ou o CSV saiu do disco)"""
+        key = (file_hash, version)
+        with self._lock:
+            result = self._results.get(key)
+            if result is not None and not Path(result["path"]).exists():
+                del self._results[key]
+                result = None
+            if result is not None:
+                self._results.move_to_end(key)
+            return result
+
+    def put(self, file_hash, version, result):
+        with self._lock:
+            self._results[(file_hash, version)] = result
+            self._results.move_to_end((file_hash, version))
+            while len(self._results) > self.max_entries:
+                _, evicted = self._results.popitem(last=False)
+                Path(evicted["path"]).unlink(missing_ok=True)
+
+
+# Uma instância por processo do Streamlit, compartilhada entre as sessões
+@st.cache_resource
+def scored_uploads():
+    return ScoredUploads(config.APP_CACHE_ENTRIES)
+
+
+def score_upload(upload, path, progress, table):
+    """
+    Lê o CSV em blocos de config.APP_CSV_CHUNKSIZE linhas, pontua cada bloco
+    (predict_proba vetorizado do modelo em cache), acrescenta o bloco ao CSV
+    em `path` e atualiza a barra de progresso e a tabela das linhas de maior
+    risco: a memória fica limitada ao bloco, não ao tamanho do arquivo.
+    """
+    proba_col = f"proba_{config.TARGET}"
+    top = None
+    n_rows = n_failures = 0
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + ".tmp")
+    chunks = read_raw(upload, chunksize=config.APP_CSV_CHUNKSIZE)
+    with open(tmp_path, "w", newline="") as output:
+        for scored in model.pipeline.score_chunks(chunks):
+            scored.to_csv(output, index=False, header=n_rows == 0)
+            n_rows += len(scored)
+            n_failures += int((scored[proba_col] > 0.5).sum())
+
+            # Só as maiores de cada bloco entram na tabela (no máximo 2 x APP_TOP_ROWS linhas)
+            best = scored.nlargest(config.APP_TOP_ROWS, proba_col)
+            top = best if top is None else pd.concat([top, best]).nlargest(config.APP_TOP_ROWS, proba_col)
+            table.dataframe(top, use_container_width=True)
+            progress.progress(min(upload.tell() / max(upload.size, 1), 1.0),
+                              text=f"{n_rows:,} linhas pontuadas")
+    os.replace(tmp_path, path)
+
+    progress.progress(1.0, text=f"{n_rows:,} linhas pontuadas")
+    return {"path": str(path), "rows": n_rows, "failures": n_failures, "top": top}
+
+
 # ======================
 # 🎛️ Layout Streamlit
 # ======================
@@ -23,19 +126,19 @@ st.markdown("Preveja falhas em máquinas industriais a partir de dados de sensor
 # Sidebar para inputs
 st.sidebar.header("📥 Entrada de Dados")
 
-torque = st.sidebar.number_input("Torque [Nm]", min_value=0.0, max_value=500.0, value=200.0)
-velocidade = st.sidebar.number_input("Velocidade Rotacional [RPM]", min_value=0.0, max_value=10000.0, value=3500.0)
-potencia = st.sidebar.number_input("Potência Mecânica [kW]", min_value=0.0, max_value=500.0, value=120.0)
-desgaste = st.sidebar.number_input("Desgaste da Ferramenta [%]", min_value=0.0, max_value=100.0, value=10.0)
-temp_proc = st.sidebar.number_input("Temperatura do Processo [°C]", min_value=0.0, max_value=500.0, value=200.0)
-temp_ar = st.sidebar.number_input("Temperatura do Ar [°C]", min_value=-10.0, max_value=50.0, value=25.0)
-umidade = st.sidebar.number_input("Umidade Relativa [%]", min_value=0.0, max_value=100.0, value=40.0)
+tipo = st.sidebar.selectbox("Tipo do Produto", ["L", "M", "H"])
+torque = st.sidebar.number_input("Torque [Nm]", min_value=0.0, max_value=500.0, value=40.0)
+velocidade = st.sidebar.number_input("Velocidade Rotacional [RPM]", min_value=0.0, max_value=10000.0, value=1500.0)
+desgaste = st.sidebar.number_input("Desgaste da Ferramenta [min]", min_value=0.0, max_value=500.0, value=100.0)
+temp_proc = st.sidebar.number_input("Temperatura do Processo [K]", min_value=0.0, max_value=500.0, value=310.0)
+temp_ar = st.sidebar.number_input("Temperatura do Ar [K]", min_value=0.0, max_value=500.0, value=300.0)
+umidade = st.sidebar.number_input("Umidade Relativa [%]", min_value=0.0, max_value=100.0, value=90.0)
 
-# Criar DataFrame de entrada
+# Criar DataFrame de entrada (mesmos nomes de colunas do dataset bruto)
 input_data = pd.DataFrame([{
+    "tipo": tipo,
     "torque": torque,
-    "velocidade": velocidade,
-    "potencia": potencia,
+    "velocidade_rotacional": velocidade,
     "desgaste_da_ferramenta": desgaste,
     "temperatura_processo": temp_proc,
     "temperatura_ar": temp_ar,
@@ -50,8 +153,10 @@ st.dataframe(input_data)
 # ======================
 if st.button("🚀 Rodar Predição"):
     try:
-        pred = model.predict(input_data)[0]
-        proba = model.predict_proba(input_data)[0]
+        proba_targets = model.predict_frame(input_data).iloc[0]
+        proba_falha = float(proba_targets[config.TARGET])
+        proba = [1 - proba_falha, proba_falha]
+        pred = int(proba_falha > 0.5)
 
         st.success(f"**Resultado:** {'⚠️ Falha Detectada' if pred == 1 else '✅ Operação Normal'}")
         st.metric("Probabilidade de Falha", f"{proba[1]*100:.2f}%")
@@ -61,9 +166,57 @@ if st.button("🚀 Rodar Predição"):
             "Probabilidade": proba
         }, index=["Normal", "Falha"]))
 
+        # Probabilidade por tipo de falha (modelo multi-saída)
+        tipos = proba_targets.drop(config.TARGET)
+        if not tipos.empty:
+            st.subheader("🔍 Probabilidade por Tipo de Falha")
+            st.bar_chart(tipos.rename("Probabilidade"))
+
+        stats = model.stats()
+        st.caption(f"⚡ Cache de predições: {stats['hits']} hits, {stats['misses']} misses "
+                   f"({stats['hit_rate']*100:.0f}%), {stats['size']}/{stats['max_size']} entradas")
+
     except Exception as e:
         st.error("❌ Erro ao processar a predição")
         st.exception(e)
 
+# ======================
+# 📂 Predição em Lote (CSV)
+# ======================
+st.markdown("---")
+st.subheader("📂 Predição em Lote (CSV)")
+st.markdown("Envie a exportação de telemetria de um turno (mesmas colunas do dataset bruto).")
+
+upload = st.file_uploader("Arquivo CSV", type="csv")
+if upload is not None:
+    try:
+        file_hash, version = content_hash(upload), model_version()
+        result = scored_uploads().get(file_hash, version)
+        if result is not None:
+            st.info("⚡ Arquivo já pontuado com este modelo: resultado reutilizado do cache")
+            st.dataframe(result["top"], use_container_width=True)
+        else:
+            progress = st.progress(0.0, text="Pontuando...")
+            table = st.empty()
+            result = score_upload(upload, RESULTS_DIR / f"{file_hash}_{version}.csv", progress, table)
+            scored_uploads().put(file_hash, version, result)
+
+        st.success(f"✅ {result['rows']:,} linhas pontuadas | "
+                   f"{result['failures']:,} com falha prevista (probabilidade > 50%)")
+        # O download_button lê o arquivo inteiro para a memória do servidor:
+        # acima de config.APP_DOWNLOAD_MAX_MB o CSV fica só no disco
+        size_mb = Path(result["path"]).stat().st_size / 1024 ** 2
+        if size_mb <= config.APP_DOWNLOAD_MAX_MB:
+            with open(result["path"], "rb") as scored_file:
+                st.download_button("⬇️ Baixar CSV com predições", data=scored_file,
+                                   file_name=f"predicoes_{upload.name}", mime="text/csv")
+        else:
+            st.warning(f"📦 CSV com predições de {size_mb:,.0f} MB, acima do limite de download pelo "
+                       f"navegador ({config.APP_DOWNLOAD_MAX_MB} MB). Arquivo completo em: {result['path']}")
+
+    except Exception as e:
+        st.error("❌ Erro ao processar o arquivo")
+        st.exception(e)
+
 st.markdown("---")
-st.markdown("**Produzido por Leonardo Correia** 🚀")
\ No newline at end of file
+st.markdown("**Produzido por Leonardo Correia** 🚀")
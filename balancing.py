@@ -0,0 +1,184 @@
+# balancing.py
+# -*- coding: utf-8 -*-
+"""
+BALANCEAMENTO DO CONJUNTO DE TREINO
+-----------------------------------
+Estratégias para o desbalanceamento da falha geral (config.TARGET),
+selecionadas em config.BALANCING:
+  * "smote":        oversampling sintético (kNN sobre todas as features)
+  * "smotenc":      SMOTE-NC; colunas vindas do encoder categórico são
+                    tratadas como categóricas e só as numéricas são interpoladas
+  * "undersample":  subamostragem aleatória da classe majoritária
+  * "balanced_bootstrap": cada árvore vê um bootstrap balanceado
+                    (como o BalancedRandomForest do imblearn, mas multi-saída)
+  * "class_weight": pesos "balanced" da falha geral como sample_weight
+  * "none":         sem balanceamento
+- Reamostragem aplicada apenas no treino (depois do split)
+- Com vários targets, cada linha sintética herda os tipos de falha da
+  amostra positiva real mais próxima (o SMOTE interpola entre positivos)
+- Usado pelo train.py, experiments.py e tune.py
+"""
+
+import time
+
+import numpy as np
+import config
+from instrumentation import step
+
+RESAMPLING_METHODS = ("none", "smote", "smotenc", "undersample")
+BALANCING_STRATEGIES = RESAMPLING_METHODS + ("balanced_bootstrap", "class_weight")
+
+
+def _fit_targets(Y):
+    """Y 2D para o estimador (1D quando há um único target)"""
+    return Y[:, 0] if Y.shape[1] == 1 else Y
+
+
+def categorical_indices(feature_columns, encoder=None):
+    """Índices das features geradas pelo encoder categórico (usados pelo "smotenc")"""
+    if encoder is None:
+        return []
+    encoded = set(encoder.feature_names_out_)
+    return [i for i, col in enumerate(feature_columns) if col in encoded]
+
+
+def synthetic_labels(X_train, Y_train, X_resampled, main_idx=0):
+    """
+    Matriz de targets para a saída de um oversampler. As primeiras linhas
+    são as originais; as demais são sintéticas e positivas no target principal.
+    """
+    n_original = len(X_train)
+    X_new = X_resampled[n_original:]
+    if len(X_new) == 0:
+        return np.asarray(Y_train)
+
+    from sklearn.neighbors import NearestNeighbors
+    positives = np.flatnonzero(Y_train[:, main_idx] == 1)
+    nn = NearestNeighbors(n_neighbors=1).fit(X_train[positives])
+    nearest = positives[nn.kneighbors(X_new, return_distance=False)[:, 0]]
+    Y_new = Y_train[nearest].copy()
+    Y_new[:, main_idx] = 1
+    return np.vstack([Y_train, Y_new])
+
+
+def resample(X_train, Y_train, method="smote", main_idx=0, seed=None, categorical_idx=None):
+    """
+    Reamostra (X_train, Y_train) com `method` (ver RESAMPLING_METHODS).
+    Y_train é 2D (uma coluna por target); retorna (X, Y) reamostrados.
+    `categorical_idx` (índices de colunas categóricas) é usado pelo "smotenc".
+    """
+    if method not in RESAMPLING_METHODS:
+        raise ValueError(f"Reamostragem inválida: '{method}'. Use um de {RESAMPLING_METHODS}")
+    if method == "none":
+        return X_train, Y_train
+
+    seed = config.SEED if seed is None else seed
+    y = Y_train[:, main_idx]
+
+    if method == "undersample":
+        from imblearn.under_sampling import RandomUnderSampler
+        sampler = RandomUnderSampler(random_state=seed)
+        sampler.fit_resample(X_train, y)
+        rows = np.sort(sampler.sample_indices_)
+        return X_train[rows], Y_train[rows]
+
+    if method == "smotenc" and categorical_idx:
+        from imblearn.over_sampling import SMOTENC
+        sampler = SMOTENC(categorical_features=list(categorical_idx), random_state=seed)
+    else:
+        from imblearn.over_sampling import SMOTE
+        sampler = SMOTE(random_state=seed)
+    X_res, _ = sampler.fit_resample(X_train, y)
+    return X_res, synthetic_labels(X_train, Y_train, X_res, main_idx)
+
+
+def balanced_bootstrap_forest(model, X, Y, main_idx=0, seed=None):
+    """
+    Ajusta `model` (RandomForestClassifier) com um bootstrap balanceado por
+    árvore: cada árvore sorteia, com reposição, o mesmo número de linhas de
+    cada classe da falha geral (o tamanho da classe minoritária).
+
+    Como no RandomForest do sklearn, o bootstrap vira sample_weight sobre o
+    dataset inteiro, então todas as árvores conhecem todas as classes de
+    todos os targets e o modelo continua compatível com predict_proba,
+    inference.py e fast_forest.py.
+    """
+    from joblib import Parallel, delayed
+    from sklearn.base import clone
+    from sklearn.tree import DecisionTreeClassifier
+
+    seed = config.SEED if seed is None else seed
+    params = model.get_params()
+    y = Y[:, main_idx]
+    class_rows = [np.flatnonzero(y == c) for c in np.unique(y)]
+    n_per_class = min(len(rows) for rows in class_rows)
+    rng = np.random.RandomState(seed)
+    tree_seeds = rng.randint(np.iinfo(np.int32).max, size=params["n_estimators"])
+
+    template = DecisionTreeClassifier(
+        criterion=params["criterion"], max_depth=params["max_depth"],
+        min_samples_split=params["min_samples_split"], min_samples_leaf=params["min_samples_leaf"],
+        min_weight_fraction_leaf=params["min_weight_fraction_leaf"], max_features=params["max_features"],
+        max_leaf_nodes=params["max_leaf_nodes"], min_impurity_decrease=params["min_impurity_decrease"],
+        ccp_alpha=params["ccp_alpha"],
+    )
+
+    def build(tree_seed):
+        tree_rng = np.random.RandomState(tree_seed)
+        rows = np.concatenate([tree_rng.choice(r, n_per_class, replace=True) for r in class_rows])
+        weight = np.bincount(rows, minlength=len(X)).astype(np.float64)
+        return clone(template).set_params(random_state=tree_seed).fit(X, _fit_targets(Y), sample_weight=weight)
+
+    trees = Parallel(n_jobs=params["n_jobs"], prefer="threads")(delayed(build)(s) for s in tree_seeds)
+
+    # Mesmo estado de um RandomForestClassifier ajustado
+    model.estimator_ = template
+    model.estimators_ = trees
+    model.classes_ = trees[0].classes_
+    model.n_classes_ = trees[0].n_classes_
+    model.n_outputs_ = trees[0].n_outputs_
+    model.n_features_in_ = trees[0].n_features_in_
+    return model
+
+
+def fit_balanced(model, X_train, Y_train, strategy=None, main_idx=0, seed=None, categorical_idx=None):
+    """
+    Ajusta `model` com a estratégia de balanceamento `strategy`
+    (padrão config.BALANCING). Retorna (modelo, estatísticas) com tempo de
+    reamostragem, tempo de treino e nº de linhas efetivamente usadas.
+    """
+    strategy = strategy or config.BALANCING
+    if strategy not in BALANCING_STRATEGIES:
+        raise ValueError(f"Balanceamento inválido: '{strategy}'. Use um de {BALANCING_STRATEGIES}")
+    seed = config.SEED if seed is None else seed
+
+    start = time.perf_counter()
+    fit_kwargs = {}
+    with step(f"resample[{strategy}]"):
+        if strategy in RESAMPLING_METHODS:
+            X_fit, Y_fit = resample(X_train, Y_train, strategy, main_idx, seed, categorical_idx)
+        else:
+            X_fit, Y_fit = X_train, Y_train
+            if strategy == "class_weight":
+                from sklearn.utils.class_weight import compute_sample_weight
+                fit_kwargs["sample_weight"] = compute_sample_weight("balanced", Y_train[:, main_idx])
+    resample_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    with step("fit"):
+        if strategy == "balanced_bootstrap":
+            from sklearn.ensemble import RandomForestClassifier
+            if type(model) is not RandomForestClassifier:
+                raise ValueError("'balanced_bootstrap' requer RandomForestClassifier")
+            model = balanced_bootstrap_forest(model, X_fit, Y_fit, main_idx, seed)
+        else:
+            model.fit(X_fit, _fit_targets(Y_fit), **fit_kwargs)
+    fit_s = time.perf_counter() - start
+
+    return model, {
+        "strategy": strategy,
+        "resample_s": resample_s,
+        "fit_s": fit_s,
+        "train_rows": int(len(X_fit)),
+        "train_positives": int(Y_fit[:, main_idx].sum()),
+    }
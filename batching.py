@@ -0,0 +1,145 @@
+# batching.py
+# -*- coding: utf-8 -*-
+"""
+MICRO-BATCHING DE PREDIÇÕES
+---------------------------
+- predict_proba de um RandomForest em 1 linha tem custo fixo alto (e com
+  n_jobs=-1 ainda despacha threads a cada chamada)
+- O MicroBatcher junta as requisições concorrentes por até `max_wait_ms`
+  ou até `max_batch_size` linhas, faz UMA chamada vetorizada e devolve a
+  fatia de cada chamador
+- Cada `key` de submit() tem fila e janela próprias: só registros do mesmo
+  tipo (ex.: brutos x tratados na API) são agrupados na mesma chamada
+- stats() expõe vazão e latências (p50/p95/p99) para calibrar a janela
+"""
+
+import asyncio
+import time
+from collections import deque
+
+import numpy as np
+
+
+class MicroBatcher:
+    """
+    Coalescedor assíncrono de requisições.
+
+    `score_fn(records) -> list` recebe a lista concatenada de registros e
+    devolve um resultado por registro; roda em `executor` (fora do event loop).
+    Requisições com `key` diferentes nunca dividem a mesma chamada.
+    """
+
+    def __init__(self, score_fn, max_batch_size=256, max_wait_ms=5.0, executor=None,
+                 latency_window=10000):
+        self.score_fn = score_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.executor = executor
+        self._queues = {}
+        self._tasks = {}
+        self._running = False
+        self._latencies = deque(maxlen=latency_window)
+        self._batch_sizes = deque(maxlen=latency_window)
+        self._n_requests = 0
+        self._n_rows = 0
+        self._started_at = None
+
+    # =====================
+    # Ciclo de vida
+    # =====================
+    async def start(self):
+        self._started_at = time.perf_counter()
+        self._running = True
+
+    async def stop(self):
+        self._running = False
+        for task in self._tasks.values():
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._queues, self._tasks = {}, {}
+
+    def _queue_for(self, key):
+        """Fila (e loop de coalescência) da chave, criada no primeiro uso"""
+        if key not in self._queues:
+            self._queues[key] = asyncio.Queue()
+            self._tasks[key] = asyncio.get_running_loop().create_task(self._run(self._queues[key]))
+        return self._queues[key]
+
+    # =====================
+    # API pública
+    # =====================
+    async def submit(self, records, key=None):
+        """Enfileira os registros de uma requisição (na fila de `key`) e aguarda os resultados"""
+        if not self._running:
+            raise RuntimeError("MicroBatcher não iniciado (chame start())")
+        future = asyncio.get_running_loop().create_future()
+        await self._queue_for(key).put((records, future, time.perf_counter()))
+        return await future
+
+    def stats(self):
+        """Vazão e latência observadas (janela das últimas requisições)"""
+        latencies = np.asarray(self._latencies) * 1000.0
+        elapsed = time.perf_counter() - self._started_at if self._started_at else 0.0
+        return {
+            "requests": self._n_requests,
+            "rows": self._n_rows,
+            "batches": len(self._batch_sizes),
+            "mean_batch_rows": float(np.mean(self._batch_sizes)) if self._batch_sizes else 0.0,
+            "throughput_rows_per_s": self._n_rows / elapsed if elapsed else 0.0,
+            "latency_ms": {
+                "p50": float(np.percentile(latencies, 50)) if len(latencies) else 0.0,
+                "p95": float(np.percentile(latencies, 95)) if len(latencies) else 0.0,
+                "p99": float(np.percentile(latencies, 99)) if len(latencies) else 0.0,
+            },
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000.0,
+        }
+
+    # =====================
+    # Loop de coalescência
+    # =====================
+    async def _collect(self, queue):
+        """Primeira requisição bloqueia; as seguintes entram até a janela fechar"""
+        pending = [await queue.get()]
+        n_rows = len(pending[0][0])
+        deadline = time.perf_counter() + self.max_wait
+
+        while n_rows < self.max_batch_size:
+            timeout = deadline - time.perf_counter()
+            if timeout <= 0:
+                break
+            try:
+                item = await asyncio.wait_for(queue.get(), timeout)
+            except asyncio.TimeoutError:
+                break
+            pending.append(item)
+            n_rows += len(item[0])
+        return pending
+
+    async def _run(self, queue):
+        loop = asyncio.get_running_loop()
+        while True:
+            pending = await self._collect(queue)
+            records = [record for batch, _, _ in pending for record in batch]
+            try:
+                results = await loop.run_in_executor(self.executor, self.score_fn, records)
+            except Exception as e:
+                for _, future, _ in pending:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            done_at = time.perf_counter()
+            start = 0
+            for batch, future, submitted_at in pending:
+                if not future.done():
+                    future.set_result(results[start:start + len(batch)])
+                start += len(batch)
+                self._latencies.append(done_at - submitted_at)
+
+            self._n_requests += len(pending)
+            self._n_rows += len(records)
+            self._batch_sizes.append(len(records))
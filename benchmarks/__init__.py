@@ -0,0 +1,9 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmarks do pipeline (executar a partir da raiz do projeto)
+--------------------------------------------------------------
+  python -m benchmarks.bench_encoding
+  python -m benchmarks.bench_mmap       # carga do modelo em N processos
+  python -m benchmarks.startup          # orçamento de import dos pontos de entrada
+  python -m benchmarks.suite            # todas as etapas em 1x/10x/100x
+"""
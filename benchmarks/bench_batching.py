@@ -0,0 +1,98 @@
+# bench_batching.py
+# -*- coding: utf-8 -*-
+"""
+Benchmark - MICRO-BATCHING
+--------------------------
+Simula N clientes concorrentes enviando 1 registro por requisição e
+compara o scoring direto (1 predict_proba por requisição) com o
+MicroBatcher em diferentes janelas de espera.
+
+Uso:
+  python -m benchmarks.bench_batching --clients 64 --requests 2000
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+import config
+from api import _score
+from batching import MicroBatcher
+from dataset_io import load_processed
+from inference import load_pipeline
+
+
+async def _drive(submit, records, clients):
+    """Dispara `records` com no máximo `clients` requisições simultâneas"""
+    semaphore = asyncio.Semaphore(clients)
+    latencies = []
+
+    async def one(record):
+        async with semaphore:
+            start = time.perf_counter()
+            await submit([record])
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(r) for r in records))
+    elapsed = time.perf_counter() - start
+    latencies = np.asarray(latencies) * 1000.0
+    return {
+        "throughput_rows_per_s": len(records) / elapsed,
+        "p50_ms": float(np.percentile(latencies, 50)),
+        "p99_ms": float(np.percentile(latencies, 99)),
+    }
+
+
+async def bench(pipeline, records, clients, windows, max_batch_size):
+    executor = ThreadPoolExecutor(max_workers=config.INFERENCE_API["workers"])
+    loop = asyncio.get_running_loop()
+    results = []
+
+    async def direct(batch):
+        return await loop.run_in_executor(executor, _score, pipeline, batch)
+
+    results.append(dict(mode="direto", max_wait_ms=0.0, **await _drive(direct, records, clients)))
+
+    for window in windows:
+        batcher = MicroBatcher(lambda batch: _score(pipeline, batch), max_batch_size=max_batch_size,
+                               max_wait_ms=window, executor=executor)
+        await batcher.start()
+        row = await _drive(batcher.submit, records, clients)
+        row["mean_batch_rows"] = batcher.stats()["mean_batch_rows"]
+        await batcher.stop()
+        results.append(dict(mode="micro-batch", max_wait_ms=window, **row))
+
+    executor.shutdown()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de micro-batching")
+    parser.add_argument("--clients", type=int, default=64)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--windows", type=float, nargs="+", default=[1.0, 2.0, 5.0, 10.0])
+    parser.add_argument("--max-batch-size", type=int, default=config.INFERENCE_API["batch_max_size"])
+    parser.add_argument("--output", default=str(config.METRICS_DIR / "bench_batching.json"))
+    args = parser.parse_args()
+
+    pipeline = load_pipeline(config.PIPELINE_PATH)
+    pipeline.set_n_jobs(config.INFERENCE_API["model_n_jobs"])
+    df = load_processed(config.DATA_PROCESSED).head(args.requests)
+    records = df[pipeline.feature_columns].to_dict(orient="records")
+
+    results = asyncio.run(bench(pipeline, records, args.clients, args.windows, args.max_batch_size))
+    print(pd.DataFrame(results).round(2).to_string(index=False))
+
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=4)
+    print("✅ Resultados salvos em:", args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+# bench_encoding.py
+# -*- coding: utf-8 -*-
+"""
+Benchmark - CODIFICAÇÃO CATEGÓRICA
+----------------------------------
+Compara o get_dummies antigo (modo "onehot") com os modos compactos de
+encoding.CategoricalEncoder sobre config.DATA_RAW:
+  - largura final do dataset tratado
+  - memória do DataFrame
+  - tempo de encoding, de escrita do CSV e (opcional) de treino
+
+Uso:
+  python -m benchmarks.bench_encoding
+  python -m benchmarks.bench_encoding --fit --n-estimators 50
+"""
+
+import argparse
+import json
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+
+import config
+from encoding import CategoricalEncoder, ENCODING_MODES
+
+
+def _load_raw():
+    df = pd.read_csv(config.DATA_RAW)
+    df = df.drop_duplicates().ffill().bfill()
+    target = df[config.TARGET].astype(str).str.strip().str.lower()
+    df[config.TARGET] = target.isin({"1", "sim", "s", "true", "verdadeiro", "y"}).astype(int)
+    return df
+
+
+def bench_mode(df, mode, fit=False, n_estimators=50):
+    result = {"mode": mode}
+
+    start = time.perf_counter()
+    encoder = CategoricalEncoder(mode=mode)
+    encoded = encoder.fit_transform(df, y=df[config.TARGET])
+    result["encode_s"] = time.perf_counter() - start
+    result["n_columns"] = encoded.shape[1]
+    result["memory_mb"] = encoded.memory_usage(deep=True).sum() / 1024 ** 2
+
+    with tempfile.TemporaryDirectory() as tmp:
+        out = Path(tmp) / "dataset.csv"
+        start = time.perf_counter()
+        encoded.to_csv(out, index=False)
+        result["write_csv_s"] = time.perf_counter() - start
+        result["csv_mb"] = out.stat().st_size / 1024 ** 2
+
+    if fit:
+        from sklearn.ensemble import RandomForestClassifier
+        X = encoded.select_dtypes(exclude=["object", "string"]).drop(columns=[config.TARGET])
+        params = dict(config.MODEL_PARAMS, n_estimators=n_estimators)
+        start = time.perf_counter()
+        RandomForestClassifier(**params).fit(X, encoded[config.TARGET])
+        result["fit_s"] = time.perf_counter() - start
+
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de codificação categórica")
+    parser.add_argument("--modes", nargs="+", choices=ENCODING_MODES, default=list(ENCODING_MODES))
+    parser.add_argument("--fit", action="store_true", help="Inclui o tempo de treino do RandomForest")
+    parser.add_argument("--n-estimators", type=int, default=50)
+    parser.add_argument("--output", type=Path, default=config.METRICS_DIR / "bench_encoding.json")
+    args = parser.parse_args()
+
+    print("📥 Carregando dados de:", config.DATA_RAW)
+    df = _load_raw()
+
+    results = []
+    for mode in args.modes:
+        print(f"⏱️  Modo: {mode}")
+        results.append(bench_mode(df, mode, fit=args.fit, n_estimators=args.n_estimators))
+
+    table = pd.DataFrame(results).set_index("mode")
+    print(table.round(3).to_string())
+
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=4)
+    print("✅ Resultados salvos em:", args.output)
+
+
+if __name__ == "__main__":
+    main()
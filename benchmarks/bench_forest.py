@@ -0,0 +1,86 @@
+# bench_forest.py
+# -*- coding: utf-8 -*-
+"""
+Benchmark - FOREST EM ARRAYS x SKLEARN
+--------------------------------------
+Compara fast_forest.ArrayForest com model.predict_proba do modelo salvo:
+  - igualdade das probabilidades (máx. diferença absoluta)
+  - latência por chamada para lotes de 1 linha até o dataset inteiro
+
+Uso:
+  python -m benchmarks.bench_forest
+"""
+
+import argparse
+import json
+import time
+
+import numpy as np
+import pandas as pd
+
+import config
+from dataset_io import load_processed
+from fast_forest import ArrayForest
+from inference import load_pipeline
+
+
+def _latency_ms(fn, X, repeat):
+    fn(X)  # aquecimento
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn(X)
+    return (time.perf_counter() - start) / repeat * 1000.0
+
+
+def _as_list(proba):
+    return proba if isinstance(proba, list) else [proba]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do forest em arrays")
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 8, 64, 512, 4096, 0],
+                        help="0 = dataset inteiro")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--output", default=str(config.METRICS_DIR / "bench_forest.json"))
+    args = parser.parse_args()
+
+    pipeline = load_pipeline(config.PIPELINE_PATH, mmap=False)
+    model = pipeline.model
+    X = pipeline.to_array(pipeline.prepare(load_processed(config.DATA_PROCESSED)))
+
+    start = time.perf_counter()
+    forest = ArrayForest.from_sklearn(model)
+    export_s = time.perf_counter() - start
+    print(f"📦 Exportado em {export_s:.3f}s: {len(forest.feature)} nós, "
+          f"{forest.n_estimators} árvores, profundidade {forest.max_depth}")
+
+    n_jobs = model.n_jobs
+    model.n_jobs = 1
+    # Modelos multi-saída devolvem uma matriz por target
+    reference = np.hstack(_as_list(model.predict_proba(X)))
+    candidate = np.hstack(_as_list(forest.predict_proba(X)))
+    exact = bool(np.array_equal(reference, candidate))
+    max_diff = float(np.abs(reference - candidate).max())
+    print(f"🎯 Igual ao sklearn (n_jobs=1): {exact} (máx. diferença {max_diff:.2e})")
+
+    results = []
+    for batch in args.batch_sizes:
+        X_batch = X if batch == 0 else X[:batch]
+        repeat = max(1, args.repeat if batch and batch <= 512 else 3)
+        row = {"batch_rows": len(X_batch)}
+        for jobs in sorted({1, n_jobs}, key=str):
+            model.n_jobs = jobs
+            row[f"sklearn_n_jobs={jobs}_ms"] = _latency_ms(model.predict_proba, X_batch, repeat)
+        row["array_forest_ms"] = _latency_ms(forest.predict_proba, X_batch, repeat)
+        results.append(row)
+    model.n_jobs = n_jobs
+
+    print(pd.DataFrame(results).round(3).to_string(index=False))
+    with open(args.output, "w") as f:
+        json.dump({"exact": exact, "max_abs_diff": max_diff, "export_s": export_s,
+                   "latency": results}, f, indent=4)
+    print("✅ Resultados salvos em:", args.output)
+
+
+if __name__ == "__main__":
+    main()
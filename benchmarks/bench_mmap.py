@@ -0,0 +1,114 @@
+# bench_mmap.py
+# -*- coding: utf-8 -*-
+"""
+Benchmark - CARGA DO MODELO: PICKLE x MEMORY-MAP
+------------------------------------------------
+Sobe N processos (spawn, como workers de API/Streamlit) que carregam o
+pipeline no formato pickle (joblib.load) ou memory-map (<pipeline>.mmap/)
+e fazem uma predição. Com todos vivos ao mesmo tempo mede em cada um:
+  - tempo de carga do pipeline (com os módulos já importados)
+  - RSS total e o acréscimo de RSS causado pela carga + predição
+  - PSS (/proc/self/smaps_rollup): páginas compartilhadas são divididas
+    entre os processos, então a soma do PSS mostra a memória física real
+
+Uso:
+  python -m benchmarks.bench_mmap
+  python -m benchmarks.bench_mmap --workers 1 4 8 --rows 2000
+"""
+
+import argparse
+import json
+import multiprocessing as mp
+import time
+
+import pandas as pd
+
+import config
+
+
+def _memory_mb():
+    """(RSS, PSS) do processo em MB (PSS só no Linux)"""
+    values = {}
+    try:
+        with open("/proc/self/smaps_rollup") as f:
+            for line in f:
+                key, _, rest = line.partition(":")
+                if key in ("Rss", "Pss"):
+                    values[key] = int(rest.split()[0]) / 1024.0
+    except OSError:
+        import resource
+        values["Rss"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0
+    return values.get("Rss"), values.get("Pss")
+
+
+def _worker(mmap, rows, barrier, queue):
+    # Módulos já importados, como em um worker que está de pé: mede só a carga do artefato
+    import numpy as np
+    import cleaning, encoding, fast_forest  # noqa: F401
+    from inference import load_pipeline
+
+    rss_before, _ = _memory_mb()
+    start = time.perf_counter()
+    pipeline = load_pipeline(config.PIPELINE_PATH, mmap=mmap)
+    load_s = time.perf_counter() - start
+
+    rng = np.random.RandomState(config.SEED)
+    X = rng.normal(size=(rows, len(pipeline.feature_columns))).astype(np.float32)
+    pipeline.predict_array(X)
+
+    # Todos os workers carregados antes de medir (PSS divide as páginas compartilhadas)
+    barrier.wait()
+    rss, pss = _memory_mb()
+    queue.put({"load_ms": load_s * 1000.0, "rss_mb": rss, "model_rss_mb": rss - rss_before, "pss_mb": pss})
+    barrier.wait()
+
+
+def run(n_workers, mmap, rows):
+    ctx = mp.get_context("spawn")
+    barrier, queue = ctx.Barrier(n_workers), ctx.Queue()
+    procs = [ctx.Process(target=_worker, args=(mmap, rows, barrier, queue)) for _ in range(n_workers)]
+    for proc in procs:
+        proc.start()
+    results = [queue.get() for _ in procs]
+    for proc in procs:
+        proc.join()
+
+    pss = [r["pss_mb"] for r in results if r["pss_mb"] is not None]
+    return {
+        "format": "mmap" if mmap else "pickle",
+        "workers": n_workers,
+        "load_ms_mean": sum(r["load_ms"] for r in results) / n_workers,
+        "load_ms_max": max(r["load_ms"] for r in results),
+        "model_rss_mb_per_worker": sum(r["model_rss_mb"] for r in results) / n_workers,
+        "rss_mb_total": sum(r["rss_mb"] for r in results),
+        "pss_mb_total": sum(pss) if pss else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Carga do modelo: pickle x memory-map em N processos")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--rows", type=int, default=1000, help="Linhas da predição feita após a carga")
+    parser.add_argument("--output", default=str(config.METRICS_DIR / "bench_mmap.json"))
+    args = parser.parse_args()
+
+    from inference import mmap_path
+    if not (mmap_path(config.PIPELINE_PATH) / "pipeline.pkl").exists():
+        raise SystemExit(f"❌ Formato memory-map não encontrado em {mmap_path(config.PIPELINE_PATH)}. "
+                         "Execute o treino novamente.")
+
+    results = []
+    for n_workers in args.workers:
+        for mmap in (False, True):
+            results.append(run(n_workers, mmap, args.rows))
+            print(f"   {results[-1]['format']:>6} x{n_workers}: carga {results[-1]['load_ms_mean']:.1f} ms")
+
+    table = pd.DataFrame(results)
+    print(table.round(1).to_string(index=False))
+    with open(args.output, "w") as f:
+        json.dump({"rows": args.rows, "results": results}, f, indent=4)
+    print("✅ Resultados salvos em:", args.output)
+
+
+if __name__ == "__main__":
+    main()
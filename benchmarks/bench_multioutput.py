@@ -0,0 +1,104 @@
+# bench_multioutput.py
+# -*- coding: utf-8 -*-
+"""
+Benchmark - FOREST MULTI-SAÍDA x UM MODELO POR TARGET
+-----------------------------------------------------
+Compara, sobre config.DATA_PROCESSED e os targets de config.TARGETS:
+  - um único RandomForest multi-saída (uma passada, como no train.py)
+  - um RandomForest por target (abordagem antiga, N passadas)
+Mede tempo de treino, throughput de predict_proba (linhas/s) e F1 por target.
+
+Uso:
+  python -m benchmarks.bench_multioutput
+  python -m benchmarks.bench_multioutput --n-estimators 50
+"""
+
+import argparse
+import json
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.metrics import f1_score
+from sklearn.model_selection import train_test_split
+
+import config
+from cleaning import load_cleaner
+from dataset_io import load_processed
+from inference import positive_proba
+
+
+def _load_xy():
+    df = load_processed(config.DATA_PROCESSED)
+    cleaner = load_cleaner(config.CLEANER_PATH, df)
+    X, Y = cleaner.split(cleaner.transform(df))
+    if isinstance(Y, pd.Series):
+        Y = Y.to_frame()
+    return np.ascontiguousarray(X.to_numpy(dtype=np.float32)), Y.to_numpy(dtype=np.uint8), list(Y.columns)
+
+
+def _timed(fn, *args):
+    start = time.perf_counter()
+    out = fn(*args)
+    return out, time.perf_counter() - start
+
+
+def bench_multioutput(X_train, Y_train, X_test, Y_test, targets, params):
+    model, fit_s = _timed(RandomForestClassifier(**params).fit, X_train, Y_train)
+    proba, predict_s = _timed(model.predict_proba, X_test)
+    P = np.column_stack([positive_proba(p, c) for p, c in zip(proba, model.classes_)])
+    return {
+        "strategy": "multi-output (1 modelo)",
+        "fit_s": fit_s,
+        "predict_s": predict_s,
+        "rows_per_s": len(X_test) / predict_s,
+        **{f"f1[{t}]": f1_score(Y_test[:, i], P[:, i] > 0.5, zero_division=0) for i, t in enumerate(targets)},
+    }
+
+
+def bench_per_target(X_train, Y_train, X_test, Y_test, targets, params):
+    fit_s = predict_s = 0.0
+    result = {"strategy": f"um modelo por target ({len(targets)} modelos)"}
+    f1 = {}
+    for i, target in enumerate(targets):
+        model, elapsed = _timed(RandomForestClassifier(**params).fit, X_train, Y_train[:, i])
+        fit_s += elapsed
+        proba, elapsed = _timed(model.predict_proba, X_test)
+        predict_s += elapsed
+        f1[f"f1[{target}]"] = f1_score(Y_test[:, i], positive_proba(proba, model.classes_) > 0.5, zero_division=0)
+    result.update(fit_s=fit_s, predict_s=predict_s, rows_per_s=len(X_test) / predict_s, **f1)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do forest multi-saída")
+    parser.add_argument("--n-estimators", type=int, default=config.MODEL_PARAMS["n_estimators"])
+    parser.add_argument("--output", type=Path, default=config.METRICS_DIR / "bench_multioutput.json")
+    args = parser.parse_args()
+
+    print("📥 Carregando dados tratados de:", config.DATA_PROCESSED)
+    X, Y, targets = _load_xy()
+    main_idx = targets.index(config.TARGET)
+    X_train, X_test, Y_train, Y_test = train_test_split(
+        X, Y, test_size=config.TEST_SIZE, random_state=config.SEED, stratify=Y[:, main_idx]
+    )
+    params = dict(config.MODEL_PARAMS, n_estimators=args.n_estimators)
+    print(f"📊 Treino {X_train.shape}, teste {X_test.shape}, targets: {targets}")
+
+    results = []
+    for bench in (bench_multioutput, bench_per_target):
+        print(f"⏱️  {bench.__name__}")
+        results.append(bench(X_train, Y_train, X_test, Y_test, targets, params))
+
+    table = pd.DataFrame(results).set_index("strategy")
+    print(table.round(4).T.to_string())
+
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=4)
+    print("✅ Resultados salvos em:", args.output)
+
+
+if __name__ == "__main__":
+    main()
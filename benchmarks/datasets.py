@@ -0,0 +1,26 @@
+# datasets.py
+# -*- coding: utf-8 -*-
+"""
+Datasets escalados para os benchmarks
+-------------------------------------
+make_scaled_dataset(scale, path) grava `scale` vezes o nº de linhas de
+config.DATA_RAW usando o gerador de telemetria sintética (synthetic.py),
+com o mesmo schema e as mesmas particularidades do dado real. A escrita é
+feita em blocos, sem montar o dataset em memória.
+"""
+
+from pathlib import Path
+
+import config
+from synthetic import generate
+
+
+def raw_row_count(source=None):
+    """Nº de linhas de dados (sem cabeçalho) de `source` (padrão config.DATA_RAW)"""
+    with open(source or config.DATA_RAW, "rb") as f:
+        return sum(block.count(b"\n") for block in iter(lambda: f.read(1 << 20), b"")) - 1
+
+
+def make_scaled_dataset(scale, path, source=None):
+    """Grava em `path` um CSV sintético com `scale` vezes as linhas de `source`"""
+    return generate(scale * raw_row_count(source), Path(path))
@@ -0,0 +1,95 @@
+# startup.py
+# -*- coding: utf-8 -*-
+"""
+Benchmark - ORÇAMENTO DE INICIALIZAÇÃO
+--------------------------------------
+Importa cada ponto de entrada de config.STARTUP_BUDGET em um processo novo
+com `python -X importtime` e verifica:
+  - tempo cumulativo do import do módulo (melhor de N execuções) contra o
+    orçamento em ms
+  - módulos proibidos (ex.: sklearn e imblearn fora das etapas de treino)
+Sai com código 1 se algum ponto de entrada estourar o orçamento, para uso
+em CI, como a detecção de regressões da suite.
+
+Uso:
+  python -m benchmarks.startup
+  python -m benchmarks.startup --repeat 5
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+import time
+
+import config
+
+
+def import_profile(module):
+    """(ms cumulativos do import de `module`, nomes importados, wall do processo em ms)"""
+    start = time.perf_counter()
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                          cwd=config.ROOT, capture_output=True, text=True)
+    wall_ms = (time.perf_counter() - start) * 1000.0
+    if proc.returncode != 0:
+        raise RuntimeError(f"Falha ao importar {module}:\n{proc.stderr[-2000:]}")
+
+    cumulative_ms, imported = None, set()
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        name = name.strip()
+        imported.add(name)
+        if name == module:
+            cumulative_ms = int(cumulative) / 1000.0
+    return cumulative_ms, imported, wall_ms
+
+
+def _is_loaded(forbidden, imported):
+    return any(name == forbidden or name.startswith(forbidden + ".") for name in imported)
+
+
+def check(budgets, repeat=3):
+    """Uma linha de resultado por ponto de entrada (com 'ok' False se violar o orçamento)"""
+    results = []
+    for module, spec in budgets.items():
+        runs = [import_profile(module) for _ in range(repeat)]
+        import_ms = min(run[0] for run in runs)
+        wall_ms = min(run[2] for run in runs)
+        loaded = [name for name in spec.get("forbidden", []) if _is_loaded(name, runs[0][1])]
+        results.append({
+            "module": module,
+            "import_ms": import_ms,
+            "process_ms": wall_ms,
+            "budget_ms": spec["budget_ms"],
+            "forbidden_loaded": loaded,
+            "ok": import_ms <= spec["budget_ms"] and not loaded,
+        })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Orçamento de tempo de import dos pontos de entrada")
+    parser.add_argument("--repeat", type=int, default=3, help="Execuções por módulo (vale a melhor)")
+    parser.add_argument("--output", default=str(config.METRICS_DIR / "bench_startup.json"))
+    args = parser.parse_args()
+
+    results = check(config.STARTUP_BUDGET, args.repeat)
+    for row in results:
+        status = "✅" if row["ok"] else "❌"
+        extra = f" | importou {row['forbidden_loaded']}" if row["forbidden_loaded"] else ""
+        print(f"{status} {row['module']:<12} import {row['import_ms']:8.1f} ms "
+              f"(orçamento {row['budget_ms']} ms, processo {row['process_ms']:.0f} ms){extra}")
+
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=4)
+    print("✅ Resultados salvos em:", args.output)
+
+    if not all(row["ok"] for row in results):
+        print("❌ Orçamento de inicialização estourado")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
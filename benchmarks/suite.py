@@ -0,0 +1,222 @@
+# suite.py
+# -*- coding: utf-8 -*-
+"""
+Benchmark - SUÍTE DO PIPELINE COMPLETO
+--------------------------------------
+Mede cada etapa em datasets sintéticos (synthetic.py) de 1x, 10x e 100x o
+tamanho de config.DATA_RAW (config.BENCHMARK["scales"]), sem rede e sem
+tocar nos artefatos reais:
+  - preprocess.main, train.main, evaluate.main
+  - geração do CSV de predições (dash.generate_predictions_csv)
+  - predição de 1 linha (latência p50/p95) e em lote (linhas/s)
+
+Cada etapa roda em um subprocesso próprio com os caminhos do config
+redirecionados para um diretório temporário; são registrados tempo de
+parede, tempo de CPU e pico de memória (RSS máximo do processo).
+
+Os resultados vão para config.METRICS_DIR/bench_suite.json. Com um baseline
+salvo (config.BENCHMARK["baseline_path"], criado com --update-baseline), a
+suíte termina com código 1 se alguma etapa piorar além do limite
+configurado (--threshold / config.BENCHMARK["regression_threshold"]).
+
+Uso:
+  python -m benchmarks.suite
+  python -m benchmarks.suite --scales 1 10 --update-baseline
+  python -m benchmarks.suite --scales 1 --threshold 0.5
+"""
+
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+import config
+
+STAGES = ["preprocess", "train", "evaluate", "predictions_csv", "predict_single", "predict_batch"]
+
+# Caminhos do config redirecionados para o diretório de trabalho da suíte
+_PATHS = {
+    "DATA_PROCESSED": "dataset_tratado.feather",
+    "DATA_PROCESSED_CSV": "dataset_tratado.csv",
+    "MODEL_PATH": "modelo.pkl",
+    "ENCODER_PATH": "encoder.pkl",
+    "CLEANER_PATH": "cleaner.pkl",
+    "PIPELINE_PATH": "pipeline.pkl",
+    "METRICS_PATH": "metrics.json",
+    "BALANCING_REPORT_PATH": "balancing.json",
+    "PREDICTIONS_DIR": "predictions",
+}
+
+
+def _use_workdir(workdir):
+    workdir = Path(workdir)
+    config.DATA_RAW = workdir / "raw.csv"
+    for name, filename in _PATHS.items():
+        setattr(config, name, workdir / filename)
+    config.PREDICTIONS_DIR.mkdir(exist_ok=True)
+
+
+def _raw_sample(n_rows):
+    import pandas as pd
+    return pd.read_csv(config.DATA_RAW, nrows=n_rows)
+
+
+def _run_stage(stage):
+    """Executa uma etapa no processo atual; retorna métricas extras da etapa"""
+    if stage == "preprocess":
+        import preprocess
+        preprocess.main()
+    elif stage == "train":
+        import train
+        train.main()
+    elif stage == "evaluate":
+        import evaluate
+        evaluate.main()
+    elif stage == "predictions_csv":
+        import dash
+        dash.generate_predictions_csv(config.PIPELINE_PATH, config.DATA_PROCESSED,
+                                      config.PREDICTIONS_DIR / "predictions.csv")
+    elif stage == "predict_single":
+        from inference import load_pipeline
+        pipeline = load_pipeline(config.PIPELINE_PATH)
+        rows = _raw_sample(config.BENCHMARK["single_repeat"])
+        latencies = []
+        for i in range(len(rows)):
+            start = time.perf_counter()
+            pipeline.predict_frame(rows.iloc[[i]])
+            latencies.append((time.perf_counter() - start) * 1000.0)
+        return {"p50_ms": float(np.percentile(latencies, 50)), "p95_ms": float(np.percentile(latencies, 95))}
+    elif stage == "predict_batch":
+        from inference import load_pipeline
+        pipeline = load_pipeline(config.PIPELINE_PATH)
+        rows = _raw_sample(config.BENCHMARK["batch_rows"])
+        start = time.perf_counter()
+        pipeline.predict_frame(rows)
+        return {"batch_rows": len(rows), "rows_per_s": len(rows) / (time.perf_counter() - start)}
+    else:
+        raise ValueError(f"Etapa desconhecida: '{stage}'")
+    return {}
+
+
+def run_stage_isolated(stage, workdir, log):
+    """Roda `stage` em um subprocesso (memória isolada) e devolve suas métricas"""
+    result_file = Path(workdir) / f"{stage}.result.json"
+    cmd = [sys.executable, "-m", "benchmarks.suite", "--run-stage", stage,
+           "--workdir", str(workdir), "--result-file", str(result_file)]
+    proc = subprocess.run(cmd, cwd=config.ROOT, stdout=log, stderr=subprocess.STDOUT)
+    if proc.returncode != 0:
+        raise RuntimeError(f"Etapa '{stage}' falhou (código {proc.returncode}); ver {log.name}")
+    with open(result_file) as f:
+        return json.load(f)
+
+
+def _children_cpu():
+    """CPU dos subprocessos já encerrados (pools do experiments/tune)"""
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return usage.ru_utime + usage.ru_stime
+
+
+def _child_main(stage, workdir, result_file):
+    config.init()
+    _use_workdir(workdir)
+    wall, cpu, children = time.perf_counter(), time.process_time(), _children_cpu()
+    extra = _run_stage(stage)
+    result = {
+        "wall_s": time.perf_counter() - wall,
+        "cpu_s": time.process_time() - cpu + _children_cpu() - children,
+        # ru_maxrss em KB no Linux
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0,
+        **extra,
+    }
+    with open(result_file, "w") as f:
+        json.dump(result, f)
+
+
+def compare(results, baseline, threshold):
+    """Lista de regressões (tempo ou memória acima de baseline * (1 + threshold))"""
+    regressions = []
+    for key, current in results.items():
+        reference = baseline.get(key)
+        if not reference:
+            continue
+        for metric in ("wall_s", "peak_rss_mb"):
+            if metric in reference and current[metric] > reference[metric] * (1 + threshold):
+                regressions.append(f"{key} {metric}: {current[metric]:.3f} > "
+                                   f"{reference[metric]:.3f} (+{threshold:.0%})")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de todas as etapas do pipeline")
+    parser.add_argument("--scales", type=int, nargs="+", default=config.BENCHMARK["scales"])
+    parser.add_argument("--stages", nargs="+", choices=STAGES, default=STAGES)
+    parser.add_argument("--threshold", type=float, default=config.BENCHMARK["regression_threshold"],
+                        help="Piora relativa tolerada em relação ao baseline (0.25 = 25%%)")
+    parser.add_argument("--baseline", type=Path, default=config.BENCHMARK["baseline_path"])
+    parser.add_argument("--update-baseline", action="store_true", help="Salva os resultados como novo baseline")
+    parser.add_argument("--output", type=Path, default=config.METRICS_DIR / "bench_suite.json")
+    parser.add_argument("--run-stage", choices=STAGES, help=argparse.SUPPRESS)
+    parser.add_argument("--workdir", help=argparse.SUPPRESS)
+    parser.add_argument("--result-file", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_stage:
+        return _child_main(args.run_stage, args.workdir, args.result_file)
+
+    from benchmarks.datasets import make_scaled_dataset
+
+    results = {}
+    for scale in args.scales:
+        with tempfile.TemporaryDirectory(prefix=f"bench_{scale}x_") as workdir:
+            start = time.perf_counter()
+            make_scaled_dataset(scale, Path(workdir) / "raw.csv")
+            print(f"\n📦 Dataset {scale}x gerado em {time.perf_counter() - start:.1f}s")
+            with open(Path(workdir) / "stages.log", "w") as log:
+                for stage in args.stages:
+                    try:
+                        result = run_stage_isolated(stage, workdir, log)
+                    except RuntimeError as e:
+                        log.flush()
+                        print(f"   ❌ {e}")
+                        print(Path(log.name).read_text()[-2000:])
+                        sys.exit(1)
+                    results[f"{scale}x/{stage}"] = result
+                    print(f"   ⏱️  {stage:<16} {result['wall_s']:8.2f}s  "
+                          f"CPU {result['cpu_s']:8.2f}s  pico {result['peak_rss_mb']:8.1f} MB")
+
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=4)
+    print("\n✅ Resultados salvos em:", args.output)
+
+    if args.update_baseline:
+        baseline = {}
+        if args.baseline.exists():
+            with open(args.baseline) as f:
+                baseline = json.load(f)
+        baseline.update(results)
+        with open(args.baseline, "w") as f:
+            json.dump(baseline, f, indent=4)
+        print("📌 Baseline atualizado em:", args.baseline)
+        return
+
+    if not args.baseline.exists():
+        print(f"💡 Sem baseline em {args.baseline}; use --update-baseline para criar")
+        return
+    with open(args.baseline) as f:
+        regressions = compare(results, json.load(f), args.threshold)
+    if regressions:
+        print("❌ Regressões em relação ao baseline:")
+        for line in regressions:
+            print("   " + line)
+        sys.exit(1)
+    print(f"✅ Nenhuma regressão acima de {args.threshold:.0%} em relação ao baseline")
+
+
+if __name__ == "__main__":
+    main()
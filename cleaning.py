@@ -0,0 +1,138 @@
+# cleaning.py
+# -*- coding: utf-8 -*-
+"""
+LIMPEZA COMPARTILHADA ENTRE AS ETAPAS
+-------------------------------------
+- Substitui os blocos de limpeza copiados em train.py, evaluate.py e dash.py
+  ('True'/'False' -> 1/0, pd.to_numeric coluna a coluna, fillna(0))
+- Todas as colunas texto são convertidas de uma vez: os valores são
+  fatorados, só os valores únicos passam por pd.to_numeric e o resultado
+  volta para a matriz por indexação
+- O schema (colunas, ordem e dtypes) é inferido uma vez no fit, dentro do
+  preprocess, e salvo em config.CLEANER_PATH; as demais etapas só aplicam
+  transform, então o layout de features não diverge entre etapas
+- Modo streaming: partial_fit acumula, bloco a bloco, quais colunas vieram
+  como texto e quais tiveram algum valor numérico; o fit final só descarta
+  as colunas texto sem nenhum valor numérico em todo o arquivo
+- Os dtypes do schema seguem a política de dtype_policy.py (rótulos e
+  one-hot em uint8, demais colunas em float32)
+"""
+
+import numpy as np
+import pandas as pd
+import joblib
+import config
+from dtype_policy import schema_dtypes
+
+BOOL_STRINGS = {"True": 1, "False": 0, "true": 1, "false": 0}
+
+
+def _text_columns(df):
+    return df.select_dtypes(include=["object", "string", "category"]).columns.tolist()
+
+
+def _to_numeric_block(block):
+    """Converte um bloco de colunas texto para float64 processando só os valores únicos"""
+    if block.shape[1] == 0:
+        return block.astype(np.float64)
+    values = block.to_numpy(dtype=object).ravel()
+    codes, uniques = pd.factorize(values)
+    converted = pd.to_numeric(
+        pd.Series(uniques, dtype=object).replace(BOOL_STRINGS), errors="coerce"
+    ).to_numpy(dtype=np.float64)
+    out = np.where(codes >= 0, converted[codes], np.nan).reshape(block.shape)
+    return pd.DataFrame(out, columns=block.columns, index=block.index)
+
+
+def to_numeric_columns(df, columns):
+    """`columns` de `df` em float64 (texto pela mesma conversão do cleaner)"""
+    text = [col for col in _text_columns(df) if col in columns]
+    numeric = [col for col in columns if col not in text]
+    if text:
+        df = df.drop(columns=text).join(_to_numeric_block(df[text]))[list(df.columns)]
+    return df.astype({col: np.float64 for col in numeric})
+
+
+class DataCleaner:
+    """Transformador de limpeza com schema fixado no fit"""
+
+    def __init__(self, target_columns=None):
+        self.target_columns = list(target_columns if target_columns is not None else config.TARGETS)
+
+    def _convert(self, df):
+        text_cols = _text_columns(df)
+        if text_cols:
+            converted = _to_numeric_block(df[text_cols])
+            df = df.drop(columns=text_cols).join(converted)
+        return df
+
+    def partial_fit(self, df):
+        """Modo streaming (antes do fit): acumula colunas texto e colunas com algum valor numérico"""
+        converted = self._convert(df)
+        self.text_seen_ = getattr(self, "text_seen_", set()) | set(_text_columns(df))
+        self.numeric_seen_ = getattr(self, "numeric_seen_", set()) | {
+            col for col in converted.columns if converted[col].notna().any()
+        }
+        return self
+
+    def fit(self, df):
+        converted = self._convert(df)
+
+        # Colunas texto sem nenhum valor numérico não carregam informação (viravam só zeros);
+        # com partial_fit vale o arquivo inteiro, não só `df`
+        text = set(_text_columns(df)) | getattr(self, "text_seen_", set())
+        seen = getattr(self, "numeric_seen_", set())
+        dropped = [
+            col for col in df.columns
+            if col in text and col not in self.target_columns and col not in seen
+            and converted[col].isna().all()
+        ]
+
+        self.columns_ = [col for col in df.columns if col not in dropped]
+        self.dropped_columns_ = dropped
+        self.dtypes_ = schema_dtypes(converted[self.columns_], self.target_columns)
+        self.feature_columns_ = [col for col in self.columns_ if col not in self.target_columns]
+        return self
+
+    def transform(self, df):
+        """
+        Aplica a limpeza e alinha ao schema do fit: colunas de feature
+        ausentes viram 0, colunas extras são descartadas e os dtypes são
+        fixados. Colunas de target só aparecem se existirem em `df`.
+        """
+        columns = [
+            col for col in self.columns_
+            if col not in self.target_columns or col in df.columns
+        ]
+        df = self._convert(df.reindex(columns=columns)).fillna(0)
+        return df[columns].astype({col: self.dtypes_[col] for col in columns})
+
+    def fit_transform(self, df):
+        return self.fit(df).transform(df)
+
+    def split(self, df):
+        """Separa (X, y) de um DataFrame já transformado"""
+        X = df[self.feature_columns_]
+        y = df[self.target_columns[0]] if len(self.target_columns) == 1 else df[self.target_columns]
+        return X, y
+
+    def save(self, path=None):
+        joblib.dump(self, path or config.CLEANER_PATH)
+
+    def summary(self):
+        return (f"{len(self.feature_columns_)} features, targets={self.target_columns}, "
+                f"descartadas={self.dropped_columns_}")
+
+
+def load_cleaner(path=None, df=None):
+    """
+    Carrega o cleaner salvo pelo preprocess. Se não existir (artefatos
+    antigos) e `df` for informado, ajusta um novo sobre `df`.
+    """
+    path = path or config.CLEANER_PATH
+    if path.exists():
+        return joblib.load(path)
+    if df is None:
+        raise FileNotFoundError(f"Cleaner não encontrado em {path}. Execute o preprocess.")
+    print(f"⚠️  Cleaner não encontrado em {path}; ajustando sobre os dados atuais")
+    return DataCleaner().fit(df)
@@ -8,17 +8,15 @@ Este arquivo centraliza parâmetros e caminhos usados em:
   - train.py
   - evaluate.py
   - dash.py
+Importar config não tem efeitos colaterais: os pontos de entrada (main.py,
+scripts, app e API) chamam init() para semear os RNGs e criar os diretórios.
 """
 from pathlib import Path
-import random
-import numpy as np
 
 # =====================
 # Reprodutibilidade
 # =====================
-SEED = 42
-random.seed(SEED)
-np.random.seed(SEED)
+SEED = 42   # semente global (aplicada aos RNGs por init())
 
 # =====================
 # Estrutura de diretórios
@@ -27,17 +25,28 @@ ROOT = Path(__file__).parent
 
 # Arquivos de dados
 DATA_RAW = ROOT / "data" / "Amia_train.csv"      # dataset original
-DATA_PROCESSED = ROOT / "data" / "dataset_tratado.csv"  # dataset tratado (gerado pelo preprocess)
+DATA_PROCESSED = ROOT / "data" / "dataset_tratado.feather"  # dataset tratado (gerado pelo preprocess)
+DATA_PROCESSED_CSV = ROOT / "data" / "dataset_tratado.csv"  # exportação CSV opcional do dataset tratado
 
 # Arquivos de modelo
 MODEL_PATH = ROOT / "models" / "modelo.pkl"          # modelo treinado salvo
 SCALER_PATH = ROOT / "models" / "scaler.pkl"         # scaler salvo (normalização)
+ENCODER_PATH = ROOT / "models" / "encoder.pkl"       # encoder categórico (gerado pelo preprocess)
+CLEANER_PATH = ROOT / "models" / "cleaner.pkl"       # schema de limpeza (gerado pelo preprocess)
+PIPELINE_PATH = ROOT / "models" / "pipeline.pkl"     # pipeline de inferência completo (gerado pelo train)
+PIPELINE_MMAP_DIR = PIPELINE_PATH.with_suffix(".mmap")  # mesmo pipeline no formato memory-map (ver inference.py)
 
 # Arquivos de métricas e relatórios
 METRICS_PATH = ROOT / "reports" / "metrics.json"
 EVALUATION_REPORT = ROOT / "reports" / "evaluation_report.json"
 API_METRICS_PATH = ROOT / "reports" / "api_metrics.json"  # métricas da API
 METRICS_DIR = ROOT / "reports"  # Diretório de relatórios e métricas 
+STAGE_CACHE_PATH = ROOT / "reports" / "stage_cache.json"  # impressões digitais das etapas (ver stage_cache.py)
+EXPERIMENTS_PATH = ROOT / "reports" / "experiments.json"  # tabela comparativa das variantes (ver experiments.py)
+TUNE_PATH = ROOT / "reports" / "tune.json"  # busca de hiperparâmetros e fronteira de Pareto (ver tune.py)
+BALANCING_REPORT_PATH = ROOT / "reports" / "balancing.json"  # custo e recall do balanceamento usado no treino
+STAGE_METRICS_PATH = ROOT / "reports" / "stage_metrics.json"  # tempo/CPU/memória por etapa (ver instrumentation.py)
+PROFILES_DIR = ROOT / "reports" / "profiles"  # cProfile por etapa (main.py --profile)
 
 # Diretório para predições da API
 PREDICTIONS_DIR = ROOT / "predictions"
@@ -50,6 +59,20 @@ LOGS_DIR = ROOT / "logs"
 # =====================
 TARGET = "falha_maquina"   # nome da coluna alvo
 
+# Colunas de rótulo binário normalizadas no preprocess (ver labels.py)
+LABEL_COLS = [
+    TARGET,
+    "FDF (Falha Desgaste Ferramenta)",
+    "FDC (Falha Dissipacao Calor)",
+    "FP (Falha Potencia)",
+    "FTE (Falha Tensao Excessiva)",
+    "FA (Falha Aleatoria)",
+]
+
+# Targets do modelo: um único forest multi-saída para a falha geral e
+# todos os tipos de falha (os rótulos deixam de ser usados como features)
+TARGETS = list(LABEL_COLS)
+
 # Colunas categóricas e numéricas (ajuste conforme seu dataset)
 CATEGORICAL_COLS = ["id_produto", "tipo"]
 NUMERIC_COLS = [
@@ -57,6 +80,24 @@ NUMERIC_COLS = [
     "velocidade_rotacional", "torque", "desgaste_da_ferramenta"
 ]
 
+# Codificação categórica (ver encoding.py)
+# Colunas de alta cardinalidade não usam one-hot (id_produto tem ~9.700 valores)
+HIGH_CARDINALITY_COLS = ["id_produto"]
+CATEGORICAL_ENCODING = "frequency"   # "frequency" | "hash" | "target" | "ordinal" | "onehot"
+HASH_N_FEATURES = 32                 # largura fixa do modo "hash"
+TARGET_ENCODING_FOLDS = 5            # folds do target encoding out-of-fold
+TARGET_ENCODING_SMOOTHING = 10.0     # suavização em direção à média global
+
+# Política de dtypes (ver dtype_policy.py): aplicada na leitura e gravada no schema do cleaner
+FLOAT_DTYPE = "float32"   # sensores e demais features contínuas
+FLAG_DTYPE = "uint8"      # rótulos binários e colunas one-hot/bool
+
+# Formato intermediário (ver dataset_io.py): Feather é o padrão entre etapas
+EXPORT_PROCESSED_CSV = False         # também gravar config.DATA_PROCESSED_CSV
+
+# Modo streaming do preprocess: nº de linhas por bloco (None = tudo em memória)
+PREPROCESS_CHUNKSIZE = None
+
 # =====================
 # Configurações de Treino
 # =====================
@@ -70,6 +111,65 @@ MODEL_PARAMS = {
     "n_jobs": -1  # Usar todos os cores disponíveis
 }
 
+# Treino incremental (train.py --chunksize / main.py --train-chunksize):
+# blocos do dataset tratado, cada um acrescenta um lote de árvores (warm_start)
+TRAIN_CHUNKSIZE = None        # linhas por bloco (None = treino em memória)
+TRAIN_RESERVOIR_SIZE = 2000   # linhas com falha guardadas para blocos sem algum tipo de falha
+
+# Treino distribuído (distributed.py): cada worker treina uma parte das árvores
+DISTRIBUTED = {
+    "transport": "local",       # backend (ver distributed.TRANSPORTS): "local" | "inline"
+    "workers": None,            # nº de workers (None = nº de CPUs)
+    "partition": "bootstrap",   # "bootstrap": todo o treino por worker | "partition": 1/N das linhas
+    "shared_dir": None,         # onde o treino é gravado para os workers (None = temp local;
+                                # outros hosts precisam de um diretório compartilhado)
+}
+
+# Balanceamento das classes no treino (ver balancing.py):
+#   "smote" | "smotenc" | "undersample" | "balanced_bootstrap" | "class_weight" | "none"
+BALANCING = "smote"
+
+# =====================
+# Experimentos (experiments.py)
+# =====================
+# Variantes comparadas em paralelo com o mesmo split do treino. Chaves:
+#   estimator: "random_forest" | "extra_trees" | "decision_tree" | "bagging"
+#   resampling: estratégia de balanceamento (ver BALANCING e balancing.py)
+#   class_weight: None | "balanced" | dict
+#   params: parâmetros do estimador (n_jobs é fixado em 1 dentro do pool)
+EXPERIMENTS = [
+    {"name": "producao_smote", "estimator": "random_forest", "resampling": "smote", "params": MODEL_PARAMS},
+    {"name": "sem_smote", "estimator": "random_forest", "resampling": "none", "params": MODEL_PARAMS},
+    {"name": "smotenc", "estimator": "random_forest", "resampling": "smotenc", "params": MODEL_PARAMS},
+    {"name": "undersample", "estimator": "random_forest", "resampling": "undersample", "params": MODEL_PARAMS},
+    {"name": "balanced_bootstrap", "estimator": "random_forest", "resampling": "balanced_bootstrap", "params": MODEL_PARAMS},
+    {"name": "class_weight", "estimator": "random_forest", "resampling": "class_weight", "params": MODEL_PARAMS},
+    {"name": "RF_Default", "estimator": "random_forest", "resampling": "none"},
+    {"name": "RF_Balanced", "estimator": "random_forest", "resampling": "none", "class_weight": "balanced"},
+    {"name": "Bagging_Default", "estimator": "bagging", "resampling": "none"},
+    {"name": "Bagging_Balanced", "estimator": "bagging", "resampling": "none", "class_weight": "balanced"},
+    {"name": "DT_Default", "estimator": "decision_tree", "resampling": "none"},
+    {"name": "DT_Balanced", "estimator": "decision_tree", "resampling": "none", "class_weight": "balanced"},
+]
+EXPERIMENT_WORKERS = None   # processos do pool (None = nº de CPUs, limitado ao nº de variantes)
+
+# Busca de hiperparâmetros por successive halving (tune.py / main.py --step tune)
+TUNE = {
+    "param_distributions": {
+        "max_depth": [4, 6, 8, 12, 16, None],
+        "min_samples_leaf": [1, 2, 5, 10],
+        "max_features": ["sqrt", "log2", 0.5],
+    },
+    "n_candidates": 27,       # candidatos sorteados na 1ª rodada
+    "factor": 3,              # a cada rodada: 1/factor sobrevive, linhas e árvores x factor
+    "n_final": 6,             # candidatos na rodada final (orçamento completo)
+    "min_rows": 2000,         # piso de linhas de treino da 1ª rodada
+    "max_estimators": 200,    # árvores na rodada final
+    "resampling": "smote",    # mesma reamostragem do treino (ver balancing.py)
+    "validation_size": 0.2,   # validação separada do treino (o teste não é usado)
+    "latency_repeat": 50,     # predições de 1 linha por medição de latência
+}
+
 # =====================
 # Configurações de Avaliação
 # =====================
@@ -86,6 +186,69 @@ API_CONFIG = {
     "default_threshold": 0.5
 }
 
+# API local de inferência (api.py)
+INFERENCE_API = {
+    "host": "0.0.0.0",
+    "port": 8000,
+    "workers": 4,            # threads para predict_proba fora do event loop
+    "max_batch_size": 10000, # registros por chamada de /predict/batch
+    "micro_batching": True,  # agrupa requisições concorrentes (ver batching.py)
+    "batch_max_size": 256,   # linhas por lote agrupado
+    "batch_max_wait_ms": 5.0,  # janela máxima de espera para formar um lote
+    "model_n_jobs": 1        # n_jobs do forest no servidor (None mantém o do treino)
+}
+
+# Formato do pipeline na carga: "mmap" abre <pipeline>.mmap/ (forest em .npy
+# via memory-map, compartilhado entre processos) | "pickle" (joblib.load do .pkl).
+# O memory-map serve só o forest em arrays (lotes até ARRAY_FOREST_MAX_ROWS);
+# lotes maiores carregam o forest do sklearn do .pkl na primeira vez
+MODEL_FORMAT = "mmap"
+
+# Predição em lote do app Streamlit (upload de CSV)
+APP_CSV_CHUNKSIZE = 50_000   # linhas por bloco pontuado
+APP_TOP_ROWS = 200           # linhas de maior risco exibidas durante o processamento
+APP_CACHE_ENTRIES = 8        # uploads pontuados mantidos em disco (os mais recentes)
+APP_DOWNLOAD_MAX_MB = 200    # acima disso o CSV pontuado não é oferecido no botão de download
+
+# Exportação de predições para a API de avaliação (dash.generate_predictions_csv)
+EXPORT_CHUNKSIZE = 50_000   # linhas lidas, pontuadas e gravadas por bloco
+EXPORT_GZIP = False         # grava <arquivo>.csv.gz
+
+# Cache de predições (prediction_cache.py) do app Streamlit, da API e do uso
+# programático: chave = vetor de features canônico + versão do modelo
+# (mtime/tamanho de MODEL_PATH e PIPELINE_PATH; novo treino esvazia o cache)
+PREDICTION_CACHE = {
+    "enabled": True,
+    "max_size": 10_000,   # vetores guardados (evicção LRU)
+    "ttl_s": 3600,        # validade de cada entrada em segundos (None = sem expiração)
+    "decimals": 3,        # casas na quantização das features (None = valor exato)
+}
+
+# Forest exportado em arrays (fast_forest.py): usado em lotes de até N linhas;
+# acima disso o predict_proba do sklearn (Cython, multi-thread) é mais rápido
+ARRAY_FOREST_MAX_ROWS = 1024
+
+# Gerador de telemetria sintética (synthetic.py): linhas por bloco gravado
+SYNTHETIC_CHUNKSIZE = 1_000_000
+
+# Suíte de benchmarks (python -m benchmarks.suite)
+BENCHMARK = {
+    "scales": [1, 10, 100],         # múltiplos do tamanho de DATA_RAW
+    "regression_threshold": 0.25,   # piora tolerada vs. baseline (tempo e memória)
+    "baseline_path": ROOT / "benchmarks" / "baseline.json",
+    "single_repeat": 200,           # predições de 1 linha medidas
+    "batch_rows": 10000,            # linhas da predição em lote
+}
+
+# Orçamento de inicialização (python -m benchmarks.startup, via -X importtime):
+# ms do import de cada ponto de entrada e módulos que ele não pode carregar
+STARTUP_BUDGET = {
+    "main": {"budget_ms": 150, "forbidden": ["sklearn", "imblearn", "pandas"]},
+    "preprocess": {"budget_ms": 1200, "forbidden": ["sklearn", "imblearn"]},
+    "inference": {"budget_ms": 1200, "forbidden": ["sklearn", "imblearn"]},
+    "dash": {"budget_ms": 1500, "forbidden": ["sklearn", "imblearn"]},
+}
+
 # Colunas de falha esperadas pela API
 FAILURE_COLUMNS = [
     'FDF (Falha Desgaste Ferramenta)',
@@ -94,6 +257,10 @@ FAILURE_COLUMNS = [
     'FA (Falha Aleatoria)'
 ]
 
+# Tipos de falha treinados fora do contrato da API (ex.: FTE): uso interno,
+# não entram no CSV de submissão
+INTERNAL_FAILURE_COLUMNS = [col for col in TARGETS if col != TARGET and col not in FAILURE_COLUMNS]
+
 # =====================
 # Helpers
 # =====================
@@ -102,7 +269,14 @@ def create_dirs():
     for p in [ROOT / "data", ROOT / "models", ROOT / "reports", ROOT / "predictions", ROOT / "logs"]:
         p.mkdir(parents=True, exist_ok=True)
 
-# Cria diretórios ao importar
-create_dirs()
+
+def init(seed=None):
+    """Inicialização dos pontos de entrada: semeia random/numpy e cria os diretórios"""
+    import random
+    import numpy as np
+    seed = SEED if seed is None else seed
+    random.seed(seed)
+    np.random.seed(seed)
+    create_dirs()
 
 
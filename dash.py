@@ -11,11 +11,13 @@ DASH.PY - VERSÃO CORRIGIDA BASEADA NA DOCUMENTAÇÃO OFICIAL
 import pandas as pd
 import numpy as np
 import config
-import joblib
 import requests
 import json
+import gzip
 import os
 from pathlib import Path
+from dataset_io import iter_processed
+from inference import load_pipeline
 
 # Configurações da API baseadas na documentação oficial
 API_BASE_URL = "http://34.193.187.218:5000"
@@ -70,108 +72,87 @@ def register_user(email, password):
         print(f"❌ Erro de conexão: {e}")
         return None
 
-def generate_predictions_csv(model_path, data_path, output_path, threshold=0.5):
+def _prediction_columns(pipeline):
+    """Índice da saída do modelo usada em cada coluna de falha esperada pela API"""
+    columns = {}
+    for col in config.FAILURE_COLUMNS:
+        if col in pipeline.targets:
+            columns[col] = pipeline.targets.index(col)
+        else:
+            # Modelos antigos (só falha geral) repetem a probabilidade da falha geral
+            print(f"⚠️  Modelo sem saída para '{col}', usando {config.TARGET}")
+            columns[col] = pipeline.targets.index(config.TARGET)
+    return columns
+
+def generate_predictions_csv(model_path, data_path, output_path, threshold=0.5, chunksize=None, compress=None):
     """
     Gera arquivo CSV com predições no formato esperado pela API
     Baseado no submission_example.csv
+
+    O dataset é lido e pontuado em blocos de `chunksize` linhas
+    (config.EXPORT_CHUNKSIZE), acrescentados ao arquivo um a um: todas as
+    linhas são exportadas com memória limitada ao bloco. Com `compress`
+    (config.EXPORT_GZIP) a saída é gravada em gzip (<output_path>.gz).
+    A amostra _sample.csv sai do primeiro bloco, sem segunda passada.
     """
     print("🔮 Gerando predições para API...")
+    chunksize = chunksize or config.EXPORT_CHUNKSIZE
+    compress = config.EXPORT_GZIP if compress is None else compress
+    output_path = Path(output_path)
+    if compress and output_path.suffix != ".gz":
+        output_path = output_path.with_name(output_path.name + ".gz")
     
-    # Carregar modelo e dados
-    print(f"📥 Carregando modelo de: {model_path}")
-    model = joblib.load(model_path)
-    
-    print(f"📥 Carregando dados de: {data_path}")
-    df = pd.read_csv(data_path, low_memory=False)
-    
-    print(f"📊 Dados originais - Shape: {df.shape}")
-    
-    # Limpeza de dados (mesma do evaluate.py)
-    print("🔧 Limpando dados...")
-    df = df.replace({'True': 1, 'False': 0, 'true': 1, 'false': 0})
-    
-    for col in df.columns:
-        if df[col].dtype == 'object' and col != config.TARGET:
-            try:
-                df[col] = pd.to_numeric(df[col], errors='coerce')
-            except:
-                pass
-    
-    df = df.fillna(0)
-    
-    # Separar features (remover target se existir)
-    if config.TARGET in df.columns:
-        X = df.drop(columns=[config.TARGET])
-    else:
-        X = df.copy()
-    
-    print(f"📊 Features para predição - Shape: {X.shape}")
-    
-    # Fazer predições probabilísticas
-    print("🎯 Fazendo predições probabilísticas...")
-    
-    # Se o modelo suporta predict_proba
-    if hasattr(model, 'predict_proba'):
-        proba = model.predict_proba(X)
-        print(f"📊 Probabilidades - Shape: {proba.shape}")
-        # Se binário, pegar apenas a probabilidade da classe positiva
-        if proba.shape[1] == 2:
-            predictions_proba = proba[:, 1]
-        else:
-            predictions_proba = proba[:, 0]
-    else:
-        # Fallback para modelos que não têm predict_proba
-        predictions_binary = model.predict(X)
-        predictions_proba = predictions_binary.astype(float)
-    
-    print(f"📊 Predições probabilísticas - Shape: {predictions_proba.shape}")
-    print(f"📊 Range das predições: [{predictions_proba.min():.4f}, {predictions_proba.max():.4f}]")
-    
-    # Criar DataFrame com formato esperado pela API
-    # Baseado no exemplo submission_example.csv
-    predictions_df = pd.DataFrame()
+    # Carregar pipeline de inferência (encoder + cleaner + schema + modelo)
+    print(f"📥 Carregando pipeline de: {model_path}")
+    pipeline = load_pipeline(model_path)
     
     # Colunas esperadas pela API (usando config.py)
-    failure_columns = config.FAILURE_COLUMNS
-    
-    print(f"📊 Colunas de falha esperadas: {failure_columns}")
-    
-    # Distribuir as predições para todas as colunas de falha
-    for col in failure_columns:
-        predictions_df[col] = predictions_proba
-    
-    # Garantir que os valores estão no range correto [0, 1]
-    predictions_df = predictions_df.clip(0, 1)
-    
-    # Verificar se há valores inválidos
-    if predictions_df.isnull().sum().sum() > 0:
-        print("⚠️  Encontrados valores nulos, preenchendo com 0...")
-        predictions_df = predictions_df.fillna(0)
-    
-    if np.isinf(predictions_df.select_dtypes(include=[np.number])).sum().sum() > 0:
-        print("⚠️  Encontrados valores infinitos, substituindo...")
-        predictions_df = predictions_df.replace([np.inf, -np.inf], 0)
-    
-    # Limitar o tamanho do arquivo se necessário (API pode ter limite)
-    MAX_ROWS = 10000  # Limite conservativo
-    if len(predictions_df) > MAX_ROWS:
-        print(f"⚠️  Arquivo muito grande ({len(predictions_df)} linhas)")
-        print(f"🔄 Reduzindo para {MAX_ROWS} linhas para teste...")
-        predictions_df = predictions_df.head(MAX_ROWS)
-    
-    # Salvar arquivo
-    predictions_df.to_csv(output_path, index=False)
+    columns = _prediction_columns(pipeline)
+    print(f"📊 Colunas de falha esperadas: {list(columns)}")
+    internal = [col for col in config.INTERNAL_FAILURE_COLUMNS if col in pipeline.targets]
+    if internal:
+        print(f"ℹ️  Saídas internas fora da exportação: {internal}")
+    
+    print(f"📥 Lendo dados de: {data_path} (blocos de {chunksize:,} linhas)")
+    sample_file = output_path.with_name(output_path.name.replace(".gz", "").replace(".csv", "_sample.csv"))
+    tmp_path = output_path.with_name(output_path.name + ".tmp")
+    n_rows = 0
+    totals = None
+    
+    opener = gzip.open if compress else open
+    with opener(tmp_path, "wt", newline="") as f:
+        for chunk in iter_processed(data_path, chunksize=chunksize):
+            # Features no layout de treino (brutos passam pelo encoder/cleaner salvos)
+            proba = pipeline.predict_array(pipeline.prepare(chunk))
+            predictions_df = pd.DataFrame({col: proba[:, idx] for col, idx in columns.items()})
+            
+            # Garantir valores no range [0, 1] (infinitos viram 0/1, nulos viram 0)
+            predictions_df = predictions_df.clip(0, 1).fillna(0)
+            
+            predictions_df.to_csv(f, index=False, header=n_rows == 0)
+            if n_rows == 0:
+                predictions_df.head(100).to_csv(sample_file, index=False)
+            n_rows += len(predictions_df)
+            
+            # Estatísticas acumuladas (sem manter os blocos anteriores)
+            block = pd.DataFrame({"soma": predictions_df.sum(), "min": predictions_df.min(), "max": predictions_df.max()})
+            totals = block if totals is None else pd.DataFrame({
+                "soma": totals["soma"] + block["soma"],
+                "min": np.minimum(totals["min"], block["min"]),
+                "max": np.maximum(totals["max"], block["max"]),
+            })
+            print(f"   🎯 {n_rows:,} linhas pontuadas")
+    
+    # Arquivo completo só substitui o anterior no fim
+    os.replace(tmp_path, output_path)
     
     print(f"✅ Predições salvas em: {output_path}")
-    print(f"📊 Shape das predições finais: {predictions_df.shape}")
-    print(f"📊 Colunas: {list(predictions_df.columns)}")
-    print(f"📊 Estatísticas das predições:")
-    print(predictions_df.describe())
-    
-    # Salvar uma amostra menor para debug se necessário
-    sample_file = str(output_path).replace('.csv', '_sample.csv')
-    predictions_df.head(100).to_csv(sample_file, index=False)
-    print(f"📝 Amostra salva em: {sample_file}")
+    print(f"📊 Shape das predições finais: ({n_rows}, {len(columns)})")
+    print(f"📊 Colunas: {list(columns)}")
+    if totals is not None:
+        print(f"📊 Estatísticas das predições:")
+        print(pd.DataFrame({"média": totals["soma"] / n_rows, "min": totals["min"], "max": totals["max"]}))
+        print(f"📝 Amostra salva em: {sample_file}")
     
     return output_path
 
@@ -388,7 +369,7 @@ def main():
         # 2. Gerar predições
         print("\n" + "-"*50)
         predictions_file = generate_predictions_csv(
-            config.MODEL_PATH, 
+            config.PIPELINE_PATH, 
             config.DATA_PROCESSED, 
             predictions_file, 
             threshold
@@ -419,7 +400,7 @@ def main():
         print(f"\n💡 Se o problema persistir, use o dashboard: http://34.193.187.218:8501")
 
 if __name__ == "__main__":
-
+    config.init()
     main()
 
 
@@ -0,0 +1,148 @@
+# dataset_io.py
+# -*- coding: utf-8 -*-
+"""
+FORMATO INTERMEDIÁRIO DO DATASET TRATADO
+----------------------------------------
+- O preprocess grava config.DATA_PROCESSED em Feather (Arrow IPC) sem
+  compressão, com os tipos de cada coluna preservados
+- train, evaluate e dash abrem o arquivo via memory-map: não há parsing
+  de texto nem reinferência de dtypes a cada etapa
+- CSV continua disponível como exportação opcional (config.DATA_PROCESSED_CSV)
+"""
+
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+
+import config
+
+
+def save_processed(df, path=None, export_csv=None):
+    """Salva o dataset tratado no formato binário (e opcionalmente em CSV)"""
+    path = Path(path or config.DATA_PROCESSED)
+    export_csv = config.EXPORT_PROCESSED_CSV if export_csv is None else export_csv
+
+    table = pa.Table.from_pandas(df.reset_index(drop=True), preserve_index=False)
+    feather.write_feather(table, path, compression="uncompressed")
+
+    if export_csv:
+        df.to_csv(config.DATA_PROCESSED_CSV, index=False)
+        print("📝 Exportação CSV salva em:", config.DATA_PROCESSED_CSV)
+
+    return path
+
+
+def load_processed(path=None, columns=None):
+    """
+    Abre o dataset tratado como DataFrame.
+
+    Arquivos Feather são lidos via memory-map (colunas numéricas sem nulos
+    não são copiadas); arquivos .csv continuam aceitos por compatibilidade.
+    """
+    path = Path(path or config.DATA_PROCESSED)
+    if path.suffix.lower() == ".csv":
+        return pd.read_csv(path, usecols=columns, low_memory=False)
+
+    table = feather.read_table(path, columns=columns, memory_map=True)
+    return table.to_pandas(split_blocks=True)
+
+
+def _rechunk(batches, chunksize):
+    """Reagrupa record batches em tabelas de exatamente `chunksize` linhas (a última pode ser menor)"""
+    buffer, n_buffered = [], 0
+    for batch in batches:
+        buffer.append(batch)
+        n_buffered += batch.num_rows
+        if n_buffered < chunksize:
+            continue
+        table = pa.Table.from_batches(buffer)
+        start = 0
+        while n_buffered - start >= chunksize:
+            yield table.slice(start, chunksize)
+            start += chunksize
+        rest = table.slice(start)
+        buffer, n_buffered = rest.to_batches(), rest.num_rows
+    if n_buffered:
+        yield pa.Table.from_batches(buffer)
+
+
+def iter_processed(path=None, columns=None, chunksize=None):
+    """
+    Itera o dataset tratado bloco a bloco: um DataFrame por record batch ou,
+    com `chunksize`, por bloco de `chunksize` linhas.
+    """
+    path = Path(path or config.DATA_PROCESSED)
+    if path.suffix.lower() == ".csv":
+        yield from pd.read_csv(path, usecols=columns,
+                               chunksize=chunksize or config.PREPROCESS_CHUNKSIZE or 100_000)
+        return
+
+    with pa.memory_map(str(path), "r") as source:
+        reader = pa.ipc.open_file(source)
+        batches = (reader.get_batch(i) for i in range(reader.num_record_batches))
+        if chunksize:
+            batches = _rechunk(batches, chunksize)
+        for batch in batches:
+            if columns is not None:
+                batch = batch.select(columns)
+            yield batch.to_pandas(split_blocks=True)
+
+
+def processed_num_rows(path=None):
+    """Nº de linhas do dataset tratado, sem ler os dados"""
+    path = Path(path or config.DATA_PROCESSED)
+    if path.suffix.lower() == ".csv":
+        return sum(len(chunk) for chunk in pd.read_csv(path, usecols=[0], chunksize=1_000_000))
+    with pa.memory_map(str(path), "r") as source:
+        return pa.ipc.open_file(source).count_rows()
+
+
+class ProcessedWriter:
+    """
+    Escrita incremental do dataset tratado (modo streaming do preprocess).
+
+    O schema Arrow é fixado pelo primeiro bloco; cada bloco seguinte vira um
+    record batch no mesmo arquivo Feather, sem manter os anteriores em memória.
+    """
+
+    def __init__(self, path=None, export_csv=None):
+        self.path = Path(path or config.DATA_PROCESSED)
+        self.export_csv = config.EXPORT_PROCESSED_CSV if export_csv is None else export_csv
+        self.schema = None
+        self.n_rows = 0
+        self._writer = None
+
+    def write(self, df):
+        df = df.reset_index(drop=True)
+        if self._writer is None:
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            self.schema = table.schema
+            self._writer = pa.ipc.new_file(str(self.path), self.schema)
+        else:
+            table = pa.Table.from_pandas(df, schema=self.schema, preserve_index=False)
+        self._writer.write_table(table)
+
+        if self.export_csv:
+            df.to_csv(config.DATA_PROCESSED_CSV, index=False,
+                      mode="w" if self.n_rows == 0 else "a", header=self.n_rows == 0)
+        self.n_rows += len(df)
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def processed_schema(path=None):
+    """Schema (nomes e tipos Arrow) do dataset tratado, sem ler os dados"""
+    path = Path(path or config.DATA_PROCESSED)
+    with pa.memory_map(str(path), "r") as source:
+        return pa.ipc.open_file(source).schema
@@ -0,0 +1,240 @@
+# distributed.py
+# -*- coding: utf-8 -*-
+"""
+TREINO DISTRIBUÍDO DO FOREST
+----------------------------
+- O coordenador divide config.MODEL_PARAMS["n_estimators"] entre N workers;
+  cada worker treina um RandomForest com a sua parte das árvores e uma seed
+  derivada de config.SEED (SeedSequence.spawn), com o balanceamento de
+  config.BALANCING aplicado aos seus dados
+- Dados por worker (config.DISTRIBUTED["partition"]):
+    * "bootstrap": todo o treino; a diversidade vem da seed (bootstrap e
+      reamostragem próprios, como árvores de um único forest)
+    * "partition": uma fatia estratificada do treino por worker (cada worker
+      lê e reamostra só 1/N das linhas)
+- O coordenador carrega e divide o dataset uma única vez e grava o treino
+  em .npy (config.DISTRIBUTED["shared_dir"]); a tarefa leva o diretório e
+  os índices das linhas do worker, que abre os arrays por memory-map e lê
+  só essas linhas. O transporte só leva a tarefa e devolve o forest ajustado
+- O coordenador junta os estimators_ em um único forest, salvo em
+  config.MODEL_PATH / config.PIPELINE_PATH (compatível com evaluate.py)
+- Transporte plugável (TRANSPORTS / register_transport): qualquer objeto com
+  map(func, tarefas) -> resultados na mesma ordem. "local" usa um processo
+  por worker; "inline" roda tudo no processo atual (depuração). Um backend
+  para outros hosts só precisa executar distributed.build_share em máquinas
+  com o repositório e acesso a shared_dir (sistema de arquivos compartilhado)
+
+Uso:
+  python distributed.py --workers 4
+  python distributed.py --workers 4 --partition partition
+"""
+
+import copy
+import json
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
+
+import numpy as np
+import joblib
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.metrics import recall_score
+from sklearn.model_selection import StratifiedKFold
+
+import config
+from balancing import categorical_indices, fit_balanced
+
+PARTITION_MODES = ("bootstrap", "partition")
+
+
+# =====================
+# Transportes
+# =====================
+class InlineTransport:
+    """Executa as tarefas em sequência no processo atual"""
+
+    def __init__(self, workers=None):
+        self.workers = workers
+
+    def map(self, func, tasks):
+        return [func(task) for task in tasks]
+
+
+class LocalTransport:
+    """Um processo por worker na máquina local (ProcessPoolExecutor)"""
+
+    def __init__(self, workers=None):
+        self.workers = workers or os.cpu_count() or 1
+
+    def map(self, func, tasks):
+        with ProcessPoolExecutor(max_workers=min(self.workers, len(tasks))) as pool:
+            return list(pool.map(func, tasks))
+
+
+TRANSPORTS = {"inline": InlineTransport, "local": LocalTransport}
+
+
+def register_transport(name, transport_cls):
+    """Registra um backend de transporte (ex.: fila de tarefas entre hosts)"""
+    TRANSPORTS[name] = transport_cls
+
+
+def get_transport(name=None, workers=None):
+    name = name or config.DISTRIBUTED["transport"]
+    if name not in TRANSPORTS:
+        raise ValueError(f"Transporte inválido: '{name}'. Use um de {tuple(TRANSPORTS)}")
+    return TRANSPORTS[name](workers)
+
+
+# =====================
+# Worker
+# =====================
+def plan_shares(n_estimators, n_workers, seed=None, partition="bootstrap"):
+    """Tarefas do coordenador: nº de árvores e seed derivada de cada worker"""
+    if partition not in PARTITION_MODES:
+        raise ValueError(f"Partição inválida: '{partition}'. Use um de {PARTITION_MODES}")
+    seed = config.SEED if seed is None else seed
+    n_workers = max(1, min(n_workers, n_estimators))
+    base, extra = divmod(n_estimators, n_workers)
+    seeds = [int(s.generate_state(1)[0]) for s in np.random.SeedSequence(seed).spawn(n_workers)]
+    return [
+        {"worker": i, "n_workers": n_workers, "n_estimators": base + (i < extra),
+         "seed": seeds[i], "partition": partition}
+        for i in range(n_workers)
+    ]
+
+
+def _worker_rows(y, task):
+    """
+    Linhas de treino do worker: None (todas, "bootstrap") ou os índices
+    ordenados de uma fatia estratificada ("partition")
+    """
+    if task["partition"] == "bootstrap" or task["n_workers"] == 1:
+        return None
+    folds = StratifiedKFold(n_splits=task["n_workers"], shuffle=True, random_state=config.SEED)
+    return np.sort(list(folds.split(np.zeros(len(y)), y))[task["worker"]][1])
+
+
+@contextmanager
+def shared_training_data(X_train, Y_train):
+    """Grava o treino uma vez em .npy (em config.DISTRIBUTED["shared_dir"]) para os workers"""
+    with tempfile.TemporaryDirectory(prefix="distributed_", dir=config.DISTRIBUTED["shared_dir"]) as tmp:
+        np.save(Path(tmp) / "X_train.npy", np.ascontiguousarray(X_train))
+        np.save(Path(tmp) / "Y_train.npy", np.ascontiguousarray(Y_train))
+        yield tmp
+
+
+def build_share(task):
+    """Treina a parte do forest de um worker (executado pelo transporte)"""
+    start = time.perf_counter()
+    data_dir = Path(task["data_dir"])
+    X_train = np.load(data_dir / "X_train.npy", mmap_mode="r")
+    Y_train = np.load(data_dir / "Y_train.npy", mmap_mode="r")
+    # Só as linhas do worker saem do memory-map
+    rows = task["rows"]
+    X, Y = (np.asarray(X_train), np.asarray(Y_train)) if rows is None else (X_train[rows], Y_train[rows])
+
+    params = dict(config.MODEL_PARAMS, n_estimators=task["n_estimators"], random_state=task["seed"], n_jobs=1)
+    model, stats = fit_balanced(RandomForestClassifier(**params), X, Y, config.BALANCING, task["main_idx"],
+                                task["seed"], task["categorical_idx"])
+    stats.update(worker=task["worker"], n_estimators=task["n_estimators"], seed=task["seed"],
+                 total_s=time.perf_counter() - start)
+    return model, stats
+
+
+# =====================
+# Coordenador
+# =====================
+def _same_classes(a, b):
+    a = a if isinstance(a, list) else [a]
+    b = b if isinstance(b, list) else [b]
+    return len(a) == len(b) and all(np.array_equal(x, y) for x, y in zip(a, b))
+
+
+def merge_forests(forests):
+    """Um único RandomForest com as árvores de todos os workers"""
+    merged = copy.copy(forests[0])
+    for forest in forests[1:]:
+        if forest.n_features_in_ != merged.n_features_in_ or not _same_classes(forest.classes_, merged.classes_):
+            raise ValueError(
+                "Forests incompatíveis (features ou classes diferentes); com partition='partition' "
+                "algum worker ficou sem exemplos de um tipo de falha. Use menos workers ou 'bootstrap'."
+            )
+    merged.estimators_ = [tree for forest in forests for tree in forest.estimators_]
+    merged.set_params(n_estimators=len(merged.estimators_), random_state=config.SEED,
+                      n_jobs=config.MODEL_PARAMS.get("n_jobs"))
+    return merged
+
+
+def train_distributed(X_train, Y_train, main_idx=0, categorical_idx=None, workers=None, transport=None,
+                      partition=None):
+    """Distribui as partes do forest, junta e retorna (modelo, estatísticas por worker)"""
+    settings = config.DISTRIBUTED
+    transport = get_transport(transport, workers or settings["workers"])
+    tasks = plan_shares(config.MODEL_PARAMS.get("n_estimators", 100), transport.workers,
+                        partition=partition or settings["partition"])
+    with shared_training_data(X_train, Y_train) as data_dir:
+        for task in tasks:
+            task.update(data_dir=data_dir, rows=_worker_rows(Y_train[:, main_idx], task),
+                        main_idx=main_idx, categorical_idx=categorical_idx)
+        results = transport.map(build_share, tasks)
+    return merge_forests([model for model, _ in results]), [stats for _, stats in results]
+
+
+def main(workers=None, transport=None, partition=None):
+    from inference import InferencePipeline
+    from train import load_training_data
+
+    X_train, X_test, Y_train, Y_test, targets, cleaner, encoder = load_training_data()
+    main_idx = targets.index(config.TARGET) if config.TARGET in targets else 0
+    transport_name = transport or config.DISTRIBUTED["transport"]
+    partition = partition or config.DISTRIBUTED["partition"]
+
+    print(f"\n🌐 Treino distribuído: transporte '{transport_name}', partição '{partition}', "
+          f"balanceamento '{config.BALANCING}'")
+    start = time.perf_counter()
+    model, worker_stats = train_distributed(X_train, Y_train, main_idx,
+                                            categorical_indices(cleaner.feature_columns_, encoder),
+                                            workers, transport_name, partition)
+    elapsed = time.perf_counter() - start
+    for stats in worker_stats:
+        print(f"   👷 Worker {stats['worker']}: {stats['n_estimators']} árvores, "
+              f"{stats['train_rows']} linhas, {stats['total_s']:.2f}s (seed {stats['seed']})")
+    print(f"✅ Forest com {len(model.estimators_)} árvores de {len(worker_stats)} workers em {elapsed:.2f}s")
+
+    joblib.dump(model, config.MODEL_PATH)
+    print("✅ Modelo salvo em:", config.MODEL_PATH)
+    InferencePipeline(model, cleaner, encoder).compile().save(config.PIPELINE_PATH)
+    print("✅ Pipeline de inferência salvo em:", config.PIPELINE_PATH)
+
+    Y_pred = model.predict(X_test).reshape(len(Y_test), -1)
+    report = {
+        "mode": "distributed", "transport": transport_name, "partition": partition,
+        "strategy": config.BALANCING, "n_estimators": len(model.estimators_), "total_s": elapsed,
+        "recall_minoritaria": recall_score(Y_test[:, main_idx], Y_pred[:, main_idx], pos_label=1, zero_division=0),
+        "workers": worker_stats,
+    }
+    print(f"\n📈 Score no teste (dados originais): {np.mean(np.all(Y_pred == Y_test, axis=1)):.4f}")
+    print(f"📈 Recall da classe minoritária ({config.TARGET}=1): {report['recall_minoritaria']:.4f}")
+
+    with open(config.BALANCING_REPORT_PATH, "w") as f:
+        json.dump(report, f, indent=4)
+    print("📝 Relatório do treino salvo em:", config.BALANCING_REPORT_PATH)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Treino distribuído do forest (coordenador)")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Nº de workers (padrão: config.DISTRIBUTED['workers'] ou nº de CPUs)")
+    parser.add_argument("--transport", default=None, choices=sorted(TRANSPORTS),
+                        help="Backend de transporte (padrão: config.DISTRIBUTED['transport'])")
+    parser.add_argument("--partition", default=None, choices=PARTITION_MODES,
+                        help="Dados de cada worker (padrão: config.DISTRIBUTED['partition'])")
+    args = parser.parse_args()
+    config.init()
+    main(workers=args.workers, transport=args.transport, partition=args.partition)
@@ -0,0 +1,88 @@
+# dtype_policy.py
+# -*- coding: utf-8 -*-
+"""
+POLÍTICA DE DTYPES
+------------------
+- Leitura do bruto já nos tipos finais: sensores em config.FLOAT_DTYPE
+  (float32), colunas categóricas de baixa cardinalidade (tipo) e rótulos
+  em texto como category (códigos int8 em vez de uma string por linha)
+- Dataset tratado: rótulos e colunas one-hot/bool em config.FLAG_DTYPE
+  (uint8), demais features numéricas em float32; os dtypes ficam no schema
+  do cleaner (cleaning.py) e são reaplicados em train, evaluate, dash e API
+- feature_matrix: matriz C-contígua float32 montada coluna a coluna, sem
+  a cópia float64 intermediária do DataFrame.to_numpy() nem a cópia extra
+  que o sklearn faria para converter a matriz das árvores
+- footprint: memória ocupada vs. a mesma tabela em float64/object (padrão
+  do pd.read_csv), usada no relatório por etapa (instrumentation.py)
+"""
+
+import sys
+
+import numpy as np
+import pandas as pd
+import config
+
+
+def raw_dtypes():
+    """dtypes do pd.read_csv para config.DATA_RAW"""
+    dtypes = {col: config.FLOAT_DTYPE for col in config.NUMERIC_COLS}
+    dtypes.update({col: "category" for col in config.CATEGORICAL_COLS
+                   if col not in config.HIGH_CARDINALITY_COLS})
+    dtypes.update({col: "category" for col in config.LABEL_COLS})
+    return dtypes
+
+
+def read_raw(path=None, **kwargs):
+    """pd.read_csv do dataset bruto aplicando raw_dtypes()"""
+    return pd.read_csv(path or config.DATA_RAW, dtype=raw_dtypes(), **kwargs)
+
+
+def schema_dtypes(df, flag_columns=()):
+    """
+    dtype final de cada coluna de um DataFrame já convertido para números:
+    `flag_columns` (rótulos) e colunas binárias bool/uint8 ficam em uint8,
+    o restante em float32.
+    """
+    dtypes = {}
+    for col in df.columns:
+        dtype = df[col].dtype
+        if col in flag_columns or dtype == bool or dtype == np.uint8:
+            dtypes[col] = np.dtype(config.FLAG_DTYPE)
+        else:
+            dtypes[col] = np.dtype(config.FLOAT_DTYPE)
+    return dtypes
+
+
+def feature_matrix(X):
+    """Matriz C-contígua float32 (layout das árvores do sklearn) a partir de um DataFrame"""
+    if not isinstance(X, pd.DataFrame):
+        return np.ascontiguousarray(X, dtype=np.float32)
+    out = np.empty(X.shape, dtype=np.float32)
+    for j in range(X.shape[1]):
+        out[:, j] = X.iloc[:, j].to_numpy()
+    return out
+
+
+def _legacy_bytes(series):
+    """Bytes da coluna como o pd.read_csv deixaria (float64 ou object)"""
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        sizes = np.array([sys.getsizeof(str(value)) for value in series.cat.categories], dtype=np.int64)
+        codes = series.cat.codes.to_numpy()
+        return 8 * len(series) + int(sizes[codes[codes >= 0]].sum())
+    if pd.api.types.is_numeric_dtype(series.dtype) or series.dtype == bool:
+        return 8 * len(series)
+    return int(series.memory_usage(index=False, deep=True))
+
+
+def footprint(data):
+    """
+    {"mb": memória atual, "mb_float64": mesma tabela em float64/object}
+    para um DataFrame ou array numpy.
+    """
+    if isinstance(data, pd.DataFrame):
+        actual = int(data.memory_usage(index=False, deep=True).sum())
+        legacy = sum(_legacy_bytes(data[col]) for col in data.columns)
+    else:
+        actual = data.nbytes
+        legacy = data.size * 8
+    return {"mb": actual / 1e6, "mb_float64": legacy / 1e6}
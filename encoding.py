@@ -0,0 +1,269 @@
+# encoding.py
+# -*- coding: utf-8 -*-
+"""
+CODIFICAÇÃO DE VARIÁVEIS CATEGÓRICAS
+------------------------------------
+- Substitui o pd.get_dummies aplicado sobre todas as colunas categóricas
+- Colunas de alta cardinalidade (config.HIGH_CARDINALITY_COLS, ex.: id_produto)
+  usam o modo compacto definido em config.CATEGORICAL_ENCODING:
+    * "frequency": frequência relativa de cada categoria (1 coluna)
+    * "hash":      hashing trick com largura fixa (config.HASH_N_FEATURES colunas)
+    * "target":    média do target out-of-fold com suavização (1 coluna)
+    * "ordinal":   código inteiro de dicionário (1 coluna)
+    * "onehot":    comportamento antigo (uma coluna por categoria)
+- Demais colunas categóricas (ex.: tipo) continuam em one-hot com drop_first,
+  mas com categorias fixadas no fit
+- O encoder é ajustado uma vez no preprocess e salvo em config.ENCODER_PATH
+"""
+
+import numpy as np
+import pandas as pd
+import joblib
+import config
+
+ENCODING_MODES = ("onehot", "frequency", "hash", "target", "ordinal")
+
+
+def _stable_hash(values):
+    """Hash determinístico (independente de PYTHONHASHSEED) para strings"""
+    return pd.util.hash_array(np.asarray(values, dtype=object))
+
+
+class CategoricalEncoder:
+    """
+    Encoder ajustável/reutilizável para as colunas categóricas do dataset.
+
+    Todo o trabalho é feito sobre as categorias únicas (via factorize) e
+    depois propagado para as linhas com indexação vetorizada.
+    """
+
+    def __init__(self, columns=None, high_cardinality_cols=None, mode=None,
+                 n_hash_features=None, n_folds=None, smoothing=None, seed=None):
+        self.columns = list(columns if columns is not None else config.CATEGORICAL_COLS)
+        self.high_cardinality_cols = list(
+            high_cardinality_cols if high_cardinality_cols is not None
+            else config.HIGH_CARDINALITY_COLS
+        )
+        self.mode = mode or config.CATEGORICAL_ENCODING
+        self.n_hash_features = n_hash_features or config.HASH_N_FEATURES
+        self.n_folds = n_folds or config.TARGET_ENCODING_FOLDS
+        self.smoothing = config.TARGET_ENCODING_SMOOTHING if smoothing is None else smoothing
+        self.seed = config.SEED if seed is None else seed
+
+        if self.mode not in ENCODING_MODES:
+            raise ValueError(f"Modo de codificação inválido: '{self.mode}'. Use um de {ENCODING_MODES}")
+
+    # =====================
+    # Helpers internos
+    # =====================
+    def _column_mode(self, col):
+        return self.mode if col in self.high_cardinality_cols else "onehot"
+
+    @staticmethod
+    def _as_str(values):
+        return pd.Series(values).astype(str).to_numpy()
+
+    @staticmethod
+    def _codes(values, categories):
+        """Posição de cada valor em `categories` (-1 para categorias não vistas)"""
+        return pd.Index(categories).get_indexer(pd.Series(values).astype(str))
+
+    def _folds(self, positions):
+        """Fold de cada linha, derivado da posição global (independe de chunks)"""
+        hashed = pd.util.hash_array(np.asarray(positions, dtype=np.int64),
+                                    hash_key=f"{self.seed:016d}"[:16])
+        return (hashed % np.uint64(self.n_folds)).astype(np.int64)
+
+    def _reset_stats(self):
+        self._n_rows = 0
+        self._counts = {}
+        self._fold_sums = {}
+        self._fold_counts = {}
+
+    def _accumulate(self, df, y=None, positions=None):
+        """Acumula contagens (e somas do target por fold) de um bloco de linhas"""
+        if positions is None:
+            positions = np.arange(self._n_rows, self._n_rows + len(df))
+        self._n_rows += len(df)
+
+        for col in self.columns:
+            mode = self._column_mode(col)
+            if mode == "hash":
+                continue
+            values = self._as_str(df[col].to_numpy())
+            counts = pd.Series(values).value_counts(sort=False)
+            previous = self._counts.get(col)
+            self._counts[col] = counts if previous is None else previous.add(counts, fill_value=0)
+
+            if mode == "target":
+                if y is None:
+                    raise ValueError("Codificação 'target' requer y no fit")
+                y_arr = np.asarray(y, dtype=np.float64)
+                mask = ~np.isnan(y_arr)
+                grouped = pd.DataFrame({
+                    "value": values[mask], "fold": self._folds(positions)[mask], "y": y_arr[mask]
+                }).groupby(["value", "fold"])["y"].agg(["sum", "count"])
+                sums = grouped["sum"].unstack(fill_value=0).reindex(columns=range(self.n_folds), fill_value=0)
+                cnts = grouped["count"].unstack(fill_value=0).reindex(columns=range(self.n_folds), fill_value=0)
+                if col in self._fold_sums:
+                    sums = self._fold_sums[col].add(sums, fill_value=0)
+                    cnts = self._fold_counts[col].add(cnts, fill_value=0)
+                self._fold_sums[col] = sums
+                self._fold_counts[col] = cnts
+
+    def _finalize(self):
+        self.categories_ = {}
+        self.frequencies_ = {}
+        self.fold_sums_ = {}
+        self.fold_counts_ = {}
+
+        for col in self.columns:
+            mode = self._column_mode(col)
+            if mode == "hash":
+                continue
+            counts = self._counts[col].sort_index()
+            # Categorias ordenadas: mesmo comportamento do get_dummies(drop_first=True)
+            self.categories_[col] = pd.Index(counts.index)
+
+            if mode == "frequency":
+                self.frequencies_[col] = (counts.to_numpy() / self._n_rows).astype(np.float32)
+            elif mode == "target":
+                index = self.categories_[col]
+                self.fold_sums_[col] = self._fold_sums[col].reindex(index, fill_value=0).to_numpy(np.float64)
+                self.fold_counts_[col] = self._fold_counts[col].reindex(index, fill_value=0).to_numpy(np.float64)
+
+        self.feature_names_out_ = self._feature_names()
+        return self
+
+    def _smoothed(self, sums, counts, prior):
+        return (sums + prior * self.smoothing) / (counts + self.smoothing)
+
+    def _target_values(self, col, codes, positions=None):
+        """
+        Média suavizada do target por categoria. Com `positions`, cada linha
+        recebe a média calculada sem o seu próprio fold (out-of-fold).
+        """
+        sums, counts = self.fold_sums_[col], self.fold_counts_[col]
+        total_sums, total_counts = sums.sum(axis=1), counts.sum(axis=1)
+        valid = codes >= 0
+        safe = np.where(valid, codes, 0)
+
+        if positions is None:
+            prior = total_sums.sum() / max(total_counts.sum(), 1.0)
+            values = self._smoothed(total_sums[safe], total_counts[safe], prior)
+            return np.where(valid, values, prior)
+
+        folds = self._folds(positions)
+        fold_prior = (total_sums.sum() - sums.sum(axis=0)) / np.maximum(total_counts.sum() - counts.sum(axis=0), 1.0)
+        prior = fold_prior[folds]
+        oof_sums = total_sums[safe] - sums[safe, folds]
+        oof_counts = total_counts[safe] - counts[safe, folds]
+        return np.where(valid, self._smoothed(oof_sums, oof_counts, prior), prior)
+
+    # =====================
+    # API pública
+    # =====================
+    def fit(self, df, y=None):
+        self._reset_stats()
+        self._accumulate(df, y)
+        return self._finalize()
+
+    def partial_fit(self, df, y=None, positions=None):
+        """Ajuste incremental (modo streaming): acumula estatísticas bloco a bloco"""
+        if not hasattr(self, "_counts"):
+            self._reset_stats()
+        self._accumulate(df, y, positions)
+        return self._finalize()
+
+    def _feature_names(self):
+        names = []
+        for col in self.columns:
+            mode = self._column_mode(col)
+            if mode == "onehot":
+                names += [f"{col}_{cat}" for cat in self.categories_[col][1:]]
+            elif mode == "hash":
+                names += [f"{col}_hash_{i:02d}" for i in range(self.n_hash_features)]
+            elif mode == "frequency":
+                names.append(f"{col}_freq")
+            elif mode == "target":
+                names.append(f"{col}_te")
+            elif mode == "ordinal":
+                names.append(f"{col}_code")
+        return names
+
+    def _encode_column(self, col, values, positions=None):
+        mode = self._column_mode(col)
+        n = len(values)
+
+        if mode == "onehot":
+            cats = self.categories_[col]
+            codes = self._codes(values, cats)
+            dummies = np.zeros((n, max(len(cats) - 1, 0)), dtype=np.uint8)
+            rows = np.flatnonzero(codes > 0)
+            dummies[rows, codes[rows] - 1] = 1
+            return pd.DataFrame(dummies, columns=[f"{col}_{c}" for c in cats[1:]])
+
+        if mode == "hash":
+            codes, uniques = pd.factorize(pd.Series(values).astype(str))
+            buckets = (_stable_hash(uniques) % np.uint64(self.n_hash_features)).astype(np.int64)
+            hashed = np.zeros((n, self.n_hash_features), dtype=np.uint8)
+            hashed[np.arange(n), buckets[codes]] = 1
+            return pd.DataFrame(hashed, columns=[f"{col}_hash_{i:02d}" for i in range(self.n_hash_features)])
+
+        codes = self._codes(values, self.categories_[col])
+        if mode == "frequency":
+            table = np.append(self.frequencies_[col], np.float32(0.0))
+            return pd.DataFrame({f"{col}_freq": table[codes]})
+        if mode == "ordinal":
+            return pd.DataFrame({f"{col}_code": codes.astype(np.int32)})
+        if mode == "target":
+            encoded = self._target_values(col, codes, positions)
+            return pd.DataFrame({f"{col}_te": encoded.astype(np.float32)})
+
+        raise ValueError(f"Modo de codificação inválido: '{mode}'")
+
+    def transform(self, df, positions=None):
+        """
+        Substitui as colunas categóricas de `df` pelas colunas codificadas.
+
+        `positions` (posição global de cada linha no dataset de treino) ativa
+        o target encoding out-of-fold; sem ele usa-se a média de todo o treino.
+        Colunas categóricas ausentes (ex.: predição sem id_produto) são
+        tratadas como categoria não vista.
+        """
+        missing_values = np.full(len(df), np.nan, dtype=object)
+        encoded = [
+            self._encode_column(col, df[col].to_numpy() if col in df.columns else missing_values, positions)
+            for col in self.columns
+        ]
+        rest = df.drop(columns=[col for col in self.columns if col in df.columns])
+        out = pd.concat([rest.reset_index(drop=True)] + encoded, axis=1)
+        out.index = df.index
+        return out
+
+    def fit_transform(self, df, y=None):
+        """
+        Ajusta e transforma. No modo "target" as linhas de treino recebem
+        médias out-of-fold (K folds) para evitar vazamento do target.
+        """
+        self.fit(df, y)
+        return self.transform(df, positions=np.arange(len(df)))
+
+    def is_raw(self, df):
+        """True se `df` ainda contém as colunas categóricas brutas"""
+        return any(col in df.columns for col in self.columns)
+
+    def save(self, path=None):
+        joblib.dump(self, path or config.ENCODER_PATH)
+
+    def summary(self):
+        return (f"modo={self.mode}, alta cardinalidade={self.high_cardinality_cols}, "
+                f"{len(self.feature_names_out_)} colunas geradas")
+
+
+def load_encoder(path=None):
+    """Carrega o encoder salvo pelo preprocess (None se não existir)"""
+    path = path or config.ENCODER_PATH
+    if not path.exists():
+        return None
+    return joblib.load(path)
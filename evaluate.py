@@ -1,57 +1,55 @@
 import pandas as pd
 import config
-import joblib
 import json
 from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_score
+from dataset_io import load_processed
+from inference import load_pipeline
+from instrumentation import step, record_data
+
+def _metrics(y_true, y_pred):
+    return {
+        "accuracy": accuracy_score(y_true, y_pred),
+        "precision": precision_score(y_true, y_pred, average='weighted', zero_division=0),
+        "recall": recall_score(y_true, y_pred, average='weighted', zero_division=0),
+        "f1": f1_score(y_true, y_pred, average='weighted', zero_division=0),
+    }
 
 def main():
-    print("📥 Carregando modelo de:", config.MODEL_PATH)
-    model = joblib.load(config.MODEL_PATH)
+    print("📥 Carregando pipeline de inferência de:", config.PIPELINE_PATH)
+    pipeline = load_pipeline(config.PIPELINE_PATH)
     
     print("📥 Carregando dados tratados de:", config.DATA_PROCESSED)
-    df = pd.read_csv(config.DATA_PROCESSED, low_memory=False)
-    
-    # =====================
-    # Limpeza de dados (mesmo processo do train.py)
-    # =====================
-    print("🔧 Limpando dados para avaliação...")
-    
-    # Converter valores booleanos em string para numéricos
-    df = df.replace({'True': 1, 'False': 0, 'true': 1, 'false': 0})
-    
-    # Converter colunas object para numérico quando possível
-    for col in df.columns:
-        if df[col].dtype == 'object' and col != config.TARGET:
-            try:
-                df[col] = pd.to_numeric(df[col], errors='coerce')
-            except:
-                pass
-    
-    # Preencher valores NaN que possam ter surgido da conversão
-    df = df.fillna(0)
+    with step("load"):
+        df = load_processed(config.DATA_PROCESSED)
+        record_data(df)
     
     # =====================
-    # Separação em X e y
+    # Features no layout de treino (encoder/cleaner salvos no pipeline)
     # =====================
-    X = df.drop(columns=[config.TARGET])
-    y_true = df[config.TARGET]
+    print("🔧 Preparando features para avaliação...")
+    with step("prepare"):
+        X = pipeline.prepare(df)
+        record_data(X)
     
     # =====================
-    # Predição
+    # Predição (todas as saídas do modelo multi-saída em uma chamada)
     # =====================
     print("🔮 Fazendo predições...")
-    y_pred = model.predict(X)
+    with step("predict"):
+        Y_pred = pipeline.predict_labels(X)
     
     # =====================
     # Métricas
     # =====================
     print("📊 Calculando métricas...")
-    metrics = {
-        "accuracy": accuracy_score(y_true, y_pred),
-        "precision": precision_score(y_true, y_pred, average='weighted', zero_division=0),
-        "recall": recall_score(y_true, y_pred, average='weighted', zero_division=0),
-        "f1": f1_score(y_true, y_pred, average='weighted', zero_division=0),
+    per_target = {
+        target: _metrics(df[target], Y_pred[:, i])
+        for i, target in enumerate(pipeline.targets) if target in df.columns
     }
+    # Métricas principais continuam sendo as da falha geral
+    metrics = dict(per_target[config.TARGET])
+    if len(per_target) > 1:
+        metrics["per_target"] = per_target
     
     # Salvar métricas
     with open(config.METRICS_PATH, "w") as f:
@@ -61,4 +59,5 @@ def main():
     print(metrics)
 
 if __name__ == "__main__":
+    config.init()
     main()
@@ -0,0 +1,203 @@
+# experiments.py
+# -*- coding: utf-8 -*-
+"""
+Etapa opcional - EXPERIMENTOS
+-----------------------------
+- Compara variantes declaradas em config.EXPERIMENTS (estimador, balanceamento,
+  class_weight e parâmetros) usando o mesmo split do train.py
+- As variantes rodam em paralelo em um pool de processos; a matriz de treino
+  é gravada uma única vez em .npy e aberta por memory-map (somente leitura)
+  em cada processo, sem cópia por variante
+- Tabela comparativa (tempo de reamostragem, treino e predição + métricas da
+  falha geral) salva em config.EXPERIMENTS_PATH
+- Roda depois do treino de produção, que não espera pelas referências
+
+Uso:
+  python main.py --step experiments
+  python experiments.py --workers 4
+"""
+
+import json
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import contextmanager
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import BaggingClassifier, ExtraTreesClassifier, RandomForestClassifier
+from sklearn.metrics import accuracy_score, f1_score, precision_score, recall_score
+from sklearn.tree import DecisionTreeClassifier
+
+import config
+from balancing import categorical_indices, fit_balanced
+
+ESTIMATORS = {
+    "random_forest": RandomForestClassifier,
+    "extra_trees": ExtraTreesClassifier,
+    "decision_tree": DecisionTreeClassifier,
+    "bagging": BaggingClassifier,
+}
+# Estimadores que aceitam Y com várias colunas (os demais treinam só a falha geral)
+MULTI_OUTPUT_ESTIMATORS = {"random_forest", "extra_trees", "decision_tree"}
+
+# Arrays abertos por memory-map em cada processo do pool (ver _init_worker)
+_SHARED = {}
+
+
+def build_estimator(variant, seed=None):
+    """Instancia o estimador de uma variante (n_jobs=1: o paralelismo é do pool)"""
+    name = variant.get("estimator", "random_forest")
+    if name not in ESTIMATORS:
+        raise ValueError(f"Estimador inválido: '{name}'. Use um de {tuple(ESTIMATORS)}")
+    seed = config.SEED if seed is None else seed
+
+    params = dict(variant.get("params") or {})
+    params.setdefault("random_state", seed)
+    class_weight = variant.get("class_weight")
+    if name == "bagging":
+        # class_weight vai para as árvores base, como no notebook
+        params.setdefault("estimator", DecisionTreeClassifier(class_weight=class_weight, random_state=seed))
+    else:
+        params["class_weight"] = class_weight
+
+    estimator = ESTIMATORS[name](**params)
+    if "n_jobs" in estimator.get_params():
+        estimator.set_params(n_jobs=1)
+    return estimator
+
+
+def _metrics(y_true, y_pred):
+    return {
+        "accuracy": accuracy_score(y_true, y_pred),
+        "precision": precision_score(y_true, y_pred, average="weighted", zero_division=0),
+        "recall": recall_score(y_true, y_pred, average="weighted", zero_division=0),
+        "f1": f1_score(y_true, y_pred, average="weighted", zero_division=0),
+        "f1_macro": f1_score(y_true, y_pred, average="macro", zero_division=0),
+        "recall_falha": recall_score(y_true, y_pred, pos_label=1, zero_division=0),
+    }
+
+
+def _init_worker(paths, extra):
+    for name, path in paths.items():
+        _SHARED[name] = np.load(path, mmap_mode="r")
+    _SHARED.update(extra)
+
+
+def shared_arrays():
+    """Arrays (memory-map) e valores compartilhados do processo atual do pool"""
+    return _SHARED
+
+
+@contextmanager
+def shared_pool(arrays, max_workers, **extra):
+    """
+    Pool de processos em que `arrays` (nome -> ndarray) são gravados uma vez
+    em .npy e abertos por memory-map (somente leitura) em cada processo.
+    Dentro das tarefas, use shared_arrays()[nome]; `extra` vai junto.
+    """
+    with tempfile.TemporaryDirectory(prefix="experiments_") as tmp:
+        paths = {}
+        for name, array in arrays.items():
+            paths[name] = Path(tmp) / f"{name}.npy"
+            np.save(paths[name], np.ascontiguousarray(array))
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker,
+                                 initargs=(paths, extra)) as pool:
+            yield pool
+
+
+def run_variant(variant):
+    """Treina e avalia uma variante sobre os arrays compartilhados do processo"""
+    X_train, Y_train = _SHARED["X_train"], _SHARED["Y_train"]
+    X_test, Y_test = _SHARED["X_test"], _SHARED["Y_test"]
+    main_idx = _SHARED["main_idx"]
+    # class_weight em multi-saída multiplica os pesos de todas as saídas
+    # (degenera com tipos de falha raros): variantes com pesos usam só a falha geral
+    multi_output = (variant.get("estimator", "random_forest") in MULTI_OUTPUT_ESTIMATORS
+                    and variant.get("class_weight") is None and Y_train.shape[1] > 1)
+
+    Y_fit = Y_train if multi_output else Y_train[:, [main_idx]]
+    model, stats = fit_balanced(build_estimator(variant), X_train, Y_fit, variant.get("resampling", "none"),
+                                main_idx if multi_output else 0, config.SEED, _SHARED.get("categorical_idx"))
+
+    start = time.perf_counter()
+    y_pred = model.predict(X_test)
+    predict_s = time.perf_counter() - start
+    if multi_output:
+        y_pred = y_pred[:, main_idx]
+
+    return {
+        "name": variant["name"],
+        "estimator": variant.get("estimator", "random_forest"),
+        "resampling": variant.get("resampling", "none"),
+        "class_weight": variant.get("class_weight"),
+        "multi_output": multi_output,
+        "train_rows": stats["train_rows"],
+        "resample_s": stats["resample_s"],
+        "fit_s": stats["fit_s"],
+        "predict_s": predict_s,
+        **_metrics(Y_test[:, main_idx], y_pred),
+    }
+
+
+def run_experiments(X_train, X_test, Y_train, Y_test, main_idx=0, variants=None, max_workers=None,
+                    categorical_idx=None):
+    """
+    Executa as variantes em paralelo. Os arrays são gravados uma vez em um
+    diretório temporário e compartilhados por memory-map entre os processos.
+    Retorna a lista de resultados na ordem de `variants`.
+    """
+    variants = config.EXPERIMENTS if variants is None else variants
+    max_workers = max_workers or config.EXPERIMENT_WORKERS or os.cpu_count() or 1
+    max_workers = max(1, min(max_workers, len(variants)))
+
+    arrays = {"X_train": X_train, "X_test": X_test, "Y_train": Y_train, "Y_test": Y_test}
+    results = {}
+    with shared_pool(arrays, max_workers, main_idx=main_idx, categorical_idx=categorical_idx) as pool:
+        futures = {pool.submit(run_variant, variant): variant["name"] for variant in variants}
+        for future in as_completed(futures):
+            name = futures[future]
+            try:
+                results[name] = future.result()
+                print(f"   ✅ {name}: f1={results[name]['f1']:.4f} (treino {results[name]['fit_s']:.2f}s)")
+            except Exception as e:
+                print(f"   ❌ {name}: {e}")
+                results[name] = {"name": name, "error": str(e)}
+
+    return [results[variant["name"]] for variant in variants]
+
+
+def main(max_workers=None):
+    from train import load_training_data
+
+    X_train, X_test, Y_train, Y_test, targets, cleaner, encoder = load_training_data()
+    main_idx = targets.index(config.TARGET) if config.TARGET in targets else 0
+    categorical_idx = categorical_indices(cleaner.feature_columns_, encoder)
+
+    print(f"\n🧪 Executando {len(config.EXPERIMENTS)} variantes em paralelo...")
+    start = time.perf_counter()
+    results = run_experiments(X_train, X_test, Y_train, Y_test, main_idx, max_workers=max_workers,
+                              categorical_idx=categorical_idx)
+    elapsed = time.perf_counter() - start
+
+    table = pd.DataFrame(results).set_index("name")
+    print("\n📊 Comparação das variantes (métricas de", config.TARGET + "):")
+    print(table.round(4).to_string())
+    print(f"⏱️  Tempo total: {elapsed:.2f}s")
+
+    with open(config.EXPERIMENTS_PATH, "w") as f:
+        json.dump({"target": config.TARGET, "total_s": elapsed, "variants": results}, f, indent=4)
+    print("✅ Comparação salva em:", config.EXPERIMENTS_PATH)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Comparação paralela de variantes de treino")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Processos do pool (padrão: config.EXPERIMENT_WORKERS ou nº de CPUs)")
+    args = parser.parse_args()
+    config.init()
+    main(max_workers=args.workers)
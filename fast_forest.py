@@ -0,0 +1,259 @@
+# fast_forest.py
+# -*- coding: utf-8 -*-
+"""
+FOREST EM ARRAYS CONTÍGUOS
+--------------------------
+- Exporta um RandomForestClassifier treinado para arrays NumPy planos:
+  feature, threshold, filho esquerdo/direito (índices globais) e valores
+  das folhas, com as árvores concatenadas
+- A travessia avança todas as árvores de um lote de linhas em lockstep:
+  a cada nível, um gather vetorizado de (árvore, linha) decide o filho
+  (children[2 * nó + foi_para_esquerda])
+- Folhas apontam para si mesmas, então max_depth iterações bastam para
+  todas as árvores, sem máscaras
+- As probabilidades são somadas árvore a árvore e divididas pelo nº de
+  árvores, na mesma ordem do sklearn (mesmo resultado de predict_proba)
+- save/load: um .npy sem compressão por array; load abre com memory-map
+  somente leitura, então a carga não depende do tamanho do forest e vários
+  processos compartilham as mesmas páginas físicas (page cache)
+- Os arquivos são versionados pelo hash do conteúdo e meta.pkl é o único
+  arquivo trocado no lugar: um load concorrente com um save vê o forest
+  antigo ou o novo, inteiro
+"""
+
+import hashlib
+import os
+from importlib.metadata import version
+from pathlib import Path
+
+import joblib
+import numpy as np
+
+_TREE_LEAF = -1
+
+# A partir do sklearn 1.4 tree_.value já guarda frações por classe e o
+# predict_proba das árvores não renormaliza; antes disso, normalizava.
+# (versão lida dos metadados: abrir um forest salvo não precisa importar o sklearn)
+_SKLEARN_VERSION = tuple(int(part) for part in version("scikit-learn").split(".")[:2] if part.isdigit())
+_VALUE_IS_FRACTION = _SKLEARN_VERSION >= (1, 4)
+
+
+def _dump_replace(obj, path):
+    """joblib.dump em um temporário + os.replace (quem lê `path` nunca vê o arquivo pela metade)"""
+    tmp = path.with_name(path.stem + ".tmp" + path.suffix)
+    joblib.dump(obj, tmp)
+    os.replace(tmp, path)
+
+
+def _remove_versions(directory, keep):
+    """
+    Remove arquivos de versões fora de `keep` (None = arquivos sem versão,
+    de antes do versionamento). meta.pkl e temporários de um save em
+    andamento ficam.
+    """
+    for path in directory.iterdir():
+        parts = path.name.split(".")
+        if path.name == "meta.pkl" or "tmp" in parts or path.suffix not in (".npy", ".pkl"):
+            continue
+        if (parts[-2] if len(parts) == 3 else None) in keep:
+            continue
+        try:
+            path.unlink()
+        except OSError:
+            # Windows não remove arquivos mapeados por outro processo: sai no próximo save
+            pass
+
+
+class ArrayForest:
+    """Avaliador vetorizado de um forest de classificação exportado do sklearn"""
+
+    def __init__(self, feature, threshold, children, value=None,
+                 roots=None, max_depth=0, classes=None, n_features=0, leaf_values=None):
+        self.feature = feature
+        self.threshold = threshold
+        self.children = children
+        self.roots = roots
+        self.max_depth = int(max_depth)
+        self.classes_ = classes
+        self.n_features_in_ = int(n_features)
+        # Valores das folhas por target, contíguos (n_nós, n_classes): sem cópia a cada predict
+        if leaf_values is None:
+            leaf_values = [np.ascontiguousarray(value[:, k, :len(c)])
+                           for k, c in enumerate(self._classes_per_output())]
+        self.leaf_values = leaf_values
+
+    @property
+    def n_outputs_(self):
+        return len(self._leaf_values())
+
+    @property
+    def n_estimators(self):
+        return len(self.roots)
+
+    @classmethod
+    def from_sklearn(cls, forest):
+        """Achata as árvores de um RandomForestClassifier treinado"""
+        n_outputs = forest.n_outputs_
+        n_classes = np.atleast_1d(forest.n_classes_)
+        max_classes = int(n_classes.max())
+
+        features, thresholds, children, values, roots = [], [], [], [], []
+        offset = 0
+        max_depth = 0
+        for estimator in forest.estimators_:
+            tree = estimator.tree_
+            n_nodes = tree.node_count
+            node_ids = np.arange(offset, offset + n_nodes)
+            is_leaf = tree.children_left == _TREE_LEAF
+
+            # Folhas apontam para si mesmas: a travessia pode rodar max_depth passos em todas as árvores
+            left = np.where(is_leaf, node_ids, tree.children_left + offset)
+            right = np.where(is_leaf, node_ids, tree.children_right + offset)
+            children.append(np.stack([right, left], axis=1).ravel())
+            features.append(np.where(is_leaf, 0, tree.feature))
+            thresholds.append(np.where(is_leaf, 0.0, tree.threshold))
+
+            value = np.zeros((n_nodes, n_outputs, max_classes), dtype=np.float64)
+            for k in range(n_outputs):
+                node_value = tree.value[:, k, :n_classes[k]].astype(np.float64)
+                if not _VALUE_IS_FRACTION:
+                    normalizer = node_value.sum(axis=1)[:, np.newaxis]
+                    normalizer[normalizer == 0.0] = 1.0
+                    node_value = node_value / normalizer
+                value[:, k, :n_classes[k]] = node_value
+            values.append(value)
+
+            roots.append(offset)
+            max_depth = max(max_depth, tree.max_depth)
+            offset += n_nodes
+
+        return cls(
+            feature=np.concatenate(features).astype(np.int32),
+            threshold=np.ascontiguousarray(np.concatenate(thresholds), dtype=np.float64),
+            children=np.concatenate(children).astype(np.int32),
+            value=np.ascontiguousarray(np.concatenate(values)),
+            roots=np.asarray(roots, dtype=np.int32),
+            max_depth=max_depth,
+            classes=forest.classes_,
+            n_features=forest.n_features_in_,
+        )
+
+    # =====================
+    # Travessia
+    # =====================
+    def apply(self, X):
+        """Índice global da folha de cada (árvore, linha): shape (n_árvores, n_linhas)"""
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        n_rows = X.shape[0]
+        flat = X.ravel()
+        row_offsets = (np.arange(n_rows, dtype=np.int64) * X.shape[1])[np.newaxis, :]
+
+        nodes = np.repeat(self.roots[:, np.newaxis], n_rows, axis=1)
+        for _ in range(self.max_depth):
+            go_left = np.take(flat, row_offsets + np.take(self.feature, nodes)) <= np.take(self.threshold, nodes)
+            nodes = np.take(self.children, 2 * nodes + go_left)
+        return nodes
+
+    def predict_proba(self, X, batch_size=1024):
+        """Mesmo contrato (e mesmos valores) do RandomForestClassifier.predict_proba"""
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        if X.ndim != 2 or X.shape[1] != self.n_features_in_:
+            raise ValueError(f"X deve ter {self.n_features_in_} colunas, recebido shape {X.shape}")
+
+        leaf_values = self._leaf_values()
+        out = [np.zeros((X.shape[0], values.shape[1]), dtype=np.float64) for values in leaf_values]
+
+        # Lotes pequenos mantêm a matriz (árvores x linhas) de nós no cache
+        for start in range(0, X.shape[0], batch_size):
+            leaves = self.apply(X[start:start + batch_size])
+            for values, proba in zip(leaf_values, out):
+                block = proba[start:start + batch_size]
+                for tree_leaves in leaves:
+                    block += np.take(values, tree_leaves, axis=0)
+
+        for proba in out:
+            proba /= len(self.roots)
+        return out[0] if len(out) == 1 else out
+
+    def predict(self, X):
+        proba = self.predict_proba(X)
+        if isinstance(proba, list):
+            return np.column_stack([
+                classes[np.argmax(p, axis=1)] for p, classes in zip(proba, self.classes_)
+            ])
+        return self.classes_[np.argmax(proba, axis=1)]
+
+    def _classes_per_output(self):
+        return self.classes_ if isinstance(self.classes_, list) else [self.classes_]
+
+    def _leaf_values(self):
+        leaf_values = getattr(self, "leaf_values", None)
+        if leaf_values is None:
+            # Forests compilados antes de leaf_values existir guardam só `value`
+            leaf_values = [np.ascontiguousarray(self.value[:, k, :len(c)])
+                           for k, c in enumerate(self._classes_per_output())]
+            self.leaf_values = leaf_values
+        return leaf_values
+
+    # =====================
+    # Formato em disco (memory-map)
+    # =====================
+    def _arrays(self):
+        arrays = {"feature": self.feature, "threshold": self.threshold,
+                  "children": self.children, "roots": self.roots}
+        arrays.update({f"leaf_values_{k}": values for k, values in enumerate(self._leaf_values())})
+        return arrays
+
+    def save(self, directory):
+        """
+        Grava os arrays em `directory` e retorna a versão gravada (hash do
+        conteúdo). Cada array vai para <nome>.<versão>.npy e a meta para
+        meta.<versão>.pkl; por último, meta.pkl (cópia da meta atual) é
+        trocado com os.replace. Arquivos de uma versão nunca são reescritos,
+        então quem carrega durante um save vê a versão anterior ou a nova,
+        inteira. A versão anterior continua no disco (leitores que já abriram
+        a meta dela); as mais antigas são removidas.
+        """
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        arrays = {name: np.ascontiguousarray(array) for name, array in self._arrays().items()}
+        digest = hashlib.sha256()
+        for name, array in arrays.items():
+            digest.update(f"{name}:{array.dtype.str}:{array.shape}".encode("utf-8"))
+            digest.update(memoryview(array).cast("B"))
+        tag = digest.hexdigest()[:16]
+
+        files = {name: f"{name}.{tag}.npy" for name in arrays}
+        for name, array in arrays.items():
+            if not (directory / files[name]).exists():
+                tmp = directory / f"{name}.{tag}.tmp.npy"
+                np.save(tmp, array)
+                os.replace(tmp, directory / files[name])
+        meta = {"max_depth": self.max_depth, "classes": self.classes_, "n_features": self.n_features_in_,
+                "n_outputs": self.n_outputs_, "arrays": list(arrays), "version": tag, "files": files}
+        _dump_replace(meta, directory / f"meta.{tag}.pkl")
+
+        current = directory / "meta.pkl"
+        previous = joblib.load(current).get("version") if current.exists() else None
+        _dump_replace(meta, current)
+        _remove_versions(directory, keep={tag, previous})
+        return tag
+
+    @classmethod
+    def load(cls, directory, mmap_mode="r", version=None):
+        """
+        Abre um forest salvo por save(); com mmap_mode="r" nada é copiado para
+        a memória do processo. `version` abre uma versão específica (padrão:
+        a atual, de meta.pkl).
+        """
+        directory = Path(directory)
+        meta = joblib.load(directory / ("meta.pkl" if version is None else f"meta.{version}.pkl"))
+        # Forests gravados antes do versionamento: <nome>.npy
+        files = meta.get("files") or {name: f"{name}.npy" for name in meta["arrays"]}
+        arrays = {name: np.load(directory / files[name], mmap_mode=mmap_mode) for name in meta["arrays"]}
+        return cls(
+            feature=arrays["feature"], threshold=arrays["threshold"], children=arrays["children"],
+            roots=arrays["roots"], max_depth=meta["max_depth"], classes=meta["classes"],
+            n_features=meta["n_features"],
+            leaf_values=[arrays[f"leaf_values_{k}"] for k in range(meta["n_outputs"])],
+        )
@@ -0,0 +1,247 @@
+# inference.py
+# -*- coding: utf-8 -*-
+"""
+PIPELINE DE INFERÊNCIA
+----------------------
+- Um único artefato (config.PIPELINE_PATH) com tudo que a predição precisa:
+  encoder categórico, cleaner, lista ordenada de features, dtypes e modelo
+- Gerado pelo train.py; usado por evaluate.py, dash.py e app.py
+- predict_array: matriz (ou DataFrame) já no layout de treino -> matriz
+  float32 C-contígua (ver dtype_policy.feature_matrix)
+- predict_frame: DataFrame (bruto ou tratado) -> reindex/cast pelo schema salvo
+- score_chunks: predição bloco a bloco (upload em lote do app.py)
+- Lotes pequenos (até config.ARRAY_FOREST_MAX_ROWS linhas) usam o forest
+  exportado em arrays (fast_forest.py), com as mesmas probabilidades
+- save() também grava o formato memory-map (diretório <pipeline>.mmap/):
+  arrays das árvores em .npy sem compressão + pickle pequeno com encoder,
+  cleaner e schema. Com config.MODEL_FORMAT = "mmap" o load_pipeline abre
+  esse formato: carga quase constante e páginas do forest compartilhadas
+  entre processos (workers da API, Streamlit, evaluate, dash). O forest do
+  sklearn (lotes acima de ARRAY_FOREST_MAX_ROWS) é lido do .pkl só no
+  primeiro lote grande
+"""
+
+import copy
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import joblib
+import config
+from dtype_policy import feature_matrix
+from labels import normalize_labels
+
+
+def positive_proba(proba, classes):
+    """Probabilidade da classe positiva (1) de um predict_proba binário"""
+    classes = list(classes)
+    if 1 in classes:
+        return proba[:, classes.index(1)]
+    return np.zeros(proba.shape[0])
+
+
+class InferencePipeline:
+    """Encoder + cleaner + schema de features + modelo em um só objeto"""
+
+    def __init__(self, model, cleaner, encoder=None):
+        self.model = model
+        self.cleaner = cleaner
+        self.encoder = encoder
+        self.feature_columns = list(cleaner.feature_columns_)
+        self.feature_dtypes = {col: cleaner.dtypes_[col] for col in self.feature_columns}
+        self.targets = list(cleaner.target_columns)
+        self.fast_model = None
+        self.model_source = None
+        self.n_jobs = None
+
+    def compile(self):
+        """Exporta o forest para arrays contíguos (travessia vetorizada de baixa latência)"""
+        from fast_forest import ArrayForest
+        if hasattr(self.model, "estimators_") and hasattr(self.model, "classes_"):
+            self.fast_model = ArrayForest.from_sklearn(self.model)
+        return self
+
+    def _model_for(self, n_rows):
+        fast_model = getattr(self, "fast_model", None)
+        if fast_model is not None and (n_rows <= config.ARRAY_FOREST_MAX_ROWS or not self._has_sklearn()):
+            return fast_model
+        return self.sklearn_model()
+
+    def _has_sklearn(self):
+        return self.model is not None or getattr(self, "model_source", None) is not None
+
+    def sklearn_model(self):
+        """
+        Forest do sklearn. No formato memory-map ele não vem na carga: é lido
+        do pipeline .pkl (model_source) na primeira chamada que precisar dele.
+        """
+        if self.model is None:
+            self.model = joblib.load(self.model_source).model
+            if getattr(self, "n_jobs", None) is not None and hasattr(self.model, "n_jobs"):
+                self.model.n_jobs = self.n_jobs
+        return self.model
+
+    def set_n_jobs(self, n_jobs):
+        """n_jobs do forest do sklearn (vale também para o carregado sob demanda)"""
+        self.n_jobs = n_jobs
+        if hasattr(self.model, "n_jobs"):
+            self.model.n_jobs = n_jobs
+        return self
+
+    # =====================
+    # Preparação das features
+    # =====================
+    def prepare(self, df):
+        """
+        Converte um DataFrame no layout de treino. Dados brutos (colunas
+        categóricas ou rótulos em texto) passam pelo encoder e pela
+        normalização de rótulos; dados tratados só são reindexados e convertidos.
+        """
+        if self.encoder is not None and self.encoder.is_raw(df):
+            df, _ = normalize_labels(df, [col for col in config.LABEL_COLS if col in self.feature_columns])
+            df = self.encoder.transform(df)
+        return self.cleaner.transform(df)[self.feature_columns]
+
+    def to_array(self, X):
+        """Matriz C-contígua float32 (layout esperado pelas árvores do sklearn)"""
+        return feature_matrix(X)
+
+    # =====================
+    # Predição
+    # =====================
+    def predict_array(self, X):
+        """
+        Probabilidade positiva por target, shape (n_linhas, n_targets).
+        `X` deve estar na ordem de self.feature_columns.
+        """
+        X = self.to_array(X)
+        model = self._model_for(X.shape[0])
+        proba = model.predict_proba(X)
+        if isinstance(proba, list):
+            return np.column_stack([
+                positive_proba(p, classes) for p, classes in zip(proba, model.classes_)
+            ])
+        return positive_proba(proba, model.classes_)[:, None]
+
+    def predict_frame(self, df):
+        """DataFrame com a probabilidade positiva de cada target"""
+        X = self.prepare(df)
+        return pd.DataFrame(self.predict_array(X), columns=self.targets, index=df.index)
+
+    def score_chunks(self, chunks):
+        """
+        Pontua um iterável de blocos (ex.: pd.read_csv com chunksize): cada
+        bloco volta com uma coluna proba_<target> por saída do modelo, sem
+        acumular os anteriores (memória limitada ao tamanho do bloco).
+        """
+        for chunk in chunks:
+            yield pd.concat([chunk, self.predict_frame(chunk).add_prefix("proba_")], axis=1)
+
+    def predict_labels(self, X, threshold=0.5):
+        """Rótulos 0/1 a partir de predict_array (proba > threshold, como model.predict)"""
+        return (self.predict_array(X) > threshold).astype(np.uint8)
+
+    def save(self, path=None):
+        path = Path(path or config.PIPELINE_PATH)
+        joblib.dump(self, path)
+        if getattr(self, "fast_model", None) is not None:
+            self.save_mmap(mmap_path(path))
+
+    def save_mmap(self, directory):
+        """
+        Formato memory-map: forest em .npy + pipeline sem o modelo (pickle de
+        poucos KB) que registra a versão do forest gravada junto com ele
+        """
+        directory = Path(directory)
+        version = self.fast_model.save(directory / "forest")
+        light = copy.copy(self)
+        light.model = light.fast_model = light.model_source = None
+        light.forest_version = version
+        tmp = directory / "pipeline.tmp.pkl"
+        joblib.dump(light, tmp)
+        os.replace(tmp, directory / "pipeline.pkl")
+        return directory
+
+
+def mmap_path(path=None):
+    """Diretório do formato memory-map correspondente a um pipeline .pkl"""
+    return Path(path or config.PIPELINE_PATH).with_suffix(".mmap")
+
+
+def load_mmap(directory=None, source=None):
+    """
+    Abre o pipeline no formato memory-map (forest somente leitura, sem cópia).
+    `source` é o pipeline .pkl de onde o forest do sklearn é lido sob demanda
+    (padrão: o .pkl ao lado do diretório, se existir).
+    """
+    from fast_forest import ArrayForest
+    directory = Path(directory or mmap_path())
+    pipeline = joblib.load(directory / "pipeline.pkl")
+    # A versão registrada no pipeline.pkl: schema e forest sempre do mesmo save
+    pipeline.fast_model = ArrayForest.load(directory / "forest", version=getattr(pipeline, "forest_version", None))
+    pipeline.model = None
+    source = Path(source) if source is not None else directory.with_suffix(".pkl")
+    pipeline.model_source = source if source.exists() else None
+    return pipeline
+
+
+def _mmap_is_current(path):
+    """True se o formato memory-map existe e não é mais antigo que o .pkl"""
+    marker = mmap_path(path) / "pipeline.pkl"
+    return marker.exists() and (not path.exists() or marker.stat().st_mtime >= path.stat().st_mtime)
+
+
+def check_model(model, cleaner, path):
+    """
+    Garante que um modelo "nu" corresponde ao schema do cleaner salvo pelo
+    preprocess (nº e nomes das features, nº de saídas). Um modelo de outro
+    layout (ex.: o modelo.pkl antigo, de um único target) levanta ValueError
+    em vez de virar um pipeline que prevê sobre as colunas erradas.
+    """
+    columns = list(cleaner.feature_columns_)
+    problems = []
+    n_features = getattr(model, "n_features_in_", None)
+    names = getattr(model, "feature_names_in_", None)
+    if n_features is not None and n_features != len(columns):
+        problems.append(f"{n_features} features no modelo x {len(columns)} no cleaner")
+    elif names is not None and list(names) != columns:
+        problems.append("nomes/ordem das features diferentes dos do cleaner")
+    n_outputs = getattr(model, "n_outputs_", 1)
+    if n_outputs != len(cleaner.target_columns):
+        problems.append(f"{n_outputs} saída(s) no modelo x {len(cleaner.target_columns)} targets no cleaner")
+    if problems:
+        raise ValueError(f"Modelo em {path} incompatível com o cleaner atual ({'; '.join(problems)}). "
+                         f"Execute o treino (python main.py --step train) para gerar {config.PIPELINE_PATH}.")
+
+
+def load_pipeline(path=None, mmap=None):
+    """
+    Carrega o pipeline de inferência. Com `mmap` (padrão: config.MODEL_FORMAT
+    == "mmap") usa o formato memory-map quando ele está atualizado. Se `path`
+    for um modelo "nu" (ex.: modelo.pkl) ou só existirem os artefatos
+    antigos, monta o pipeline a partir do modelo + cleaner/encoder salvos
+    pelo preprocess, desde que o modelo corresponda ao cleaner (check_model).
+    """
+    path = Path(path or config.PIPELINE_PATH)
+    if path.is_dir():
+        return load_mmap(path)
+    mmap = config.MODEL_FORMAT == "mmap" if mmap is None else mmap
+    if mmap and _mmap_is_current(path):
+        return load_mmap(mmap_path(path), source=path)
+    if not path.exists():
+        if not config.MODEL_PATH.exists():
+            raise FileNotFoundError(f"Pipeline não encontrado em {path}. "
+                                    f"Execute o treino (python main.py --step train).")
+        print(f"⚠️  Pipeline não encontrado em {path}; montando a partir de {config.MODEL_PATH}")
+        path = config.MODEL_PATH
+
+    obj = joblib.load(path)
+    if isinstance(obj, InferencePipeline):
+        return obj
+
+    from cleaning import load_cleaner
+    from encoding import load_encoder
+    cleaner = load_cleaner()
+    check_model(obj, cleaner, path)
+    return InferencePipeline(obj, cleaner, load_encoder())
@@ -0,0 +1,173 @@
+# instrumentation.py
+# -*- coding: utf-8 -*-
+"""
+INSTRUMENTAÇÃO DAS ETAPAS
+-------------------------
+- stage(nome): mede uma etapa do main.py (tempo de parede, tempo de CPU do
+  processo e dos subprocessos, pico de RSS); cpu_s é o total (processo +
+  subprocessos encerrados, ex.: pools do experiments/tune), com o detalhe
+  em cpu_self_s e cpu_children_s
+- step(nome): mesma medição para sub-etapas nomeadas dentro de preprocess,
+  train etc.; fora de uma etapa ativa não faz nada
+- O pico de RSS é zerado no início de cada medição (/proc/self/clear_refs,
+  Linux); sem esse recurso usa-se o ru_maxrss do processo (monotônico)
+- Com profile=True a etapa roda sob cProfile e o resultado é salvo em
+  config.PROFILES_DIR/<etapa>.prof (snakeviz, flameprof, python -m pstats)
+- record_data(dados) anota na medição atual a memória do DataFrame/matriz
+  produzido e quanto ocuparia em float64/object (ver dtype_policy.py)
+- save() grava o relatório em config.STAGE_METRICS_PATH
+"""
+
+import cProfile
+import json
+import resource
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+import config
+
+_report = {"started": None, "stages": []}
+_stack = []
+
+
+def _read_hwm_mb():
+    """Pico de RSS (MB) desde o último reset"""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024.0
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0
+
+
+def _reset_hwm():
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+    except OSError:
+        pass
+
+
+def _rss_mb():
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024.0
+    except OSError:
+        pass
+    return None
+
+
+def _children_cpu():
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return usage.ru_utime + usage.ru_stime
+
+
+@contextmanager
+def _measure(name):
+    if _stack:
+        # O pico até aqui pertence à medição externa; zera para a interna
+        _stack[-1]["_peak"] = max(_stack[-1]["_peak"], _read_hwm_mb())
+    _reset_hwm()
+    record = {"name": name, "rss_start_mb": _rss_mb(), "steps": [], "_peak": 0.0}
+    wall, cpu, children = time.perf_counter(), time.process_time(), _children_cpu()
+    _stack.append(record)
+    try:
+        yield record
+    finally:
+        _stack.pop()
+        record["wall_s"] = time.perf_counter() - wall
+        record["cpu_self_s"] = time.process_time() - cpu
+        record["cpu_children_s"] = _children_cpu() - children
+        record["cpu_s"] = record["cpu_self_s"] + record["cpu_children_s"]
+        record["peak_rss_mb"] = max(record.pop("_peak"), _read_hwm_mb())
+        record["rss_end_mb"] = _rss_mb()
+        if not record["steps"]:
+            del record["steps"]
+        if _stack:
+            _stack[-1]["steps"].append(record)
+            _stack[-1]["_peak"] = max(_stack[-1]["_peak"], record["peak_rss_mb"])
+            _reset_hwm()
+
+
+def start_run():
+    """Inicia um novo relatório (uma execução do main.py)"""
+    _report["started"] = datetime.now().isoformat(timespec="seconds")
+    _report["stages"] = []
+
+
+@contextmanager
+def stage(name, profile=False):
+    """Mede uma etapa do pipeline; com `profile`, grava o cProfile da etapa"""
+    profiler = cProfile.Profile() if profile else None
+    with _measure(name) as record:
+        if profiler is not None:
+            profiler.enable()
+        try:
+            yield record
+        finally:
+            if profiler is not None:
+                profiler.disable()
+                config.PROFILES_DIR.mkdir(parents=True, exist_ok=True)
+                path = config.PROFILES_DIR / f"{name}.prof"
+                profiler.dump_stats(path)
+                record["profile"] = str(path)
+    _report["stages"].append(record)
+
+
+@contextmanager
+def step(name):
+    """Sub-etapa nomeada; só é medida dentro de uma etapa ativa"""
+    if not _stack:
+        yield None
+        return
+    with _measure(name) as record:
+        yield record
+
+
+def record_data(data):
+    """Anota na medição atual a memória de `data` (DataFrame ou array)"""
+    if not _stack:
+        return
+    from dtype_policy import footprint
+    _stack[-1]["data"] = footprint(data)
+
+
+def record_cached(name):
+    """Registra uma etapa pulada pelo cache (stage_cache.py)"""
+    _report["stages"].append({"name": name, "cached": True})
+
+
+def report():
+    return _report
+
+
+def save(path=None):
+    """Grava o relatório em JSON (padrão config.STAGE_METRICS_PATH)"""
+    path = path or config.STAGE_METRICS_PATH
+    with open(path, "w") as f:
+        json.dump(_report, f, indent=4)
+    return path
+
+
+def summary_lines(records=None, indent=""):
+    """Linhas legíveis (etapa: tempo, CPU, pico de memória) para o log"""
+    lines = []
+    for record in _report["stages"] if records is None else records:
+        if record.get("cached"):
+            lines.append(f"{indent}{record['name']}: cache")
+            continue
+        line = (f"{indent}{record['name']}: {record['wall_s']:.2f}s "
+                f"(CPU {record['cpu_s']:.2f}s, "
+                f"pico {record['peak_rss_mb']:.0f} MB)")
+        data = record.get("data")
+        if data:
+            saving = 1 - data["mb"] / data["mb_float64"] if data["mb_float64"] else 0.0
+            line += f", dados {data['mb']:.1f} MB vs {data['mb_float64']:.1f} MB em float64 (-{saving:.0%})"
+        lines.append(line)
+        lines += summary_lines(record.get("steps", []), indent + "   ")
+    return lines
@@ -0,0 +1,71 @@
+# labels.py
+# -*- coding: utf-8 -*-
+"""
+NORMALIZAÇÃO DE RÓTULOS
+-----------------------
+- O dataset bruto mistura grafias para os rótulos binários
+  ('Não', 'não', 'N', '0', '-', 'False', 'Sim', 'sim', 'y', '1', 'True', ...)
+- Cada coluna de config.LABEL_COLS é fatorada: só os valores únicos passam
+  pelo dicionário LABEL_MAP e o resultado volta para as linhas por indexação
+  (trabalho em Python proporcional ao nº de valores únicos, não de linhas)
+- Valores fora do dicionário viram NaN e são reportados
+"""
+
+import numpy as np
+import pandas as pd
+import config
+
+# Grafia normalizada (strip + lower) -> rótulo binário
+LABEL_MAP = {
+    "1": 1, "1.0": 1, "sim": 1, "s": 1, "true": 1, "verdadeiro": 1, "y": 1, "yes": 1,
+    "0": 0, "0.0": 0, "não": 0, "nao": 0, "n": 0, "false": 0, "falso": 0, "-": 0, "no": 0,
+}
+
+
+def normalize_series(series, label_map=None):
+    """
+    Normaliza uma coluna de rótulos.
+    Retorna (série normalizada, {valor não mapeado: nº de linhas}).
+    """
+    label_map = LABEL_MAP if label_map is None else label_map
+    codes, uniques = pd.factorize(series)
+
+    keys = [str(value).strip().lower() for value in uniques]
+    table = np.array([label_map.get(key, np.nan) for key in keys], dtype=np.float64)
+    values = np.where(codes >= 0, table[np.maximum(codes, 0)] if len(table) else np.nan, np.nan)
+
+    unmapped = {}
+    missing_codes = np.flatnonzero(np.isnan(table))
+    if len(missing_codes):
+        counts = np.bincount(codes[codes >= 0], minlength=len(uniques))
+        unmapped = {uniques[i]: int(counts[i]) for i in missing_codes}
+
+    if not np.isnan(values).any():
+        values = values.astype(np.uint8)
+    return pd.Series(values, index=series.index, name=series.name), unmapped
+
+
+def normalize_labels(df, columns=None, label_map=None):
+    """
+    Normaliza todas as colunas de rótulo presentes em `df`.
+    Retorna (df, relatório {coluna: {valor não mapeado: nº de linhas}}).
+    """
+    columns = config.LABEL_COLS if columns is None else columns
+    df = df.copy()
+    report = {}
+    for col in columns:
+        if col not in df.columns:
+            continue
+        df[col], unmapped = normalize_series(df[col], label_map)
+        if unmapped:
+            report[col] = unmapped
+    return df, report
+
+
+def print_report(report):
+    """Exibe os valores de rótulo não reconhecidos pelo LABEL_MAP"""
+    if not report:
+        print("🏷️  Todos os rótulos normalizados")
+        return
+    for col, unmapped in report.items():
+        print(f"⚠️  Rótulos não mapeados em '{col}': {unmapped}")
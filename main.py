@@ -13,11 +13,11 @@ import argparse
 from datetime import datetime
 from pathlib import Path
 
-# Importar módulos do projeto
+# Importar módulos do projeto (as etapas são importadas sob demanda em run_*:
+# --step preprocess não paga o import do sklearn/imblearn)
 import config
-import preprocess
-import train
-import evaluate
+import stage_cache
+import instrumentation
 
 def setup_logging():
     """
@@ -45,6 +45,7 @@ def run_preprocessing():
     
     try:
         # Importar e executar preprocessamento
+        import preprocess
         if hasattr(preprocess, 'main'):
             preprocess.main()
         else:
@@ -65,6 +66,7 @@ def run_training():
     
     try:
         # Importar e executar treinamento
+        import train
         if hasattr(train, 'main'):
             train.main()
         else:
@@ -85,6 +87,7 @@ def run_evaluation():
     
     try:
         # Importar e executar avaliação
+        import evaluate
         if hasattr(evaluate, 'main'):
             evaluate.main()
         else:
@@ -97,7 +100,60 @@ def run_evaluation():
         logger.error(f"❌ Erro na avaliação: {e}")
         return False
 
-def run_full_pipeline():
+def run_experiments():
+    """
+    Executa etapa de experimentos (variantes de referência em paralelo)
+    """
+    logger.info("🧪 Iniciando experimentos...")
+    
+    try:
+        import experiments
+        experiments.main()
+        logger.info("✅ Experimentos concluídos")
+        return True
+        
+    except Exception as e:
+        logger.error(f"❌ Erro nos experimentos: {e}")
+        return False
+
+def run_tuning():
+    """
+    Executa etapa de busca de hiperparâmetros (successive halving)
+    """
+    logger.info("🎛️  Iniciando busca de hiperparâmetros...")
+    
+    try:
+        import tune
+        tune.main()
+        logger.info("✅ Busca de hiperparâmetros concluída")
+        return True
+        
+    except Exception as e:
+        logger.error(f"❌ Erro na busca de hiperparâmetros: {e}")
+        return False
+
+def run_cached(stage, step_func, force=False, profile=False):
+    """
+    Executa uma etapa, pulando-a se as entradas não mudaram desde a última
+    execução bem-sucedida (ver stage_cache.py).
+    Tempo, CPU e pico de memória da etapa vão para o relatório de
+    instrumentation.py; com `profile`, também o cProfile da etapa.
+    Retorna (sucesso, veio_do_cache).
+    """
+    if not force and stage_cache.is_fresh(stage):
+        logger.info(f"⚡ Cache: entradas de '{stage}' inalteradas, reutilizando artefatos")
+        instrumentation.record_cached(stage)
+        return True, True
+    
+    with instrumentation.stage(stage, profile=profile) as record:
+        success = step_func()
+    logger.info(f"⏱️  {stage}: {record['wall_s']:.2f}s (CPU {record['cpu_s']:.2f}s, "
+                f"pico {record['peak_rss_mb']:.0f} MB)")
+    if success:
+        stage_cache.record(stage)
+    return success, False
+
+def run_full_pipeline(force=False, profile=False):
     """
     Executa pipeline completo
     """
@@ -108,9 +164,6 @@ def run_full_pipeline():
     
     start_time = datetime.now()
     
-    # Criar diretórios necessários
-    config.create_dirs()
-    
     # Verificar se arquivo de dados existe
     if not config.DATA_RAW.exists():
         logger.error(f"❌ Arquivo de dados não encontrado: {config.DATA_RAW}")
@@ -118,20 +171,22 @@ def run_full_pipeline():
         return False
     
     steps = [
-        ("Preprocessamento", run_preprocessing),
-        ("Treinamento", run_training),
-        ("Avaliação", run_evaluation)
+        ("Preprocessamento", "preprocess", run_preprocessing),
+        ("Treinamento", "train", run_training),
+        ("Avaliação", "evaluate", run_evaluation),
+        # Depois do modelo de produção: as referências não atrasam o deploy
+        ("Experimentos", "experiments", run_experiments)
     ]
     
     results = []
     
-    for step_name, step_func in steps:
+    for step_name, stage, step_func in steps:
         logger.info(f"\n{'='*60}")
         logger.info(f"📋 ETAPA: {step_name}")
         logger.info(f"{'='*60}")
         
-        success = step_func()
-        results.append((step_name, success))
+        success, cached = run_cached(stage, step_func, force=force, profile=profile)
+        results.append((step_name, success, cached))
         
         if not success:
             logger.error(f"❌ Pipeline interrompido na etapa: {step_name}")
@@ -148,11 +203,20 @@ def run_full_pipeline():
     logger.info(f"📅 Início: {start_time.strftime('%Y-%m-%d %H:%M:%S')}")
     logger.info(f"📅 Fim: {end_time.strftime('%Y-%m-%d %H:%M:%S')}")
     
-    for step_name, success in results:
+    for step_name, success, cached in results:
         status = "✅ SUCESSO" if success else "❌ FALHOU"
+        if cached:
+            status += " (cache)"
         logger.info(f"   {step_name}: {status}")
     
-    all_success = all(success for _, success in results)
+    cache_hits = [step_name for step_name, _, cached in results if cached]
+    logger.info(f"⚡ Etapas reutilizadas do cache: {', '.join(cache_hits) if cache_hits else 'nenhuma'}")
+    
+    logger.info("📈 Recursos por etapa:")
+    for line in instrumentation.summary_lines():
+        logger.info(f"   {line}")
+    
+    all_success = all(success for _, success, _ in results)
     
     if all_success:
         logger.info("\n🎉 PIPELINE CONCLUÍDO COM SUCESSO!")
@@ -175,18 +239,50 @@ def main():
 Exemplos de uso:
   python main.py                    # Pipeline completo
   python main.py --step preprocess  # Apenas preprocessamento
+  python main.py --chunksize 100000 # Preprocessamento em blocos (streaming)
+  python main.py --train-chunksize 100000  # Treino incremental em blocos (warm_start)
+  python main.py --force            # Ignora o cache e executa todas as etapas
+  python main.py --profile          # cProfile por etapa (reports/profiles/*.prof)
   python main.py --step train       # Apenas treinamento
   python main.py --step evaluate    # Apenas avaliação
+  python main.py --step experiments # Variantes de referência em paralelo
+  python main.py --step tune        # Busca de hiperparâmetros (F1 x latência)
         """
     )
     
     parser.add_argument(
         '--step',
-        choices=['preprocess', 'train', 'evaluate', 'all'],
+        choices=['preprocess', 'train', 'evaluate', 'experiments', 'tune', 'all'],
         default='all',
         help='Etapa específica a executar (padrão: all)'
     )
     
+    parser.add_argument(
+        '--force',
+        action='store_true',
+        help='Ignora o cache de etapas e executa tudo novamente'
+    )
+    
+    parser.add_argument(
+        '--chunksize',
+        type=int,
+        default=None,
+        help='Preprocessamento em blocos de N linhas (arquivos maiores que a RAM)'
+    )
+    
+    parser.add_argument(
+        '--train-chunksize',
+        type=int,
+        default=None,
+        help='Treino incremental em blocos de N linhas (forest cresce com warm_start)'
+    )
+    
+    parser.add_argument(
+        '--profile',
+        action='store_true',
+        help=f'Grava um cProfile por etapa em {config.PROFILES_DIR}'
+    )
+    
     parser.add_argument(
         '--verbose',
         action='store_true',
@@ -195,6 +291,9 @@ Exemplos de uso:
     
     args = parser.parse_args()
     
+    # Sementes e diretórios (config não faz nada ao ser importado)
+    config.init()
+    
     # Configurar logging
     global logger
     logger = setup_logging()
@@ -203,15 +302,30 @@ Exemplos de uso:
         logging.getLogger().setLevel(logging.DEBUG)
         logger.debug("🔍 Modo debug ativado")
     
+    if args.chunksize:
+        config.PREPROCESS_CHUNKSIZE = args.chunksize
+        logger.info(f"🧩 Preprocessamento em blocos de {args.chunksize} linhas")
+    if args.train_chunksize:
+        config.TRAIN_CHUNKSIZE = args.train_chunksize
+        logger.info(f"🧩 Treino incremental em blocos de {args.train_chunksize} linhas")
+    
     # Executar etapa solicitada
+    instrumentation.start_run()
     if args.step == 'preprocess':
-        success = run_preprocessing()
+        success, _ = run_cached('preprocess', run_preprocessing, force=args.force, profile=args.profile)
     elif args.step == 'train':
-        success = run_training()
+        success, _ = run_cached('train', run_training, force=args.force, profile=args.profile)
     elif args.step == 'evaluate':
-        success = run_evaluation()
+        success, _ = run_cached('evaluate', run_evaluation, force=args.force, profile=args.profile)
+    elif args.step == 'experiments':
+        success, _ = run_cached('experiments', run_experiments, force=args.force, profile=args.profile)
+    elif args.step == 'tune':
+        success, _ = run_cached('tune', run_tuning, force=args.force, profile=args.profile)
     else:  # 'all'
-        success = run_full_pipeline()
+        success = run_full_pipeline(force=args.force, profile=args.profile)
+    
+    # Relatório de recursos (tempo, CPU, memória) por etapa e sub-etapa
+    logger.info(f"📝 Relatório de recursos salvo em: {instrumentation.save()}")
     
     # Exit code baseado no sucesso
     sys.exit(0 if success else 1)
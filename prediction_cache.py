@@ -0,0 +1,186 @@
+# prediction_cache.py
+# -*- coding: utf-8 -*-
+"""
+CACHE DE PREDIÇÕES
+------------------
+- Fica na frente do pipeline de inferência: vetores de sensores repetidos
+  (uso interativo do app, dashboards em polling) não pagam outro
+  predict_proba das 200 árvores
+- Chave: vetor de features canônico (layout de treino do cleaner, float32,
+  opcionalmente arredondado em config.PREDICTION_CACHE["decimals"] casas)
+  + versão do modelo. Entradas brutas ou tratadas, em qualquer ordem de
+  colunas, caem na mesma chave
+- Evicção LRU por tamanho (max_size) e por idade (ttl_s); contadores de
+  hit/miss/evicção em stats()
+- A versão do modelo é o (mtime, tamanho) de config.MODEL_PATH e do
+  pipeline servido: quando o treino regrava os artefatos o cache é
+  esvaziado e o pipeline recarregado automaticamente
+- get_cache(): instância única por processo (app.py, api.py e uso
+  programático); as linhas que faltam são pontuadas em uma única chamada
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+import config
+from dtype_policy import feature_matrix
+
+
+def _file_version(path):
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+class PredictionCache:
+    """Cache LRU/TTL de probabilidades por vetor de features canônico"""
+
+    def __init__(self, loader=None, max_size=None, ttl_s=None, decimals=None, watch=None, clock=time.monotonic):
+        settings = config.PREDICTION_CACHE
+        if loader is None:
+            from inference import load_pipeline
+            loader = lambda: load_pipeline(config.PIPELINE_PATH)
+        self.loader = loader
+        self.max_size = settings["max_size"] if max_size is None else max_size
+        self.ttl_s = settings["ttl_s"] if ttl_s is None else ttl_s
+        self.decimals = settings["decimals"] if decimals is None else decimals
+        self.watch = list(watch if watch is not None else [config.MODEL_PATH, config.PIPELINE_PATH])
+        self.clock = clock
+
+        self._lock = threading.RLock()
+        self._entries = OrderedDict()
+        self._pipeline = None
+        self._version = None
+        self._counters = {"hits": 0, "misses": 0, "evictions": 0, "expirations": 0, "invalidations": 0}
+
+    # =====================
+    # Versão do modelo
+    # =====================
+    def _refresh(self):
+        """Recarrega o pipeline (e esvazia o cache) se os artefatos mudaram"""
+        version = tuple(_file_version(path) for path in self.watch)
+        if self._pipeline is not None and version == self._version:
+            return
+        with self._lock:
+            if self._pipeline is not None and version == self._version:
+                return
+            if self._pipeline is not None:
+                self._counters["invalidations"] += 1
+            self._pipeline = self.loader()
+            self._version = version
+            self._entries.clear()
+
+    @property
+    def pipeline(self):
+        """Pipeline de inferência atual (recarregado quando o modelo muda)"""
+        self._refresh()
+        return self._pipeline
+
+    @property
+    def version(self):
+        self._refresh()
+        return self._version
+
+    @property
+    def targets(self):
+        return self.pipeline.targets
+
+    @property
+    def feature_columns(self):
+        return self.pipeline.feature_columns
+
+    # =====================
+    # Chaves e entradas
+    # =====================
+    def keys(self, X):
+        """Uma chave (bytes do vetor canônico) por linha de uma matriz no layout de treino"""
+        X = np.asarray(X, dtype=np.float64)
+        if self.decimals is not None:
+            X = np.round(X, self.decimals)
+        # + 0.0 troca -0.0 por 0.0 (mesmo valor, bytes diferentes)
+        canonical = np.ascontiguousarray(X.astype(np.float32) + np.float32(0.0))
+        return [row.tobytes() for row in canonical]
+
+    def _get(self, key, now):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at is not None and now >= expires_at:
+            del self._entries[key]
+            self._counters["expirations"] += 1
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def _put(self, key, value, now):
+        self._entries[key] = (None if self.ttl_s is None else now + self.ttl_s, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self._counters["evictions"] += 1
+
+    # =====================
+    # Predição
+    # =====================
+    def predict_array(self, X):
+        """Mesmo contrato de InferencePipeline.predict_array, consultando o cache linha a linha"""
+        pipeline = self.pipeline
+        X = feature_matrix(X)
+        keys = [(self._version, key) for key in self.keys(X)]
+        out = np.empty((len(X), len(pipeline.targets)), dtype=np.float64)
+
+        misses = []
+        with self._lock:
+            now = self.clock()
+            for i, key in enumerate(keys):
+                value = self._get(key, now)
+                if value is None:
+                    misses.append(i)
+                else:
+                    out[i] = value
+            self._counters["hits"] += len(keys) - len(misses)
+            self._counters["misses"] += len(misses)
+
+        if misses:
+            out[misses] = pipeline.predict_array(X[misses])
+            with self._lock:
+                now = self.clock()
+                for i in misses:
+                    self._put(keys[i], out[i].copy(), now)
+        return out
+
+    def predict_frame(self, df):
+        """Mesmo contrato de InferencePipeline.predict_frame (DataFrame bruto ou tratado)"""
+        pipeline = self.pipeline
+        proba = self.predict_array(pipeline.prepare(df))
+        return pd.DataFrame(proba, columns=pipeline.targets, index=df.index)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self._counters["hits"] + self._counters["misses"]
+            return dict(self._counters, size=len(self._entries), max_size=self.max_size, ttl_s=self.ttl_s,
+                        hit_rate=self._counters["hits"] / lookups if lookups else 0.0)
+
+
+_default_cache = None
+_default_lock = threading.Lock()
+
+
+def get_cache():
+    """Cache compartilhado do processo (criado na primeira chamada com config.PREDICTION_CACHE)"""
+    global _default_cache
+    with _default_lock:
+        if _default_cache is None:
+            _default_cache = PredictionCache()
+        return _default_cache
@@ -13,47 +13,231 @@ Etapa 1 - PRÉ-PROCESSAMENTO
 - Carrega dataset bruto (definido em config.DATA_RAW)
 - Realiza limpeza e transformação
 - Salva dataset tratado (config.DATA_PROCESSED)
+- Com chunksize (--chunksize ou config.PREPROCESS_CHUNKSIZE) processa o
+  arquivo bruto em blocos, com memória limitada pelo tamanho do bloco
 """
 
+import numpy as np
 import pandas as pd
 import config
+from encoding import CategoricalEncoder
+from dataset_io import save_processed, iter_processed, ProcessedWriter
+from cleaning import DataCleaner, to_numeric_columns
+from labels import normalize_labels, print_report
+from dtype_policy import read_raw, raw_dtypes
+from instrumentation import step, record_data
+
+def main(export_csv=None, chunksize=None):
+    chunksize = config.PREPROCESS_CHUNKSIZE if chunksize is None else chunksize
+    if chunksize:
+        return main_streaming(chunksize, export_csv=export_csv)
 
-def main():
     print("📥 Carregando dados de:", config.DATA_RAW)
-    df = pd.read_csv(config.DATA_RAW)
+    with step("read_csv"):
+        df = read_raw(config.DATA_RAW)
+        record_data(df)
 
     # =====================
     # Limpeza de dados
     # =====================
-    # Remover duplicados
-    df = df.drop_duplicates()
-
-    # Tratar valores ausentes
-    df = df.ffill().bfill()
+    with step("dedup_fill"):
+        # Remover duplicados
+        df = df.drop_duplicates()
 
-    # Normalização de labels (exemplo: target binário)
-    def normalize_label(x):
-        s = str(x).strip().lower()
-        if s in {"1", "sim", "s", "true", "verdadeiro", "y"}:
-            return 1
-        if s in {"0", "não", "nao", "n", "false", "falso", "-"}:
-            return 0
-        return None
+        # Tratar valores ausentes
+        df = df.ffill().bfill()
 
-    df[config.TARGET] = df[config.TARGET].apply(normalize_label)
+    # Normalização de labels (target e tipos de falha, ver labels.py)
+    with step("labels"):
+        df, unmapped = normalize_labels(df, config.LABEL_COLS)
+    print_report(unmapped)
 
     # =====================
     # Engenharia de Atributos (ajuste conforme seu dataset)
     # =====================
-    # Exemplo: encoding simples para variáveis categóricas
-    df = pd.get_dummies(df, columns=config.CATEGORICAL_COLS, drop_first=True)
+    # Encoding das variáveis categóricas (one-hot só para baixa cardinalidade;
+    # id_produto usa o modo compacto de config.CATEGORICAL_ENCODING)
+    with step("encode"):
+        encoder = CategoricalEncoder()
+        df = encoder.fit_transform(df, y=df[config.TARGET])
+        encoder.save(config.ENCODER_PATH)
+        record_data(df)
+    print(f"🔤 Encoder categórico ({encoder.summary()}) salvo em:", config.ENCODER_PATH)
+
+    # Limpeza/schema compartilhado com train, evaluate e dash
+    with step("clean"):
+        cleaner = DataCleaner()
+        df = cleaner.fit_transform(df)
+        cleaner.save(config.CLEANER_PATH)
+        record_data(df)
+    print(f"🧹 Cleaner ({cleaner.summary()}) salvo em:", config.CLEANER_PATH)
 
     # =====================
     # Salvar dataset tratado
     # =====================
-    df.to_csv(config.DATA_PROCESSED, index=False)
+    with step("save"):
+        save_processed(df, config.DATA_PROCESSED, export_csv=export_csv)
     print("✅ Dados tratados salvos em:", config.DATA_PROCESSED)
 
 
+# =====================
+# Modo streaming (arquivos maiores que a RAM)
+# =====================
+class _SeenRows:
+    """
+    Hashes (uint64) das linhas já vistas, guardados em blocos ordenados que
+    são fundidos em potências de 2 (8 bytes por linha única, busca O(log n)).
+    """
+
+    def __init__(self):
+        self.blocks = []
+
+    def contains(self, hashes):
+        found = np.zeros(len(hashes), dtype=bool)
+        for block in self.blocks:
+            pos = np.minimum(np.searchsorted(block, hashes), len(block) - 1)
+            found |= block[pos] == hashes
+        return found
+
+    def add(self, hashes):
+        if len(hashes) == 0:
+            return
+        self.blocks.append(np.sort(hashes))
+        while len(self.blocks) > 1 and len(self.blocks[-2]) <= 2 * len(self.blocks[-1]):
+            last = self.blocks.pop()
+            self.blocks[-1] = np.sort(np.concatenate([self.blocks[-1], last]))
+
+
+def _row_hashes(chunk):
+    """Hash por linha estável entre blocos (dtypes inferidos por bloco podem variar)"""
+    numeric = chunk.select_dtypes(include="number").columns
+    normalized = chunk.astype({col: "float64" if col in numeric else str for col in chunk.columns})
+    return pd.util.hash_pandas_object(normalized, index=False).to_numpy()
+
+
+def _first_valid_values(chunks):
+    """
+    Primeiro valor não nulo de cada coluna (o que o bfill leva para as
+    linhas iniciais). A leitura para assim que todas as colunas têm valor;
+    colunas sem nenhum valor no arquivo ficam de fora. Duplicados não mudam
+    o resultado: a primeira ocorrência de cada linha é sempre mantida.
+    """
+    first = {}
+    for chunk in chunks:
+        for col in chunk.columns:
+            if col not in first:
+                index = chunk[col].first_valid_index()
+                if index is not None:
+                    first[col] = chunk[col].loc[index]
+        if len(first) == len(chunk.columns):
+            break
+    return first
+
+
+def _dedup_and_fill(chunks, first_valid):
+    """
+    Equivalente em blocos de drop_duplicates() + ffill().bfill():
+    - duplicados são detectados pelo hash da linha contra todos os blocos anteriores
+    - o ffill carrega a última linha preenchida do bloco anterior
+    - NaN iniciais (coluna sem nenhum valor até ali) recebem o primeiro valor
+      da coluna no arquivo (`first_valid`, de _first_valid_values): cada
+      bloco sai assim que é lido, mesmo com colunas inteiramente vazias
+    """
+    seen = _SeenRows()
+    last = None
+
+    for chunk in chunks:
+        hashes = _row_hashes(chunk)
+        keep = ~pd.Series(hashes).duplicated().to_numpy()
+        if seen.blocks:
+            keep &= ~seen.contains(hashes)
+        seen.add(hashes[keep])
+        chunk = chunk[keep]
+        if chunk.empty:
+            continue
+
+        chunk = chunk.ffill() if last is None else pd.concat([last, chunk]).ffill().iloc[1:]
+        last = chunk.iloc[[-1]]
+        if chunk.isna().any().any():
+            chunk = chunk.fillna(first_valid)
+        yield chunk
+
+
+def main_streaming(chunksize, export_csv=None):
+    """
+    Pré-processamento em blocos de `chunksize` linhas:
+      1. bruto -> dedup/ffill/bfill/labels -> arquivo intermediário, acumulando
+         as estatísticas do encoder categórico
+      2. intermediário -> encoding + limpeza -> config.DATA_PROCESSED
+    Nenhuma etapa mantém o dataset inteiro em memória.
+    """
+    staging = config.DATA_PROCESSED.with_name(config.DATA_PROCESSED.stem + ".staging.feather")
+    print(f"📥 Carregando dados em blocos de {chunksize} linhas de:", config.DATA_RAW)
+
+    # =====================
+    # Passo 1: limpeza por bloco + estatísticas do encoder e do cleaner
+    # =====================
+    encoder = CategoricalEncoder()
+    cleaner = DataCleaner()
+    declared = set(raw_dtypes()) | set(config.LABEL_COLS)
+    unmapped = {}
+    n_raw = 0
+    with step("pass1_clean_fit_encoder"), ProcessedWriter(staging, export_csv=False) as writer:
+        # Leitura prévia (curta): valores do bfill sem reter blocos até o fim do arquivo
+        first_valid = _first_valid_values(read_raw(config.DATA_RAW, chunksize=chunksize))
+        raw_chunks = read_raw(config.DATA_RAW, chunksize=chunksize)
+        for chunk in _dedup_and_fill(raw_chunks, first_valid):
+            chunk, report = normalize_labels(chunk, config.LABEL_COLS)
+            for col, values in report.items():
+                for value, count in values.items():
+                    unmapped.setdefault(col, {})
+                    unmapped[col][value] = unmapped[col].get(value, 0) + count
+            # Labels em float64 para manter o schema fixo mesmo com NaN em algum bloco
+            chunk = chunk.astype({col: "float64" for col in config.LABEL_COLS if col in chunk.columns})
+
+            encoder.partial_fit(chunk, y=chunk[config.TARGET],
+                                positions=np.arange(writer.n_rows, writer.n_rows + len(chunk)))
+            # Colunas que passam direto pelo encoder: o schema do cleaner vê o arquivo inteiro
+            passthrough = [col for col in chunk.columns if col not in encoder.columns]
+            cleaner.partial_fit(chunk[passthrough])
+            # Colunas fora de raw_dtypes têm o tipo inferido por bloco (texto em um,
+            # número em outro): ficam em float64 para o schema do intermediário não mudar
+            chunk = to_numeric_columns(chunk, [col for col in passthrough if col not in declared])
+            writer.write(chunk)
+            n_raw += len(chunk)
+            print(f"   🔄 {n_raw} linhas limpas")
+    print_report(unmapped)
+
+    encoder.save(config.ENCODER_PATH)
+    print(f"🔤 Encoder categórico ({encoder.summary()}) salvo em:", config.ENCODER_PATH)
+
+    # =====================
+    # Passo 2: encoding + limpeza por bloco -> dataset tratado
+    # =====================
+    start = 0
+    with step("pass2_encode_clean"), ProcessedWriter(config.DATA_PROCESSED, export_csv=export_csv) as writer:
+        for chunk in iter_processed(staging):
+            chunk = encoder.transform(chunk, positions=np.arange(start, start + len(chunk)))
+            # Layout das colunas codificadas vem do primeiro bloco; as descartadas, do passo 1
+            if start == 0:
+                cleaner.fit(chunk)
+            start += len(chunk)
+            writer.write(cleaner.transform(chunk))
+
+    staging.unlink()
+    cleaner.save(config.CLEANER_PATH)
+    print(f"🧹 Cleaner ({cleaner.summary()}) salvo em:", config.CLEANER_PATH)
+    print(f"✅ Dados tratados ({start} linhas) salvos em:", config.DATA_PROCESSED)
+
+
 if __name__ == "__main__":
-    main()
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Pré-processamento do dataset bruto")
+    parser.add_argument("--export-csv", action="store_true",
+                        help=f"Também exporta o dataset tratado em CSV ({config.DATA_PROCESSED_CSV.name})")
+    parser.add_argument("--chunksize", type=int, default=None,
+                        help="Processa o arquivo bruto em blocos de N linhas (modo streaming)")
+    args = parser.parse_args()
+    config.init()
+    main(export_csv=args.export_csv or None, chunksize=args.chunksize)
@@ -0,0 +1,183 @@
+# stage_cache.py
+# -*- coding: utf-8 -*-
+"""
+CACHE DE ETAPAS DO PIPELINE
+---------------------------
+- Cada etapa (preprocess, train, evaluate, experiments, tune) tem uma impressão digital formada
+  pelo hash dos arquivos de entrada, pelos valores relevantes do config e
+  pelo hash do código das etapas
+- O código de uma etapa é o seu módulo mais todos os módulos do projeto que
+  ele importa, direta ou indiretamente (lido dos imports, ver code_dependencies)
+- Se a impressão digital coincide com a última execução e os artefatos de
+  saída continuam intactos, a etapa é pulada (main.py --force ignora o cache)
+- Artefatos em diretório (ex.: <pipeline>.mmap/) entram com o hash de todos
+  os arquivos que contêm
+- O estado fica em config.STAGE_CACHE_PATH
+"""
+
+import ast
+import hashlib
+import json
+from pathlib import Path
+
+import config
+
+# Entradas, parâmetros, módulo de entrada e saídas de cada etapa
+# (os módulos importados por ele entram sozinhos na impressão digital)
+STAGES = {
+    "preprocess": {
+        "inputs": ["DATA_RAW"],
+        "config": [
+            "TARGET", "LABEL_COLS", "TARGETS", "CATEGORICAL_COLS", "NUMERIC_COLS",
+            "HIGH_CARDINALITY_COLS", "CATEGORICAL_ENCODING", "HASH_N_FEATURES",
+            "TARGET_ENCODING_FOLDS", "TARGET_ENCODING_SMOOTHING", "SEED",
+            "FLOAT_DTYPE", "FLAG_DTYPE", "EXPORT_PROCESSED_CSV",
+        ],
+        "code": ["preprocess.py"],
+        "outputs": ["DATA_PROCESSED", "DATA_PROCESSED_CSV", "ENCODER_PATH", "CLEANER_PATH"],
+    },
+    "train": {
+        "inputs": ["DATA_PROCESSED", "ENCODER_PATH", "CLEANER_PATH"],
+        "config": ["TARGET", "TARGETS", "TEST_SIZE", "MODEL_PARAMS", "BALANCING", "SEED",
+                   "TRAIN_CHUNKSIZE", "TRAIN_RESERVOIR_SIZE"],
+        "code": ["train.py"],
+        "outputs": ["MODEL_PATH", "PIPELINE_PATH", "PIPELINE_MMAP_DIR"],
+    },
+    "experiments": {
+        "inputs": ["DATA_PROCESSED", "ENCODER_PATH", "CLEANER_PATH"],
+        "config": ["TARGET", "TARGETS", "TEST_SIZE", "SEED", "EXPERIMENTS"],
+        "code": ["experiments.py"],
+        "outputs": ["EXPERIMENTS_PATH"],
+    },
+    "tune": {
+        "inputs": ["DATA_PROCESSED", "ENCODER_PATH", "CLEANER_PATH"],
+        "config": ["TARGET", "TARGETS", "TEST_SIZE", "SEED", "TUNE"],
+        "code": ["tune.py"],
+        "outputs": ["TUNE_PATH"],
+    },
+    "evaluate": {
+        "inputs": ["PIPELINE_PATH", "PIPELINE_MMAP_DIR", "DATA_PROCESSED"],
+        "config": ["TARGET", "TARGETS", "METRICS", "MODEL_FORMAT", "ARRAY_FOREST_MAX_ROWS"],
+        "code": ["evaluate.py"],
+        "outputs": ["METRICS_PATH"],
+    },
+}
+
+
+def _load_state():
+    if config.STAGE_CACHE_PATH.exists():
+        with open(config.STAGE_CACHE_PATH, encoding="utf-8") as f:
+            return json.load(f)
+    return {"files": {}, "stages": {}}
+
+
+def _save_state(state):
+    with open(config.STAGE_CACHE_PATH, "w", encoding="utf-8") as f:
+        json.dump(state, f, indent=4, ensure_ascii=False)
+
+
+def file_hash(path, state=None):
+    """
+    SHA-256 do conteúdo de `path` (None se não existir). Com `state`, o hash
+    é reaproveitado enquanto tamanho e mtime do arquivo não mudarem. Para um
+    diretório, hash dos nomes e conteúdos de todos os arquivos dentro dele.
+    """
+    path = Path(path)
+    if not path.exists():
+        return None
+    if path.is_dir():
+        digest = hashlib.sha256()
+        for child in sorted(p for p in path.rglob("*") if p.is_file()):
+            digest.update(child.relative_to(path).as_posix().encode("utf-8"))
+            digest.update(file_hash(child, state).encode("ascii"))
+        return digest.hexdigest()
+    stat = path.stat()
+    key = str(path.resolve())
+    if state is not None:
+        known = state["files"].get(key)
+        if known and known["size"] == stat.st_size and known["mtime_ns"] == stat.st_mtime_ns:
+            return known["sha256"]
+
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    sha = digest.hexdigest()
+
+    if state is not None:
+        state["files"][key] = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha256": sha}
+    return sha
+
+
+def code_dependencies(modules):
+    """
+    Módulos do projeto (arquivos .py na raiz) alcançáveis a partir de
+    `modules` pelos imports, inclusive os feitos dentro de funções
+    """
+    seen = set()
+    pending = list(modules)
+    while pending:
+        name = pending.pop()
+        path = config.ROOT / name
+        if name in seen or not path.exists():
+            continue
+        seen.add(name)
+        tree = ast.parse(path.read_bytes(), filename=str(path))
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Import):
+                imported = [alias.name for alias in node.names]
+            elif isinstance(node, ast.ImportFrom) and node.level == 0 and node.module:
+                imported = [node.module]
+            else:
+                continue
+            pending += [f"{module.split('.')[0]}.py" for module in imported]
+    return sorted(seen)
+
+
+def fingerprint(stage, state=None):
+    """Impressão digital (entradas + config + código) de uma etapa"""
+    spec = STAGES[stage]
+    payload = {
+        "inputs": {name: file_hash(getattr(config, name), state) for name in spec["inputs"]},
+        "config": {name: getattr(config, name) for name in spec["config"]},
+        "code": {name: file_hash(config.ROOT / name, state)
+                 for name in code_dependencies(spec["code"] + ["config.py"])},
+    }
+    encoded = json.dumps(payload, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()
+
+
+def is_fresh(stage):
+    """True se a etapa pode ser pulada (mesma impressão digital e saídas intactas)"""
+    state = _load_state()
+    record = state["stages"].get(stage)
+    fresh = (
+        record is not None
+        and record["fingerprint"] == fingerprint(stage, state)
+        and all(
+            file_hash(getattr(config, name), state) == sha
+            for name, sha in record["outputs"].items()
+        )
+    )
+    _save_state(state)
+    return fresh
+
+
+def record(stage):
+    """Registra a impressão digital e o hash das saídas após uma execução bem-sucedida"""
+    state = _load_state()
+    state["stages"][stage] = {
+        "fingerprint": fingerprint(stage, state),
+        "outputs": {name: file_hash(getattr(config, name), state) for name in STAGES[stage]["outputs"]},
+    }
+    _save_state(state)
+
+
+def invalidate(stage=None):
+    """Remove o registro de uma etapa (ou de todas)"""
+    state = _load_state()
+    if stage is None:
+        state["stages"] = {}
+    else:
+        state["stages"].pop(stage, None)
+    _save_state(state)
@@ -0,0 +1,129 @@
+# test_api.py
+# -*- coding: utf-8 -*-
+"""API de inferência offline: pipeline dublê injetado em create_app"""
+
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+import pandas as pd
+import pytest
+from fastapi.testclient import TestClient
+
+import config
+from api import create_app
+
+RAW = {"tipo": "L", "torque": 40.0, "temperatura_ar": 300.0}
+PROCESSED = {"torque": 40.0, "temperatura_ar": 300.0, "tipo_L": 1}
+
+
+class DoublePipeline:
+    """
+    Mesmo schema de um InferencePipeline; probabilidade = torque / 100.
+    Como no pipeline real, um DataFrame com linhas brutas e tratadas juntas falha.
+    """
+
+    feature_columns = ["torque", "temperatura_ar", "tipo_L"]
+    targets = [config.TARGET]
+    encoder = SimpleNamespace(columns=["tipo"], high_cardinality_cols=[],
+                              categories_={"tipo": pd.Index(["H", "L", "M"])})
+
+    def predict_frame(self, df):
+        if "tipo" in df.columns and "tipo_L" in df.columns:
+            raise ValueError("cannot reindex on an axis with duplicate labels")
+        return pd.DataFrame({config.TARGET: df["torque"].astype(float) / 100.0}, index=df.index)
+
+
+@pytest.fixture
+def client():
+    with TestClient(create_app(pipeline=DoublePipeline(), max_workers=1)) as client:
+        yield client
+
+
+def test_predict_raw_record(client):
+    response = client.post("/predict", json={"features": RAW})
+    assert response.status_code == 200
+    assert response.json()["probabilities"] == {config.TARGET: pytest.approx(0.4)}
+
+
+def test_predict_processed_record(client):
+    response = client.post("/predict", json={"features": PROCESSED})
+    assert response.status_code == 200
+
+
+@pytest.mark.parametrize("features", [
+    {"tipo": "Z", "torque": "abc", "temperatura_ar": 300.0},
+    {"tipo": "L", "torque": 40.0},
+    {"torque": 40.0, "temperatura_ar": 300.0},
+    {"tipo": "L", "torque": "40", "temperatura_ar": 300.0},
+])
+def test_predict_rejects_invalid_record(client, features):
+    response = client.post("/predict", json={"features": features})
+    assert response.status_code == 422
+
+
+def test_invalid_record_reports_fields(client):
+    response = client.post("/predict", json={"features": {"tipo": "Z", "torque": "abc", "temperatura_ar": 300.0}})
+    fields = {error["field"] for error in response.json()["detail"]}
+    assert fields == {"tipo", "torque"}
+
+
+def test_predict_batch(client):
+    records = [RAW, dict(RAW, torque=80.0), PROCESSED]
+    response = client.post("/predict/batch", json={"records": records})
+    assert response.status_code == 200
+    body = response.json()
+    assert body["n_records"] == 3
+    assert [row[config.TARGET] for row in body["probabilities"]] == pytest.approx([0.4, 0.8, 0.4])
+
+
+def test_predict_batch_mixed_kinds_keeps_order(client):
+    records = [dict(PROCESSED, torque=10.0), RAW, dict(PROCESSED, torque=30.0), dict(RAW, torque=20.0)]
+    response = client.post("/predict/batch", json={"records": records})
+    assert response.status_code == 200
+    assert [row[config.TARGET] for row in response.json()["probabilities"]] == pytest.approx([0.1, 0.4, 0.3, 0.2])
+
+
+def test_concurrent_mixed_kinds_are_batched_apart(monkeypatch):
+    # Janela longa: as requisições concorrentes caem na mesma janela do MicroBatcher
+    monkeypatch.setitem(config.INFERENCE_API, "batch_max_wait_ms", 200.0)
+    with TestClient(create_app(pipeline=DoublePipeline(), max_workers=1)) as client:
+        batcher = client.app.state.batcher
+        score_fn, kinds = batcher.score_fn, []
+
+        def spy(records):
+            kinds.append({"raw" if "tipo" in record else "processed" for record in records})
+            return score_fn(records)
+
+        batcher.score_fn = spy
+        requests = [RAW, PROCESSED, dict(RAW, torque=20.0), dict(PROCESSED, torque=30.0)]
+        with ThreadPoolExecutor(len(requests)) as pool:
+            responses = list(pool.map(lambda features: client.post("/predict", json={"features": features}),
+                                      requests))
+
+    assert [response.status_code for response in responses] == [200] * 4
+    assert [response.json()["probabilities"][config.TARGET] for response in responses] == \
+        pytest.approx([0.4, 0.4, 0.2, 0.3])
+    assert all(len(batch) == 1 for batch in kinds)
+
+
+def test_predict_batch_rejects_invalid_record(client):
+    response = client.post("/predict/batch", json={"records": [RAW, dict(RAW, tipo="Z")]})
+    assert response.status_code == 422
+    assert response.json()["detail"][0]["record"] == 1
+
+
+def test_predict_batch_empty(client):
+    response = client.post("/predict/batch", json={"records": []})
+    assert response.status_code == 422
+
+
+def test_predict_batch_over_limit(client, monkeypatch):
+    monkeypatch.setitem(config.INFERENCE_API, "max_batch_size", 2)
+    response = client.post("/predict/batch", json={"records": [RAW] * 3})
+    assert response.status_code == 413
+
+
+def test_health_and_stats(client):
+    assert client.get("/health").json() == {"status": "ok", "targets": [config.TARGET], "n_features": 3}
+    client.post("/predict", json={"features": RAW})
+    assert client.get("/stats").json()["requests"] == 1
@@ -0,0 +1,85 @@
+# test_distributed.py
+# -*- coding: utf-8 -*-
+"""Coordenador do treino distribuído: partes por worker e junção dos forests"""
+
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+
+import config
+import distributed
+from distributed import (InlineTransport, get_transport, merge_forests, plan_shares, register_transport,
+                         train_distributed)
+
+
+@pytest.fixture(scope="module")
+def data():
+    rng = np.random.RandomState(0)
+    X = rng.normal(size=(300, 5))
+    Y = np.column_stack([X[:, 0] > 0, X[:, 1] > 0.5]).astype(np.uint8)
+    return X, Y
+
+
+def test_plan_shares_splits_trees_and_seeds():
+    tasks = plan_shares(10, 3, seed=7)
+    assert [task["n_estimators"] for task in tasks] == [4, 3, 3]
+    assert len({task["seed"] for task in tasks}) == 3
+    assert plan_shares(10, 3, seed=7) == tasks
+    assert plan_shares(10, 3, seed=8) != tasks
+
+
+def test_plan_shares_caps_workers_at_trees():
+    assert len(plan_shares(2, 8, seed=0)) == 2
+
+
+def test_plan_shares_rejects_unknown_partition():
+    with pytest.raises(ValueError):
+        plan_shares(10, 2, partition="shard")
+
+
+def test_merge_forests_equals_average_of_parts(data):
+    X, Y = data
+    parts = [RandomForestClassifier(n_estimators=n, random_state=seed).fit(X, Y)
+             for n, seed in ((4, 1), (6, 2))]
+    merged = merge_forests(parts)
+    assert merged.n_estimators == len(merged.estimators_) == 10
+
+    expected = [(4 * a + 6 * b) / 10 for a, b in zip(parts[0].predict_proba(X), parts[1].predict_proba(X))]
+    for ours, theirs in zip(merged.predict_proba(X), expected):
+        np.testing.assert_allclose(ours, theirs)
+    assert len(parts[0].estimators_) == 4
+
+
+def test_merge_forests_rejects_different_classes(data):
+    X, Y = data
+    full = RandomForestClassifier(n_estimators=2, random_state=0).fit(X, Y)
+    single = Y.copy()
+    single[:, 1] = 0
+    partial = RandomForestClassifier(n_estimators=2, random_state=0).fit(X, single)
+    with pytest.raises(ValueError):
+        merge_forests([full, partial])
+
+
+def test_transport_registry(monkeypatch):
+    monkeypatch.setattr(distributed, "TRANSPORTS", dict(distributed.TRANSPORTS))
+    register_transport("teste", InlineTransport)
+    transport = get_transport("teste", workers=2)
+    assert transport.map(lambda x: x * 2, [1, 2, 3]) == [2, 4, 6]
+    with pytest.raises(ValueError):
+        get_transport("inexistente")
+
+
+@pytest.mark.parametrize("partition", ["bootstrap", "partition"])
+def test_train_distributed_reads_only_worker_rows(data, partition, monkeypatch, tmp_path):
+    X, Y = data
+    monkeypatch.setattr(config, "MODEL_PARAMS", {"n_estimators": 6, "random_state": 0})
+    monkeypatch.setattr(config, "BALANCING", "none")
+    monkeypatch.setitem(config.DISTRIBUTED, "shared_dir", str(tmp_path))
+    model, stats = train_distributed(X, Y, workers=3, transport="inline", partition=partition)
+
+    assert len(model.estimators_) == 6
+    rows = [s["train_rows"] for s in stats]
+    assert rows == ([len(X)] * 3 if partition == "bootstrap" else [100, 100, 100])
+    # O treino compartilhado é apagado ao fim
+    assert not list(tmp_path.iterdir())
+
@@ -0,0 +1,112 @@
+# test_encoding.py
+# -*- coding: utf-8 -*-
+"""CategoricalEncoder: modos de codificação, ajuste em blocos e persistência"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from encoding import ENCODING_MODES, CategoricalEncoder, load_encoder
+
+
+@pytest.fixture
+def df():
+    rng = np.random.RandomState(0)
+    n = 300
+    return pd.DataFrame({
+        "id_produto": rng.choice([f"P{i:03d}" for i in range(40)], size=n),
+        "tipo": rng.choice(["L", "M", "H"], size=n),
+        "torque": rng.normal(40, 5, size=n),
+    })
+
+
+@pytest.fixture
+def y(df):
+    return np.random.RandomState(1).randint(0, 2, size=len(df))
+
+
+def encoder(mode):
+    return CategoricalEncoder(columns=["id_produto", "tipo"], high_cardinality_cols=["id_produto"],
+                              mode=mode, n_hash_features=8, n_folds=3, smoothing=5.0, seed=42)
+
+
+@pytest.mark.parametrize("mode", ENCODING_MODES)
+def test_output_columns_match_feature_names(df, y, mode):
+    enc = encoder(mode).fit(df, y)
+    out = enc.transform(df)
+    assert list(out.columns) == ["torque"] + enc.feature_names_out_
+    assert len(out) == len(df)
+    assert out.index.equals(df.index)
+
+
+def test_low_cardinality_onehot_matches_get_dummies(df, y):
+    out = encoder("frequency").fit(df, y).transform(df)
+    expected = pd.get_dummies(df["tipo"], prefix="tipo", drop_first=True).astype(np.uint8)
+    pd.testing.assert_frame_equal(out[expected.columns], expected)
+
+
+def test_frequency_values_and_unseen_category(df, y):
+    enc = encoder("frequency").fit(df, y)
+    out = enc.transform(pd.DataFrame({"id_produto": [df["id_produto"].iloc[0], "NOVO"], "tipo": ["L", "L"]}))
+    expected = (df["id_produto"] == df["id_produto"].iloc[0]).mean()
+    assert out["id_produto_freq"].tolist() == pytest.approx([expected, 0.0])
+
+
+def test_ordinal_unseen_is_minus_one(df, y):
+    out = encoder("ordinal").fit(df, y).transform(pd.DataFrame({"id_produto": ["NOVO"], "tipo": ["M"]}))
+    assert out["id_produto_code"].tolist() == [-1]
+
+
+def test_hash_is_one_hot_and_deterministic(df, y):
+    a = encoder("hash").fit(df, y).transform(df)
+    b = encoder("hash").fit(df.iloc[::-1], y[::-1]).transform(df)
+    hashed = a.filter(like="id_produto_hash_")
+    assert hashed.shape[1] == 8
+    assert (hashed.sum(axis=1) == 1).all()
+    pd.testing.assert_frame_equal(a, b)
+
+
+def test_unknown_low_cardinality_category_is_all_zeros(df, y):
+    out = encoder("frequency").fit(df, y).transform(pd.DataFrame({"id_produto": ["P000"], "tipo": ["Z"]}))
+    assert out[["tipo_L", "tipo_M"]].to_numpy().tolist() == [[0, 0]]
+
+
+def test_missing_categorical_column_is_unseen(df, y):
+    out = encoder("frequency").fit(df, y).transform(df[["tipo", "torque"]])
+    assert (out["id_produto_freq"] == 0).all()
+
+
+def test_target_encoding_is_out_of_fold_for_training_rows(df, y):
+    enc = encoder("target")
+    oof = enc.fit_transform(df, y)["id_produto_te"].to_numpy()
+    full = enc.transform(df)["id_produto_te"].to_numpy()
+    assert not np.allclose(oof, full)
+    assert np.all((full >= 0) & (full <= 1))
+
+
+@pytest.mark.parametrize("mode", ENCODING_MODES)
+def test_partial_fit_in_chunks_matches_fit(df, y, mode):
+    full = encoder(mode).fit(df, y)
+    chunked = encoder(mode)
+    for start in range(0, len(df), 70):
+        part = df.iloc[start:start + 70]
+        chunked.partial_fit(part, y=y[start:start + 70], positions=np.arange(start, start + len(part)))
+    positions = np.arange(len(df))
+    pd.testing.assert_frame_equal(full.transform(df, positions=positions),
+                                  chunked.transform(df, positions=positions))
+
+
+def test_save_and_load_round_trip(df, y, tmp_path):
+    enc = encoder("target").fit(df, y)
+    path = tmp_path / "encoder.pkl"
+    enc.save(path)
+    pd.testing.assert_frame_equal(load_encoder(path).transform(df), enc.transform(df))
+
+
+def test_load_encoder_missing_file(tmp_path):
+    assert load_encoder(tmp_path / "nao_existe.pkl") is None
+
+
+def test_invalid_mode():
+    with pytest.raises(ValueError):
+        CategoricalEncoder(mode="embedding")
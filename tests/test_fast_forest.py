@@ -0,0 +1,93 @@
+# test_fast_forest.py
+# -*- coding: utf-8 -*-
+"""ArrayForest: mesmas probabilidades do predict_proba do sklearn"""
+
+import joblib
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+
+from fast_forest import ArrayForest
+
+
+@pytest.fixture(scope="module")
+def data():
+    rng = np.random.RandomState(0)
+    X = rng.normal(size=(400, 6)).astype(np.float32)
+    Y = np.column_stack([
+        (X[:, 0] + X[:, 1] > 0),
+        (X[:, 2] > 1.0),
+        (X[:, 3] * X[:, 4] > 0.5),
+    ]).astype(np.uint8)
+    return X, Y
+
+
+def forest(X, y, **params):
+    return RandomForestClassifier(n_estimators=15, random_state=0, **params).fit(X, y)
+
+
+def test_single_output_parity(data):
+    X, Y = data
+    model = forest(X, Y[:, 0])
+    fast = ArrayForest.from_sklearn(model)
+    np.testing.assert_allclose(fast.predict_proba(X), model.predict_proba(X), rtol=0, atol=1e-12)
+    np.testing.assert_array_equal(fast.predict(X), model.predict(X))
+
+
+def test_multi_output_parity(data):
+    X, Y = data
+    model = forest(X, Y, max_depth=6)
+    fast = ArrayForest.from_sklearn(model)
+    for ours, theirs in zip(fast.predict_proba(X), model.predict_proba(X)):
+        np.testing.assert_allclose(ours, theirs, rtol=0, atol=1e-12)
+    np.testing.assert_array_equal(fast.predict(X), model.predict(X))
+    assert fast.n_outputs_ == 3
+    assert fast.n_estimators == 15
+
+
+def test_single_class_output(data):
+    X, Y = data
+    y = np.column_stack([Y[:, 0], np.zeros(len(X), dtype=np.uint8)])
+    model = forest(X, y)
+    for ours, theirs in zip(ArrayForest.from_sklearn(model).predict_proba(X), model.predict_proba(X)):
+        np.testing.assert_allclose(ours, theirs, rtol=0, atol=1e-12)
+
+
+@pytest.mark.parametrize("batch_size", [1, 7, 1024])
+def test_batch_size_does_not_change_result(data, batch_size):
+    X, Y = data
+    fast = ArrayForest.from_sklearn(forest(X, Y[:, 0]))
+    np.testing.assert_array_equal(fast.predict_proba(X, batch_size=batch_size), fast.predict_proba(X))
+
+
+def test_save_and_mmap_load(data, tmp_path):
+    X, Y = data
+    fast = ArrayForest.from_sklearn(forest(X, Y))
+    fast.save(tmp_path / "forest")
+    loaded = ArrayForest.load(tmp_path / "forest")
+    assert isinstance(loaded.children, np.memmap)
+    for ours, theirs in zip(loaded.predict_proba(X), fast.predict_proba(X)):
+        np.testing.assert_array_equal(ours, theirs)
+
+
+def test_save_keeps_previous_version_and_prunes_older(data, tmp_path):
+    X, Y = data
+    directory = tmp_path / "forest"
+    versions = [ArrayForest.from_sklearn(forest(X, Y[:, 0], max_depth=depth)).save(directory) for depth in (2, 4, 6)]
+    assert len(set(versions)) == 3
+    # A versão anterior continua legível (leitor que já abriu a meta dela); a mais antiga sai
+    previous = ArrayForest.load(directory, version=versions[1])
+    np.testing.assert_array_equal(previous.predict_proba(X),
+                                  ArrayForest.from_sklearn(forest(X, Y[:, 0], max_depth=4)).predict_proba(X))
+    assert not list(directory.glob(f"*.{versions[0]}.*"))
+    assert joblib.load(directory / "meta.pkl")["version"] == versions[2]
+
+
+def test_load_legacy_layout(data, tmp_path):
+    X, Y = data
+    fast = ArrayForest.from_sklearn(forest(X, Y[:, 0]))
+    for name, array in fast._arrays().items():
+        np.save(tmp_path / f"{name}.npy", array)
+    joblib.dump({"max_depth": fast.max_depth, "classes": fast.classes_, "n_features": fast.n_features_in_,
+                 "n_outputs": fast.n_outputs_, "arrays": list(fast._arrays())}, tmp_path / "meta.pkl")
+    np.testing.assert_array_equal(ArrayForest.load(tmp_path).predict_proba(X), fast.predict_proba(X))
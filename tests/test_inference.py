@@ -0,0 +1,121 @@
+# test_inference.py
+# -*- coding: utf-8 -*-
+"""Pipeline de inferência nos formatos pickle e memory-map"""
+
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+
+import config
+from cleaning import DataCleaner
+from inference import InferencePipeline, load_pipeline, mmap_path
+
+TARGETS = ["falha_a", "falha_b"]
+
+
+@pytest.fixture
+def frame():
+    rng = np.random.RandomState(0)
+    df = pd.DataFrame(rng.normal(size=(300, 4)), columns=["f0", "f1", "f2", "f3"])
+    df["falha_a"] = (df["f0"] + df["f1"] > 0).astype(np.uint8)
+    df["falha_b"] = (df["f2"] > 0.8).astype(np.uint8)
+    return df
+
+
+@pytest.fixture
+def saved(frame, tmp_path):
+    cleaner = DataCleaner(TARGETS).fit(frame)
+    X, Y = cleaner.split(cleaner.transform(frame))
+    model = RandomForestClassifier(n_estimators=10, random_state=0, n_jobs=2).fit(X.to_numpy(np.float32), Y)
+    path = tmp_path / "pipeline.pkl"
+    InferencePipeline(model, cleaner).compile().save(path)
+    return path
+
+
+def test_save_writes_mmap_format(saved):
+    assert (mmap_path(saved) / "pipeline.pkl").exists()
+    assert (mmap_path(saved) / "forest" / "meta.pkl").exists()
+
+
+def test_mmap_and_pickle_give_same_probabilities(saved, frame, monkeypatch):
+    monkeypatch.setattr(config, "ARRAY_FOREST_MAX_ROWS", 50)
+    pickled = load_pipeline(saved, mmap=False)
+    mapped = load_pipeline(saved, mmap=True)
+    for rows in (frame.head(5), frame):
+        pd.testing.assert_frame_equal(mapped.predict_frame(rows), pickled.predict_frame(rows))
+
+
+def test_mmap_routes_large_batches_to_sklearn(saved, frame, monkeypatch):
+    monkeypatch.setattr(config, "ARRAY_FOREST_MAX_ROWS", 50)
+    pipeline = load_pipeline(saved, mmap=True).set_n_jobs(1)
+    assert pipeline.model is None
+
+    pipeline.predict_frame(frame.head(50))
+    assert pipeline.model is None
+
+    pipeline.predict_frame(frame)
+    assert isinstance(pipeline.model, RandomForestClassifier)
+    assert pipeline.model.n_jobs == 1
+
+
+def test_mmap_without_pickle_uses_array_forest(saved, frame, monkeypatch):
+    monkeypatch.setattr(config, "ARRAY_FOREST_MAX_ROWS", 50)
+    expected = load_pipeline(saved, mmap=False).predict_frame(frame)
+    saved.unlink()
+    pipeline = load_pipeline(mmap_path(saved))
+    assert pipeline.model_source is None
+    pd.testing.assert_frame_equal(pipeline.predict_frame(frame), expected)
+
+
+def test_predict_frame_columns_and_index(saved, frame):
+    rows = frame.head(3).set_axis([10, 20, 30])
+    proba = load_pipeline(saved).predict_frame(rows.drop(columns=TARGETS))
+    assert list(proba.columns) == TARGETS
+    assert proba.index.tolist() == [10, 20, 30]
+    assert ((proba >= 0) & (proba <= 1)).all().all()
+
+
+def test_score_chunks(saved, frame):
+    chunks = [frame.iloc[:100], frame.iloc[100:]]
+    scored = list(load_pipeline(saved).score_chunks(chunks))
+    assert [len(chunk) for chunk in scored] == [100, 200]
+    assert {f"proba_{target}" for target in TARGETS} <= set(scored[0].columns)
+
+
+@pytest.fixture
+def bare(frame, tmp_path, monkeypatch):
+    """Artefatos do preprocess (cleaner) sem pipeline salvo; retorna (X, Y) de treino"""
+    cleaner = DataCleaner(TARGETS).fit(frame)
+    cleaner.save(tmp_path / "cleaner.pkl")
+    monkeypatch.setattr(config, "CLEANER_PATH", tmp_path / "cleaner.pkl")
+    monkeypatch.setattr(config, "ENCODER_PATH", tmp_path / "encoder.pkl")
+    monkeypatch.setattr(config, "MODEL_PATH", tmp_path / "modelo.pkl")
+    monkeypatch.setattr(config, "PIPELINE_PATH", tmp_path / "pipeline.pkl")
+    X, Y = cleaner.split(cleaner.transform(frame))
+    return X.to_numpy(np.float32), Y.to_numpy()
+
+
+def test_missing_pipeline_builds_from_matching_model(bare, frame):
+    X, Y = bare
+    joblib.dump(RandomForestClassifier(n_estimators=5, random_state=0).fit(X, Y), config.MODEL_PATH)
+    pipeline = load_pipeline(config.PIPELINE_PATH)
+    assert pipeline.predict_frame(frame).shape == (len(frame), len(TARGETS))
+
+
+@pytest.mark.parametrize("layout", ["single_target", "other_features"])
+def test_missing_pipeline_rejects_mismatched_model(bare, layout):
+    X, Y = bare
+    if layout == "single_target":
+        model = RandomForestClassifier(n_estimators=5, random_state=0).fit(X, Y[:, 0])
+    else:
+        model = RandomForestClassifier(n_estimators=5, random_state=0).fit(X[:, :2], Y)
+    joblib.dump(model, config.MODEL_PATH)
+    with pytest.raises(ValueError, match="Execute o treino"):
+        load_pipeline(config.PIPELINE_PATH)
+
+
+def test_missing_pipeline_and_model(bare):
+    with pytest.raises(FileNotFoundError, match="Execute o treino"):
+        load_pipeline(config.PIPELINE_PATH)
@@ -0,0 +1,68 @@
+# test_labels.py
+# -*- coding: utf-8 -*-
+"""Normalização dos rótulos binários (labels.py)"""
+
+import numpy as np
+import pandas as pd
+
+from labels import LABEL_MAP, normalize_labels, normalize_series
+
+
+def test_all_known_spellings():
+    raw = pd.Series(["Não", "não", " N ", "0", "-", "False", "Sim", "sim", "y", "1", "True", "1.0"], name="falha")
+    values, unmapped = normalize_series(raw)
+    assert values.tolist() == [0, 0, 0, 0, 0, 0, 1, 1, 1, 1, 1, 1]
+    assert values.dtype == np.uint8
+    assert values.name == "falha"
+    assert unmapped == {}
+
+
+def test_non_string_values():
+    values, _ = normalize_series(pd.Series([True, False, 1, 0]))
+    assert values.tolist() == [1, 0, 1, 0]
+
+
+def test_unmapped_values_become_nan_and_are_counted():
+    values, unmapped = normalize_series(pd.Series(["sim", "talvez", "talvez", "não", "??"]))
+    assert values.iloc[[0, 3]].tolist() == [1.0, 0.0]
+    assert values.iloc[[1, 2, 4]].isna().all()
+    assert unmapped == {"talvez": 2, "??": 1}
+
+
+def test_missing_values_stay_missing():
+    values, unmapped = normalize_series(pd.Series(["sim", None, np.nan]))
+    assert values.iloc[0] == 1
+    assert values.iloc[1:].isna().all()
+    assert unmapped == {}
+
+
+def test_index_is_preserved():
+    raw = pd.Series(["sim", "não"], index=[10, 20])
+    values, _ = normalize_series(raw)
+    assert values.index.tolist() == [10, 20]
+
+
+def test_custom_label_map():
+    values, unmapped = normalize_series(pd.Series(["ok", "falhou"]), label_map={"ok": 0, "falhou": 1})
+    assert values.tolist() == [0, 1]
+    assert unmapped == {}
+
+
+def test_empty_series():
+    values, unmapped = normalize_series(pd.Series([], dtype=object))
+    assert len(values) == 0
+    assert unmapped == {}
+
+
+def test_normalize_labels_only_touches_present_columns():
+    df = pd.DataFrame({"a": ["Sim", "x"], "b": ["não", "sim"], "torque": [1.0, 2.0]})
+    out, report = normalize_labels(df, ["a", "b", "ausente"])
+    assert out["b"].tolist() == [0, 1]
+    assert out["torque"].tolist() == [1.0, 2.0]
+    assert report == {"a": {"x": 1}}
+    assert df["a"].tolist() == ["Sim", "x"]
+
+
+def test_label_map_keys_are_normalized():
+    assert all(key == key.strip().lower() for key in LABEL_MAP)
+    assert set(LABEL_MAP.values()) == {0, 1}
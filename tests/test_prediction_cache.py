@@ -0,0 +1,124 @@
+# test_prediction_cache.py
+# -*- coding: utf-8 -*-
+"""PredictionCache: chave canônica, LRU, TTL e invalidação por versão do modelo"""
+
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from prediction_cache import PredictionCache
+
+
+class CountingPipeline:
+    """Dublê com o contrato de InferencePipeline; conta as linhas pontuadas"""
+
+    feature_columns = ["a", "b"]
+    targets = ["falha"]
+
+    def __init__(self, offset=0.0):
+        self.offset = offset
+        self.rows_scored = 0
+
+    def prepare(self, df):
+        return df[self.feature_columns].astype(np.float32)
+
+    def predict_array(self, X):
+        X = np.asarray(X)
+        self.rows_scored += len(X)
+        return (X.sum(axis=1, keepdims=True) + self.offset) / 100.0
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def model_file(tmp_path):
+    path = tmp_path / "modelo.pkl"
+    path.write_bytes(b"v1")
+    return path
+
+
+def make_cache(model_file, **kwargs):
+    pipelines = []
+
+    def loader():
+        pipelines.append(CountingPipeline(offset=len(pipelines)))
+        return pipelines[-1]
+
+    params = dict(max_size=100, ttl_s=None, decimals=3, watch=[model_file])
+    params.update(kwargs)
+    return PredictionCache(loader, **params), pipelines
+
+
+def frame(*rows):
+    return pd.DataFrame(rows, columns=["a", "b"])
+
+
+def test_hits_skip_the_model(model_file):
+    cache, pipelines = make_cache(model_file)
+    first = cache.predict_frame(frame((1, 2), (3, 4)))
+    second = cache.predict_frame(frame((3, 4), (1, 2), (5, 6)))
+    assert pipelines[0].rows_scored == 3
+    assert second["falha"].tolist() == pytest.approx([0.07, 0.03, 0.11])
+    assert first["falha"].tolist() == pytest.approx([0.03, 0.07])
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["size"]) == (2, 3, 3)
+
+
+def test_key_ignores_column_order_and_quantizes(model_file):
+    cache, pipelines = make_cache(model_file, decimals=2)
+    cache.predict_frame(frame((1.0, 2.0)))
+    cache.predict_frame(pd.DataFrame({"b": [2.001], "a": [1.0]}))
+    cache.predict_frame(frame((-0.0, 0.0)))
+    cache.predict_frame(frame((0.0, 0.0)))
+    assert pipelines[0].rows_scored == 2
+
+
+def test_lru_eviction(model_file):
+    cache, pipelines = make_cache(model_file, max_size=2)
+    cache.predict_frame(frame((1, 1)))
+    cache.predict_frame(frame((2, 2)))
+    cache.predict_frame(frame((1, 1)))
+    cache.predict_frame(frame((3, 3)))
+    cache.predict_frame(frame((1, 1)))
+    assert cache.stats()["evictions"] == 1
+    cache.predict_frame(frame((2, 2)))
+    assert pipelines[0].rows_scored == 4
+
+
+def test_ttl_expiration(model_file):
+    clock = Clock()
+    cache, pipelines = make_cache(model_file, ttl_s=10, clock=clock)
+    cache.predict_frame(frame((1, 1)))
+    clock.now = 9.9
+    cache.predict_frame(frame((1, 1)))
+    clock.now = 10.0
+    cache.predict_frame(frame((1, 1)))
+    assert pipelines[0].rows_scored == 2
+    assert cache.stats()["expirations"] == 1
+
+
+def test_model_change_reloads_and_clears(model_file):
+    cache, pipelines = make_cache(model_file)
+    before = cache.predict_frame(frame((1, 1)))["falha"].iloc[0]
+    model_file.write_bytes(b"v2 - retreinado")
+    os.utime(model_file, ns=(1, 1))
+    after = cache.predict_frame(frame((1, 1)))["falha"].iloc[0]
+    assert len(pipelines) == 2
+    assert after == pytest.approx(before + 0.01)
+    stats = cache.stats()
+    assert (stats["invalidations"], stats["size"]) == (1, 1)
+
+
+def test_index_is_preserved(model_file):
+    cache, _ = make_cache(model_file)
+    out = cache.predict_frame(frame((1, 1), (2, 2)).set_axis([7, 9]))
+    assert out.index.tolist() == [7, 9]
+    assert list(out.columns) == ["falha"]
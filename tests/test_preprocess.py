@@ -0,0 +1,115 @@
+# test_preprocess.py
+# -*- coding: utf-8 -*-
+"""Modo streaming do preprocess: estado entre blocos de dedup/ffill/bfill e schema do cleaner"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from cleaning import DataCleaner
+from preprocess import _SeenRows, _dedup_and_fill, _first_valid_values
+
+
+def chunks_of(df, size):
+    return [df.iloc[start:start + size] for start in range(0, len(df), size)]
+
+
+def dedup_and_fill(df, size):
+    """Como no main_streaming: leitura prévia dos primeiros valores + passada em blocos"""
+    return list(_dedup_and_fill(chunks_of(df, size), _first_valid_values(chunks_of(df, size))))
+
+
+@pytest.fixture
+def df():
+    rng = np.random.RandomState(0)
+    n = 200
+    df = pd.DataFrame({
+        "tipo": rng.choice(["L", "M"], size=n).astype(object),
+        "torque": rng.choice([10.0, 20.0, 30.0], size=n),
+        "desgaste": rng.choice([1.0, 2.0], size=n),
+    })
+    # Valores ausentes no início (resolvidos pelo bfill) e no meio (ffill)
+    df.loc[:24, "torque"] = np.nan
+    df.loc[[60, 61, 130], "desgaste"] = np.nan
+    df.loc[[90, 150], "tipo"] = np.nan
+    return df
+
+
+@pytest.mark.parametrize("size", [1, 7, 25, 64, 500])
+def test_dedup_and_fill_matches_in_memory(df, size):
+    expected = df.drop_duplicates().ffill().bfill()
+    result = pd.concat(dedup_and_fill(df, size))
+    pd.testing.assert_frame_equal(result, expected)
+
+
+def test_duplicates_across_chunks_are_removed():
+    df = pd.DataFrame({"a": [1.0, 2.0, 1.0, 3.0, 2.0], "b": ["x", "y", "x", "z", "y"]})
+    result = pd.concat(dedup_and_fill(df, 2))
+    assert result.index.tolist() == [0, 1, 3]
+
+
+def test_column_without_values_until_late_chunk():
+    df = pd.DataFrame({"a": np.arange(10.0), "b": [np.nan] * 8 + [5.0, 6.0]})
+    chunks = dedup_and_fill(df, 3)
+    result = pd.concat(chunks)
+    assert result["b"].tolist() == [5.0] * 9 + [6.0]
+    assert not any(chunk.isna().any().any() for chunk in chunks)
+
+
+def test_all_nan_column_does_not_hold_chunks():
+    df = pd.DataFrame({"a": np.arange(12.0), "vazia": [np.nan] * 12})
+    consumed = []
+
+    def reader():
+        for chunk in chunks_of(df, 3):
+            consumed.append(len(chunk))
+            yield chunk
+
+    stream = _dedup_and_fill(reader(), _first_valid_values(chunks_of(df, 3)))
+    first = next(stream)
+    assert len(consumed) == 1 and len(first) == 3
+    result = pd.concat([first, *stream])
+    pd.testing.assert_frame_equal(result, df.drop_duplicates().ffill().bfill())
+
+
+def test_first_valid_values_stop_once_every_column_has_a_value():
+    df = pd.DataFrame({"a": [np.nan, 1.0, 2.0, 3.0], "b": [np.nan, np.nan, "x", "y"]})
+    consumed = []
+
+    def reader():
+        for chunk in chunks_of(df, 1):
+            consumed.append(len(chunk))
+            yield chunk
+
+    assert _first_valid_values(reader()) == {"a": 1.0, "b": "x"}
+    assert len(consumed) == 3
+
+
+def test_seen_rows_membership():
+    seen = _SeenRows()
+    for start in range(0, 1000, 100):
+        seen.add(np.arange(start, start + 100, dtype=np.uint64) * np.uint64(3))
+    assert seen.contains(np.array([0, 3, 2997], dtype=np.uint64)).all()
+    assert not seen.contains(np.array([1, 2, 3000], dtype=np.uint64)).any()
+    assert len(seen.blocks) <= 4
+
+
+def test_cleaner_partial_fit_keeps_columns_numeric_in_later_chunks():
+    df = pd.DataFrame({
+        "obs": ["x"] * 5 + ["1", "2", "3"],
+        "vazia": ["?"] * 8,
+        "torque": np.arange(8.0),
+        "falha_maquina": [0, 1] * 4,
+    })
+    targets = ["falha_maquina"]
+    first_only = DataCleaner(targets).fit(df.iloc[:5])
+    streaming = DataCleaner(targets)
+    for chunk in chunks_of(df, 3):
+        streaming.partial_fit(chunk)
+    streaming.fit(df.iloc[:5])
+    in_memory = DataCleaner(targets).fit(df)
+
+    assert "obs" in first_only.dropped_columns_
+    assert streaming.dropped_columns_ == in_memory.dropped_columns_ == ["vazia"]
+    assert streaming.columns_ == in_memory.columns_
+    pd.testing.assert_frame_equal(streaming.transform(df), in_memory.transform(df))
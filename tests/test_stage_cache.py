@@ -0,0 +1,36 @@
+# test_stage_cache.py
+# -*- coding: utf-8 -*-
+"""Impressões digitais do cache de etapas (stage_cache.py)"""
+
+import config
+import stage_cache
+
+
+def test_code_dependencies_follow_imports():
+    deps = stage_cache.code_dependencies(["train.py"])
+    assert {"train.py", "encoding.py", "labels.py", "inference.py", "fast_forest.py", "config.py"} <= set(deps)
+
+
+def test_code_dependencies_of_a_module_written_on_the_fly(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "ROOT", tmp_path)
+    (tmp_path / "a.py").write_text("import os\nimport b\n\ndef f():\n    from c import x\n")
+    (tmp_path / "b.py").write_text("import numpy as np\n")
+    (tmp_path / "c.py").write_text("from b import y\nx = 1\n")
+    assert stage_cache.code_dependencies(["a.py"]) == ["a.py", "b.py", "c.py"]
+
+
+def test_preprocess_fingerprint_tracks_csv_export(monkeypatch):
+    monkeypatch.setattr(config, "EXPORT_PROCESSED_CSV", False)
+    before = stage_cache.fingerprint("preprocess")
+    monkeypatch.setattr(config, "EXPORT_PROCESSED_CSV", True)
+    assert stage_cache.fingerprint("preprocess") != before
+    assert "DATA_PROCESSED_CSV" in stage_cache.STAGES["preprocess"]["outputs"]
+
+
+def test_directory_hash_changes_with_contents(tmp_path):
+    (tmp_path / "forest").mkdir()
+    (tmp_path / "forest" / "a.npy").write_bytes(b"1")
+    before = stage_cache.file_hash(tmp_path)
+    (tmp_path / "forest" / "a.npy").write_bytes(b"2")
+    assert stage_cache.file_hash(tmp_path) != before
+    assert stage_cache.file_hash(tmp_path / "missing") is None
@@ -0,0 +1,50 @@
+# test_train_incremental.py
+# -*- coding: utf-8 -*-
+"""Reservatório de positivos do treino incremental (train.py)"""
+
+import numpy as np
+
+from train import _PositiveReservoir
+
+
+def block(Y):
+    Y = np.asarray(Y, dtype=np.uint8)
+    return np.arange(len(Y) * 2, dtype=np.float32).reshape(len(Y), 2), Y
+
+
+def has_all_classes(Y):
+    return all(len(np.unique(Y[:, k])) == 2 for k in range(Y.shape[1]))
+
+
+def test_reservoir_is_bounded_and_keeps_positives():
+    reservoir = _PositiveReservoir(size=5, seed=0)
+    for _ in range(10):
+        reservoir.add(*block([[1, 0], [0, 1], [0, 0], [1, 1]]))
+    assert len(reservoir.X) == 5
+    assert reservoir.Y.any(axis=1).all()
+    assert reservoir.n_seen == 30
+
+
+def test_extend_fills_targets_missing_from_block():
+    reservoir = _PositiveReservoir(size=10, seed=0)
+    reservoir.add(*block([[1, 0], [0, 1], [0, 0]]))
+    X, Y = reservoir.extend(*block([[1, 0], [0, 0]]))
+    assert has_all_classes(Y)
+    assert len(X) == len(Y) == 3
+
+
+def test_anchors_cover_classes_the_reservoir_lost():
+    reservoir = _PositiveReservoir(size=1, seed=0)
+    reservoir.add(*block([[0, 1], [0, 0]]))
+    reservoir.add(*block([[1, 0]] * 50 + [[0, 0]]))
+    # O reservatório (1 linha) só guarda positivos do primeiro target: a âncora cobre o segundo
+    X, Y = reservoir.extend(*block([[0, 0], [1, 0]]))
+    assert has_all_classes(Y)
+
+
+def test_extend_leaves_complete_block_unchanged():
+    reservoir = _PositiveReservoir(size=10, seed=0)
+    reservoir.add(*block([[1, 1], [0, 0]]))
+    X, Y = block([[1, 1], [0, 0]])
+    X_out, Y_out = reservoir.extend(X, Y)
+    assert X_out is X and Y_out is Y
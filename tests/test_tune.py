@@ -0,0 +1,40 @@
+# test_tune.py
+# -*- coding: utf-8 -*-
+"""Fronteira de Pareto e cronograma do successive halving (tune.py)"""
+
+import numpy as np
+
+from tune import pareto_rank, schedule
+
+
+def test_pareto_rank_levels():
+    f1 = [0.90, 0.80, 0.85, 0.70, 0.90]
+    latency = [5.0, 1.0, 3.0, 2.0, 6.0]
+    # 0, 1, 2 não dominados; 3 dominado por 1; 4 dominado por 0
+    assert pareto_rank(f1, latency).tolist() == [0, 0, 0, 1, 1]
+
+
+def test_pareto_rank_ties_are_not_dominated():
+    assert pareto_rank([0.8, 0.8], [2.0, 2.0]).tolist() == [0, 0]
+
+
+def test_pareto_rank_chain():
+    f1 = np.array([0.5, 0.6, 0.7])
+    latency = np.array([3.0, 2.0, 1.0])
+    assert pareto_rank(f1, latency).tolist() == [2, 1, 0]
+
+
+def test_pareto_rank_empty():
+    assert len(pareto_rank([], [])) == 0
+
+
+def test_schedule_budget_grows_to_full():
+    rounds = schedule(n_candidates=27, factor=3, n_final=1, n_rows=9000, min_rows=500, max_estimators=270)
+    assert [size for size, _, _ in rounds] == [27, 9, 3, 1]
+    assert rounds[-1][1:] == (9000, 270)
+    assert [rows for _, rows, _ in rounds] == sorted(rows for _, rows, _ in rounds)
+    assert all(rows >= 500 for _, rows, _ in rounds)
+
+
+def test_schedule_single_round_when_few_candidates():
+    assert schedule(2, 3, 4, 1000, 100, 50) == [(2, 1000, 50)]
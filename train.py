@@ -4,53 +4,67 @@
 Etapa 2 - TREINAMENTO
 ----------------------
 - Carrega dataset tratado (config.DATA_PROCESSED)
-- Separa X e y
-- Treina modelo definido (RandomForest por padrão)
-- Salva modelo em config.MODEL_PATH
+- Separa X e a matriz de targets (config.TARGETS: falha geral + tipos de falha)
+- Balanceia o treino com a estratégia de config.BALANCING (ver balancing.py)
+- Treina um único RandomForest multi-saída (uma passada sobre os dados)
+- Variantes de referência (sem SMOTE, class_weight, outros estimadores)
+  rodam à parte em experiments.py
+- Salva modelo em config.MODEL_PATH e o pipeline de inferência completo
+  (encoder + cleaner + schema + modelo) em config.PIPELINE_PATH
+- Com chunksize (--chunksize ou config.TRAIN_CHUNKSIZE) treina em modo
+  incremental: o dataset tratado é lido em blocos e o forest cresce com
+  warm_start, com memória limitada pelo tamanho do bloco
 """
 
+import json
+import numpy as np
 import pandas as pd
 import config
 import joblib
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.model_selection import train_test_split
-from imblearn.over_sampling import SMOTE
+from sklearn.metrics import recall_score
+from balancing import fit_balanced, categorical_indices
 from collections import Counter
+from encoding import load_encoder
+from dataset_io import load_processed, iter_processed, processed_num_rows
+from cleaning import load_cleaner
+from inference import InferencePipeline
+from dtype_policy import feature_matrix
+from instrumentation import step, record_data
 
-def main():
+def load_training_data():
+    """
+    Carrega o dataset tratado, aplica o cleaner salvo e faz o split
+    treino/teste estratificado pela falha geral (compartilhado com experiments.py).
+    Retorna (X_train, X_test, Y_train, Y_test, targets, cleaner, encoder).
+    """
     print("📥 Carregando dados tratados de:", config.DATA_PROCESSED)
-    df = pd.read_csv(config.DATA_PROCESSED, low_memory=False)
+    with step("load"):
+        df = load_processed(config.DATA_PROCESSED)
+        record_data(df)
+    
+    # Encoder categórico ajustado no preprocess (garante o mesmo layout de colunas)
+    encoder = load_encoder()
+    if encoder is not None:
+        print(f"🔤 Encoder categórico: {encoder.summary()}")
+        missing = [col for col in encoder.feature_names_out_ if col not in df.columns]
+        if missing:
+            raise ValueError(
+                f"Dataset tratado não corresponde ao encoder salvo ({len(missing)} colunas ausentes). "
+                "Execute o preprocess novamente."
+            )
     
     # =====================
     # LIMPEZA DE DADOS
     # =====================
     print("🔧 Limpando dados para treinamento...")
     
-    # Converter valores booleanos em string para numéricos
-    df = df.replace({'True': 1, 'False': 0, 'true': 1, 'false': 0})
-    
-    # Converter colunas object para numérico quando possível
-    for col in df.columns:
-        if df[col].dtype == 'object':
-            try:
-                # Tentar converter para numérico
-                df[col] = pd.to_numeric(df[col], errors='coerce')
-                print(f"   Coluna {col} convertida para numérico")
-            except Exception as e:
-                print(f"   Aviso: Não foi possível converter coluna {col}: {e}")
-    
-    # Preencher valores NaN que possam ter surgido da conversão
-    df = df.fillna(0)
-    
-    # Verificar se ainda existem colunas não numéricas
-    non_numeric_cols = df.select_dtypes(include=['object']).columns.tolist()
-    if non_numeric_cols:
-        print(f"⚠️  Colunas ainda não numéricas: {non_numeric_cols}")
-        # Remover colunas que não puderam ser convertidas (exceto target)
-        cols_to_drop = [col for col in non_numeric_cols if col != config.TARGET]
-        if cols_to_drop:
-            df = df.drop(columns=cols_to_drop)
-            print(f"   Removidas colunas: {cols_to_drop}")
+    # Mesmo schema de limpeza ajustado no preprocess (ver cleaning.py)
+    with step("clean"):
+        cleaner = load_cleaner(config.CLEANER_PATH, df)
+        df = cleaner.transform(df)
+        record_data(df)
     
     print(f"✅ Dados limpos. Shape final: {df.shape}")
     print(f"   Tipos de dados: {df.dtypes.value_counts()}")
@@ -61,89 +75,310 @@ def main():
     if config.TARGET not in df.columns:
         raise ValueError(f"Coluna target '{config.TARGET}' não encontrada no dataset!")
     
-    X = df.drop(columns=[config.TARGET])
-    y = df[config.TARGET]
+    X, Y = cleaner.split(df)
+    if isinstance(Y, pd.Series):
+        Y = Y.to_frame()
+    targets = list(Y.columns)
     
     print(f"📊 Features (X): {X.shape}")
-    print(f"📊 Target (y): {y.shape}")
+    print(f"📊 Targets (Y): {Y.shape} -> {targets}")
     
     # Mostrar distribuição original das classes
-    print(f"📊 Distribuição original das classes:")
-    class_counts = Counter(y)
-    for class_name, count in class_counts.items():
-        print(f"   Classe {class_name}: {count} ({count/len(y)*100:.2f}%)")
+    print(f"📊 Distribuição original das classes (positivos por target):")
+    for col in targets:
+        positives = int(Y[col].sum())
+        print(f"   {col}: {positives} ({positives/len(Y)*100:.2f}%)")
     
     # Verificar se X tem apenas valores numéricos
     if X.select_dtypes(include=['object']).shape[1] > 0:
         raise ValueError("Ainda existem colunas não numéricas em X após limpeza!")
     
-    # Split treino/teste ANTES do SMOTE (importante!)
-    X_train, X_test, y_train, y_test = train_test_split(
-        X, y, test_size=config.TEST_SIZE, random_state=config.SEED, stratify=y
-    )
+    # Matriz float32 C-contígua na ordem do schema (o sklearn não copia de novo;
+    # o schema fica no pipeline de inferência)
+    with step("to_matrix"):
+        X = feature_matrix(X)
+        Y = Y.to_numpy(dtype=np.uint8)
+        record_data(X)
+    
+    # Split treino/teste ANTES do balanceamento (importante!), estratificado pela falha geral
+    main_idx = targets.index(config.TARGET) if config.TARGET in targets else 0
+    with step("split"):
+        X_train, X_test, Y_train, Y_test = train_test_split(
+            X, Y, test_size=config.TEST_SIZE, random_state=config.SEED, stratify=Y[:, main_idx]
+        )
     
-    print(f"📊 Treino - X: {X_train.shape}, y: {y_train.shape}")
-    print(f"📊 Teste - X: {X_test.shape}, y: {y_test.shape}")
+    print(f"📊 Treino - X: {X_train.shape}, Y: {Y_train.shape}")
+    print(f"📊 Teste - X: {X_test.shape}, Y: {Y_test.shape}")
+    return X_train, X_test, Y_train, Y_test, targets, cleaner, encoder
+
+
+def main(chunksize=None):
+    chunksize = config.TRAIN_CHUNKSIZE if chunksize is None else chunksize
+    if chunksize:
+        return main_incremental(chunksize)
+
+    X_train, X_test, Y_train, Y_test, targets, cleaner, encoder = load_training_data()
+    main_idx = targets.index(config.TARGET) if config.TARGET in targets else 0
+    y_train = Y_train[:, main_idx]
     
     # =====================
-    # APLICAR SMOTE
+    # BALANCEAMENTO (config.BALANCING, ver balancing.py)
     # =====================
-    print("\n⚖️ Aplicando SMOTE para balancear as classes...")
+    strategy = config.BALANCING
+    print(f"\n⚖️ Balanceamento das classes: {strategy}")
     
-    # Mostrar distribuição antes do SMOTE
-    print("📊 Distribuição no conjunto de TREINO antes do SMOTE:")
+    # Mostrar distribuição antes do balanceamento
+    print("📊 Distribuição no conjunto de TREINO:")
     train_counts_before = Counter(y_train)
     for class_name, count in train_counts_before.items():
         print(f"   Classe {class_name}: {count} ({count/len(y_train)*100:.2f}%)")
     
-    # Aplicar SMOTE apenas no conjunto de treino
-    smote = SMOTE(random_state=config.SEED)
-    X_train_smote, y_train_smote = smote.fit_resample(X_train, y_train)
-    
-    # Mostrar distribuição após o SMOTE
-    print("📊 Distribuição no conjunto de TREINO após SMOTE:")
-    train_counts_after = Counter(y_train_smote)
-    for class_name, count in train_counts_after.items():
-        print(f"   Classe {class_name}: {count} ({count/len(y_train_smote)*100:.2f}%)")
-    
-    print(f"✅ SMOTE aplicado com sucesso!")
-    print(f"   Treino original: {X_train.shape[0]} amostras")
-    print(f"   Treino após SMOTE: {X_train_smote.shape[0]} amostras")
-    print(f"   Aumento de: {X_train_smote.shape[0] - X_train.shape[0]} amostras")
-    
     # =====================
     # TREINAMENTO DO MODELO
     # =====================
     model = RandomForestClassifier(**config.MODEL_PARAMS)
-    print("\n🚀 Treinando modelo RandomForest com dados balanceados...")
+    print("\n🚀 Treinando modelo RandomForest...")
     print(f"   Parâmetros: {config.MODEL_PARAMS}")
     
-    # Treinar com dados balanceados
-    model.fit(X_train_smote, y_train_smote)
+    # Reamostragem (só no treino) + treino multi-saída (uma coluna de Y por target)
+    categorical_idx = categorical_indices(cleaner.feature_columns_, encoder)
+    model, stats = fit_balanced(model, X_train, Y_train, strategy, main_idx, config.SEED, categorical_idx)
+    
+    print(f"✅ Balanceamento '{strategy}' aplicado!")
+    print(f"   Treino original: {X_train.shape[0]} amostras")
+    print(f"   Treino efetivo: {stats['train_rows']} amostras ({stats['train_positives']} positivas)")
+    print(f"   ⏱️  Reamostragem: {stats['resample_s']:.2f}s | Treino: {stats['fit_s']:.2f}s")
     
     # Salvar modelo
-    joblib.dump(model, config.MODEL_PATH)
+    with step("save_model"):
+        joblib.dump(model, config.MODEL_PATH)
     print("✅ Modelo salvo em:", config.MODEL_PATH)
     
+    # Salvar pipeline de inferência (encoder + cleaner + schema + modelo)
+    with step("save_pipeline"):
+        InferencePipeline(model, cleaner, encoder).compile().save(config.PIPELINE_PATH)
+    print("✅ Pipeline de inferência salvo em:", config.PIPELINE_PATH)
+    
     # =====================
     # INFORMAÇÕES ADICIONAIS
     # =====================
-    print(f"\n📈 Score no treino (dados balanceados): {model.score(X_train_smote, y_train_smote):.4f}")
-    print(f"📈 Score no teste (dados originais): {model.score(X_test, y_test):.4f}")
+    with step("score"):
+        Y_pred = model.predict(X_test)
+    y_pred = Y_pred[:, main_idx] if Y_pred.ndim > 1 else Y_pred
+    stats["recall_minoritaria"] = recall_score(Y_test[:, main_idx], y_pred, pos_label=1, zero_division=0)
+    test_accuracy = np.mean(np.all(Y_pred.reshape(len(Y_test), -1) == Y_test, axis=1))
+    print(f"\n📈 Score no teste (dados originais): {test_accuracy:.4f}")
+    print(f"📈 Recall da classe minoritária ({config.TARGET}=1): {stats['recall_minoritaria']:.4f}")
     
-    # Comparar com dados originais não balanceados
-    # Criar uma cópia dos parâmetros sem random_state se já existir
-    params_without_smote = config.MODEL_PARAMS.copy()
-    if 'random_state' not in params_without_smote:
-        params_without_smote['random_state'] = config.SEED
+    with open(config.BALANCING_REPORT_PATH, "w") as f:
+        json.dump(stats, f, indent=4)
+    print("📝 Custo do balanceamento salvo em:", config.BALANCING_REPORT_PATH)
     
-    model_without_smote = RandomForestClassifier(**params_without_smote)
-    model_without_smote.fit(X_train, y_train)
-    print(f"📈 Score sem SMOTE (referência): {model_without_smote.score(X_test, y_test):.4f}")
+    # Modelos de referência (ex.: sem SMOTE) ficam na etapa de experimentos,
+    # em paralelo e sem atrasar o modelo de produção (ver experiments.py)
+    print("💡 Comparação com variantes de referência: python main.py --step experiments")
     
     print("\n" + "="*60)
-    print("✅ TREINAMENTO CONCLUÍDO COM SMOTE!")
+    print("✅ TREINAMENTO CONCLUÍDO!")
+    print("="*60)
+
+# =====================
+# Modo incremental (datasets maiores que a RAM)
+# =====================
+def _is_test(positions, seed=None):
+    """Linhas de teste sorteadas pelo hash da posição global (independe do tamanho do bloco)"""
+    seed = config.SEED if seed is None else seed
+    hashed = pd.util.hash_array(np.asarray(positions, dtype=np.int64), hash_key=f"{seed:016d}"[:16])
+    return hashed < np.uint64(config.TEST_SIZE * 2.0 ** 64)
+
+
+class _PositiveReservoir:
+    """
+    Amostra uniforme (reservoir sampling) de até `size` linhas com alguma
+    falha (qualquer target = 1) dos blocos anteriores. Blocos sem nenhum
+    exemplo de um tipo de falha recebem as linhas do reservatório com essa
+    falha: o warm_start exige as duas classes em todos os targets. A última
+    linha vista de cada (target, classe) fica como âncora para as classes
+    que o reservatório não cobrir.
+    """
+
+    def __init__(self, size, seed):
+        self.size = size
+        self.rng = np.random.RandomState(seed)
+        self.X = self.Y = None
+        self.n_seen = 0
+        self.anchors = {}
+
+    def add(self, X, Y):
+        for k in range(Y.shape[1]):
+            for c in (0, 1):
+                seen = np.flatnonzero(Y[:, k] == c)
+                if len(seen):
+                    self.anchors[(k, c)] = (X[seen[-1]], Y[seen[-1]])
+
+        rows = np.flatnonzero(Y.any(axis=1))
+        if self.X is None:
+            self.X, self.Y = X[:0], Y[:0]
+        n_free = max(self.size - len(self.X), 0)
+        fill, rest = rows[:n_free], rows[n_free:]
+        if len(fill):
+            self.X = np.concatenate([self.X, X[fill]])
+            self.Y = np.concatenate([self.Y, Y[fill]])
+        if len(rest):
+            # Algoritmo R: o t-ésimo positivo substitui uma posição j < size com probabilidade size/(t+1)
+            stream_pos = self.n_seen + len(fill) + np.arange(len(rest))
+            slots = (self.rng.random_sample(len(rest)) * (stream_pos + 1)).astype(np.int64)
+            keep = slots < self.size
+            self.X[slots[keep]] = X[rest[keep]]
+            self.Y[slots[keep]] = Y[rest[keep]]
+        self.n_seen += len(rows)
+
+    def extend(self, X, Y):
+        """
+        (X, Y) do bloco acrescidos das linhas do reservatório positivas nos
+        targets ausentes do bloco e das âncoras das classes que ainda faltarem
+        """
+        if self.X is not None and len(self.X):
+            missing = ~Y.any(axis=0)
+            rows = np.flatnonzero(self.Y[:, missing].any(axis=1))
+            if len(rows):
+                X, Y = np.concatenate([X, self.X[rows]]), np.concatenate([Y, self.Y[rows]])
+        anchors = [self.anchors[(k, c)] for k in range(Y.shape[1]) for c in (0, 1)
+                   if (k, c) in self.anchors and not (Y[:, k] == c).any()]
+        if anchors:
+            X = np.concatenate([X, np.stack([x for x, _ in anchors])])
+            Y = np.concatenate([Y, np.stack([y for _, y in anchors])])
+        return X, Y
+
+
+def _iter_matrices(cleaner, chunksize):
+    """(posições globais, X float32, Y uint8) por bloco do dataset tratado"""
+    start = 0
+    for chunk in iter_processed(config.DATA_PROCESSED, chunksize=chunksize):
+        X, Y = cleaner.split(cleaner.transform(chunk))
+        if isinstance(Y, pd.Series):
+            Y = Y.to_frame()
+        yield np.arange(start, start + len(chunk)), feature_matrix(X), Y.to_numpy(dtype=np.uint8)
+        start += len(chunk)
+
+
+def main_incremental(chunksize):
+    """
+    Treino em blocos de `chunksize` linhas do dataset tratado:
+      1. cada bloco (sem as linhas de teste, sorteadas por hash da posição)
+         + reservatório de positivos dos blocos anteriores é balanceado com
+         config.BALANCING e acrescenta um lote de árvores ao forest (warm_start)
+      2. segunda passada sobre os blocos avalia as linhas de teste
+    Nenhuma etapa mantém o dataset inteiro (nem sua versão reamostrada) em
+    memória; o resultado é reprodutível para o mesmo config.SEED e chunksize.
+    """
+    strategy = config.BALANCING
+    if strategy == "balanced_bootstrap":
+        raise ValueError("'balanced_bootstrap' não suporta o treino incremental (warm_start)")
+
+    cleaner = load_cleaner(config.CLEANER_PATH)
+    encoder = load_encoder()
+    targets = list(cleaner.target_columns)
+    main_idx = targets.index(config.TARGET) if config.TARGET in targets else 0
+    categorical_idx = categorical_indices(cleaner.feature_columns_, encoder)
+
+    n_rows = processed_num_rows(config.DATA_PROCESSED)
+    n_chunks = -(-n_rows // chunksize)
+    total_trees = config.MODEL_PARAMS.get("n_estimators", 100)
+    trees_per_chunk = max(1, -(-total_trees // n_chunks))
+    print(f"📥 Treino incremental: {n_rows} linhas em {n_chunks} blocos de {chunksize} "
+          f"({trees_per_chunk} árvores por bloco, balanceamento '{strategy}')")
+
+    model = RandomForestClassifier(**config.MODEL_PARAMS)
+    model.set_params(warm_start=True, n_estimators=0)
+    reservoir = _PositiveReservoir(config.TRAIN_RESERVOIR_SIZE, config.SEED)
+    stats = {"mode": "incremental", "strategy": strategy, "chunksize": chunksize, "chunks": 0,
+             "resample_s": 0.0, "fit_s": 0.0, "train_rows": 0, "train_positives": 0}
+
+    # =====================
+    # Passo 1: um lote de árvores por bloco
+    # =====================
+    def fit_pending(model, i, X_fit, Y_fit):
+        model.set_params(n_estimators=len(getattr(model, "estimators_", [])) + trees_per_chunk)
+        model, chunk_stats = fit_balanced(model, X_fit, Y_fit, strategy, main_idx,
+                                          config.SEED + i, categorical_idx)
+        for key in ("resample_s", "fit_s", "train_rows", "train_positives"):
+            stats[key] += chunk_stats[key]
+        stats["chunks"] += 1
+        for X_seen, Y_seen in zip(pending_X, pending_Y):
+            reservoir.add(X_seen, Y_seen)
+        print(f"   🌲 Bloco {i + 1}/{n_chunks}: {len(X_fit)} linhas -> {len(model.estimators_)} árvores")
+        return model
+
+    def has_all_classes(Y_fit):
+        return all(len(np.unique(Y_fit[:, k])) == 2 for k in range(Y_fit.shape[1]))
+
+    pending_X, pending_Y = [], []
+    with step("fit_chunks"):
+        for i, (positions, X, Y) in enumerate(_iter_matrices(cleaner, chunksize)):
+            train = ~_is_test(positions)
+            pending_X.append(X[train])
+            pending_Y.append(Y[train])
+            X_fit, Y_fit = reservoir.extend(np.concatenate(pending_X), np.concatenate(pending_Y))
+            # O warm_start exige as duas classes em todos os targets; antes do
+            # primeiro lote, blocos sem algum tipo de falha ficam retidos até o
+            # próximo. Depois dele as âncoras do reservatório cobrem todas as
+            # classes, então nenhum bloco (nem o último) fica fora do treino
+            if not has_all_classes(Y_fit):
+                print(f"   ⏳ Bloco {i + 1}/{n_chunks} sem todas as classes; acumulando com o próximo")
+                continue
+            model = fit_pending(model, i, X_fit, Y_fit)
+            pending_X, pending_Y = [], []
+
+    if stats["chunks"] == 0:
+        raise ValueError("Dataset sem exemplos positivos de todos os targets; treino incremental impossível")
+    model.set_params(warm_start=False)
+    stats["n_estimators"] = len(model.estimators_)
+    print(f"✅ Forest com {stats['n_estimators']} árvores | "
+          f"⏱️  Reamostragem: {stats['resample_s']:.2f}s | Treino: {stats['fit_s']:.2f}s")
+
+    with step("save_model"):
+        joblib.dump(model, config.MODEL_PATH)
+    print("✅ Modelo salvo em:", config.MODEL_PATH)
+    with step("save_pipeline"):
+        InferencePipeline(model, cleaner, encoder).compile().save(config.PIPELINE_PATH)
+    print("✅ Pipeline de inferência salvo em:", config.PIPELINE_PATH)
+
+    # =====================
+    # Passo 2: avaliação das linhas de teste, bloco a bloco
+    # =====================
+    n_test = n_exact = true_positives = positives = 0
+    with step("score"):
+        for positions, X, Y in _iter_matrices(cleaner, chunksize):
+            test = _is_test(positions)
+            if not test.any():
+                continue
+            Y_pred = model.predict(X[test]).reshape(int(test.sum()), -1)
+            Y_test = Y[test]
+            n_test += len(Y_test)
+            n_exact += int(np.all(Y_pred == Y_test, axis=1).sum())
+            positives += int((Y_test[:, main_idx] == 1).sum())
+            true_positives += int(((Y_test[:, main_idx] == 1) & (Y_pred[:, main_idx] == 1)).sum())
+    stats["test_rows"] = n_test
+    stats["recall_minoritaria"] = true_positives / positives if positives else 0.0
+    print(f"\n📈 Score no teste ({n_test} linhas): {n_exact / max(n_test, 1):.4f}")
+    print(f"📈 Recall da classe minoritária ({config.TARGET}=1): {stats['recall_minoritaria']:.4f}")
+
+    with open(config.BALANCING_REPORT_PATH, "w") as f:
+        json.dump(stats, f, indent=4)
+    print("📝 Custo do balanceamento salvo em:", config.BALANCING_REPORT_PATH)
+
+    print("\n" + "="*60)
+    print("✅ TREINAMENTO INCREMENTAL CONCLUÍDO!")
     print("="*60)
 
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Treino do modelo de produção")
+    parser.add_argument("--chunksize", type=int, default=None,
+                        help="Treino incremental em blocos de N linhas do dataset tratado")
+    args = parser.parse_args()
+    config.init()
+    main(chunksize=args.chunksize)
\ No newline at end of file
@@ -0,0 +1,191 @@
+# tune.py
+# -*- coding: utf-8 -*-
+"""
+Etapa opcional - BUSCA DE HIPERPARÂMETROS (successive halving)
+--------------------------------------------------------------
+- Sorteia config.TUNE["n_candidates"] combinações de parâmetros do forest
+- Cada rodada treina os candidatos com um orçamento (linhas de treino e
+  n_estimators) que cresce `factor` vezes; só 1/factor segue adiante
+- A seleção usa a ordem de Pareto (F1 da falha geral x latência de
+  inferência), para que modelos rápidos e um pouco menos precisos não sejam
+  descartados cedo; empates são decididos pelo F1
+- Candidatos de uma rodada rodam em paralelo sobre os arrays compartilhados
+  por memory-map (ver experiments.shared_pool)
+- A latência é o tempo de CPU de uma predição de 1 linha no ArrayForest
+  (caminho usado pela API), imune à disputa por núcleos entre processos
+- Resultado em config.TUNE_PATH: todas as rodadas e a fronteira de Pareto
+  da rodada final (config.MODEL_PARAMS não é alterado)
+
+Uso:
+  python main.py --step tune
+  python tune.py --workers 4
+"""
+
+import json
+import math
+import os
+import time
+from concurrent.futures import as_completed
+
+import numpy as np
+import pandas as pd
+from sklearn.metrics import f1_score
+from sklearn.model_selection import ParameterSampler, train_test_split
+
+import config
+from balancing import resample
+from experiments import build_estimator, shared_arrays, shared_pool
+from fast_forest import ArrayForest
+
+
+def _latency_ms(forest, X, repeat):
+    """Mediana do tempo de CPU (ms) de predict_proba para 1 linha"""
+    times = []
+    for i in range(repeat):
+        row = X[i % len(X)][None, :]
+        start = time.thread_time()
+        forest.predict_proba(row)
+        times.append(time.thread_time() - start)
+    return float(np.median(times) * 1000.0)
+
+
+def evaluate_candidate(params, n_rows, n_estimators):
+    """Treina um candidato com o orçamento da rodada e mede F1 e latência"""
+    shared = shared_arrays()
+    main_idx = shared["main_idx"]
+    rows = shared["order"][:n_rows]
+    X_fit, Y_fit = resample(np.asarray(shared["X_train"][rows]), np.asarray(shared["Y_train"][rows]),
+                            config.TUNE["resampling"], main_idx, config.SEED)
+    multi_output = Y_fit.shape[1] > 1
+
+    model = build_estimator({"estimator": "random_forest",
+                             "params": dict(params, n_estimators=n_estimators)})
+    start = time.perf_counter()
+    model.fit(X_fit, Y_fit if multi_output else Y_fit[:, main_idx])
+    fit_s = time.perf_counter() - start
+
+    y_pred = model.predict(shared["X_val"])
+    if multi_output:
+        y_pred = y_pred[:, main_idx]
+    forest = ArrayForest.from_sklearn(model)
+
+    return {
+        "n_rows": n_rows,
+        "n_estimators": n_estimators,
+        "fit_s": fit_s,
+        "f1": f1_score(shared["Y_val"][:, main_idx], y_pred, zero_division=0),
+        "latency_ms": _latency_ms(forest, shared["X_val"], config.TUNE["latency_repeat"]),
+        "n_nodes": int(len(forest.feature)),
+    }
+
+
+def pareto_rank(f1, latency):
+    """Ordem de Pareto (0 = não dominado) maximizando F1 e minimizando latência"""
+    f1, latency = np.asarray(f1), np.asarray(latency)
+    rank = np.full(len(f1), -1)
+    level = 0
+    while (rank < 0).any():
+        remaining = np.flatnonzero(rank < 0)
+        for i in remaining:
+            dominated = ((f1[remaining] >= f1[i]) & (latency[remaining] <= latency[i])
+                         & ((f1[remaining] > f1[i]) | (latency[remaining] < latency[i])))
+            if not dominated.any():
+                rank[i] = level
+        level += 1
+    return rank
+
+
+def schedule(n_candidates, factor, n_final, n_rows, min_rows, max_estimators):
+    """
+    Rodadas do successive halving: [(n_candidatos, n_linhas, n_estimators)].
+    A última rodada usa o orçamento completo; cada rodada anterior, 1/factor dele.
+    """
+    sizes = [n_candidates]
+    while sizes[-1] > n_final:
+        sizes.append(max(n_final, math.ceil(sizes[-1] / factor)))
+    n_rounds = len(sizes)
+    return [
+        (size,
+         max(min(min_rows, n_rows), n_rows // factor ** (n_rounds - 1 - r)),
+         max(1, max_estimators // factor ** (n_rounds - 1 - r)))
+        for r, size in enumerate(sizes)
+    ]
+
+
+def successive_halving(X_train, Y_train, X_val, Y_val, main_idx=0, max_workers=None):
+    """Executa a busca; retorna (lista de avaliações, resultados da rodada final)"""
+    tune = config.TUNE
+    candidates = list(ParameterSampler(tune["param_distributions"], n_iter=tune["n_candidates"],
+                                       random_state=config.SEED))
+    rounds = schedule(len(candidates), tune["factor"], tune["n_final"], len(X_train),
+                      tune["min_rows"], tune["max_estimators"])
+    max_workers = max_workers or config.EXPERIMENT_WORKERS or os.cpu_count() or 1
+    order = np.random.RandomState(config.SEED).permutation(len(X_train))
+
+    history = []
+    arrays = {"X_train": X_train, "Y_train": Y_train, "X_val": X_val, "Y_val": Y_val, "order": order}
+    with shared_pool(arrays, max_workers, main_idx=main_idx) as pool:
+        alive = list(range(len(candidates)))
+        for r, (size, n_rows, n_estimators) in enumerate(rounds):
+            alive = alive[:size]
+            print(f"🔁 Rodada {r + 1}/{len(rounds)}: {len(alive)} candidatos, "
+                  f"{n_rows} linhas, {n_estimators} árvores")
+            futures = {pool.submit(evaluate_candidate, candidates[c], n_rows, n_estimators): c for c in alive}
+            results = {}
+            for future in as_completed(futures):
+                results[futures[future]] = future.result()
+
+            rows = [dict(round=r + 1, candidate=c, params=candidates[c], **results[c]) for c in alive]
+            ranks = pareto_rank([row["f1"] for row in rows], [row["latency_ms"] for row in rows])
+            for row, rank in zip(rows, ranks):
+                row["pareto_rank"] = int(rank)
+            history += rows
+            # Próxima rodada: melhores na ordem de Pareto, desempate pelo F1
+            rows.sort(key=lambda row: (row["pareto_rank"], -row["f1"]))
+            alive = [row["candidate"] for row in rows]
+
+    return history, rows
+
+
+def main(max_workers=None):
+    from train import load_training_data
+
+    X_train, _, Y_train, _, targets, _, _ = load_training_data()
+    main_idx = targets.index(config.TARGET) if config.TARGET in targets else 0
+    X_fit, X_val, Y_fit, Y_val = train_test_split(
+        X_train, Y_train, test_size=config.TUNE["validation_size"], random_state=config.SEED,
+        stratify=Y_train[:, main_idx]
+    )
+
+    print(f"\n🎛️  Successive halving: {config.TUNE['n_candidates']} candidatos, fator {config.TUNE['factor']}")
+    start = time.perf_counter()
+    history, final = successive_halving(X_fit, Y_fit, X_val, Y_val, main_idx, max_workers)
+    elapsed = time.perf_counter() - start
+
+    front = sorted((row for row in final if row["pareto_rank"] == 0), key=lambda row: row["latency_ms"])
+    table = pd.DataFrame([dict(row["params"], n_estimators=row["n_estimators"], f1=row["f1"],
+                               latency_ms=row["latency_ms"], pareto=row["pareto_rank"] == 0) for row in final])
+    print("\n📊 Rodada final (orçamento completo):")
+    print(table.round(4).to_string(index=False))
+    print(f"⏱️  Tempo total: {elapsed:.2f}s")
+
+    with open(config.TUNE_PATH, "w") as f:
+        json.dump({
+            "target": config.TARGET,
+            "total_s": elapsed,
+            "pareto_front": [dict(row["params"], n_estimators=row["n_estimators"],
+                                  f1=row["f1"], latency_ms=row["latency_ms"]) for row in front],
+            "history": history,
+        }, f, indent=4, default=str)
+    print(f"✅ Fronteira de Pareto ({len(front)} configurações) salva em:", config.TUNE_PATH)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Busca de hiperparâmetros por successive halving")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Processos do pool (padrão: config.EXPERIMENT_WORKERS ou nº de CPUs)")
+    args = parser.parse_args()
+    config.init()
+    main(max_workers=args.workers)